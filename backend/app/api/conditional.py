@@ -0,0 +1,82 @@
+# app/api/conditional.py
+
+"""
+ETags and conditional GETs for the list endpoints.
+
+A list's ETag is built from the version counters of the tables it reads
+(see crud_version) plus the request path and query string. A matching
+'If-None-Match' gets a bare 304 after one primary-key lookup, without
+reading or serializing any rows.
+
+The ETag is weak (W/"..."): the same version of a list goes out as
+identity, gzip or br bytes depending on Accept-Encoding, so it names the
+content, not one byte-exact representation. VaryAcceptEncoding (in
+main.py, outside the compression middleware) adds 'Vary: Accept-Encoding'
+so caches keep the codings apart.
+"""
+
+import hashlib
+
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import MutableHeaders
+
+from app.crud import crud_version
+
+def make_etag(request: Request, versions) -> str:
+    parts = [request.url.path, str(sorted(request.query_params.multi_items()))]
+    parts += [f"{name}:{version}" for name, version in sorted(versions.items())]
+    return 'W/"' + hashlib.sha1("|".join(parts).encode()).hexdigest() + '"'
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    If-None-Match uses the weak comparison, so W/ prefixes are ignored.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in candidates)
+
+async def check_not_modified(request: Request, response: Response, db: AsyncSession, *tables):
+    """
+    Sets the ETag for a GET that reads 'tables'. Returns a 304 response
+    if the client already has this version, otherwise None and the
+    endpoint builds the body as usual.
+    """
+    versions = await db.run_sync(crud_version.get_versions, *tables)
+    db.info["table_versions"] = versions
+    etag = make_etag(request, versions)
+    # 'no-cache' lets the browser keep the body but makes it revalidate
+    # (send If-None-Match) on every request.
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return None
+
+class VaryAcceptEncoding:
+    """
+    ASGI middleware that makes every response carry 'Vary: Accept-Encoding'
+    exactly once, whether or not the compression middleware inside it
+    compressed (and already added it).
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_vary(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                vary = [value.strip().lower() for value in headers.get("vary", "").split(",")]
+                if "accept-encoding" not in vary:
+                    headers.add_vary_header("Accept-Encoding")
+            await send(message)
+
+        await self.app(scope, receive, send_with_vary)
@@ -3,40 +3,59 @@
 from datetime import timedelta
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import security
 from app.schemas import schema
 from app.crud import crud_login
+from app.database import session
 from app.api.api import public_router
 
+# bcrypt runs in password_pool, not on the event loop. The session is
+# closed before bcrypt runs, so a login storm does not also hold one
+# pooled database connection per waiting login.
+
 @public_router.post("/register", response_model=schema.UserInDB, tags=["Authentication"])
-def register_user(user: schema.UserCreate, db: Session = Depends(security.get_db)):
-    db_user = crud_login.get_user_by_email(db, email=user.email)
+async def register_user(user: schema.UserCreate, db: AsyncSession = Depends(session.get_async_db)):
+    db_user = await db.run_sync(crud_login.get_user_by_email, email=user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
+    await db.close()
     
     # --- THIS IS THE NEW LOGIC ---
     # 1. Hash the password here in the endpoint
-    hashed_password = security.get_password_hash(user.password)
+    hashed_password = await security.hash_password(user.password)
     # 2. Pass the hashed password to the CRUD function
-    return crud_login.create_user(db=db, user=user, hashed_password=hashed_password)
+    try:
+        return await db.run_sync(crud_login.create_user, user=user, hashed_password=hashed_password)
+    except IntegrityError:
+        # The same email was registered by a concurrent request while we hashed
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Email already registered")
 
 
 @public_router.post("/login", response_model=schema.Token, tags=["Authentication"])
-def login_for_access_token(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(security.get_db)
+async def login_for_access_token(
+    form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(session.get_async_db)
 ):
-    user = crud_login.get_user_by_email(db, email=form_data.username)
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    user = await db.run_sync(crud_login.get_user_by_email, email=form_data.username)
+    await db.close() # 'user' stays readable, detached; the session can be used again
+    verified, new_hash = False, None
+    if user:
+        verified, new_hash = await security.verify_and_update_password(form_data.password, user.hashed_password)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        # The stored hash uses an outdated bcrypt cost; replace it now that we know the password
+        await db.run_sync(crud_login.update_password_hash, user, new_hash)
     
     access_token_expires = timedelta(minutes=security.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(
         data={"sub": user.email}, expires_delta=access_token_expires
     )
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    return {"access_token": access_token, "token_type": "bearer"}
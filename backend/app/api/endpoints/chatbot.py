@@ -3,16 +3,17 @@
 import os
 import json
 import traceback
+from functools import lru_cache
 from fastapi import Depends, HTTPException
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field
 from typing import List
-from groq import Groq
 
 from app import security
 from app.api.api import private_router
+from app.database import session
 from app.chatbot.tools import tools, available_tools
-from app.models.model import User
+from app.schemas import schema
 
 # --- Pydantic Models (No Changes) ---
 class ChatTurn(BaseModel):
@@ -28,19 +29,28 @@ class ChatResponse(BaseModel):
     history: List[ChatTurn]
 
 # --- Groq Client Setup ---
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+@lru_cache(maxsize=1)
+def get_client():
+    """
+    The Groq client, created on the first chat request. Importing the SDK
+    is slow, so the API does not pay for it at startup.
+    """
+    from groq import Groq
+    return Groq(api_key=os.getenv("GROQ_API_KEY"))
+
 LLM_MODEL = "llama-3.1-8b-instant" # Using the latest fast Llama 3.1 model
 
 @private_router.post("/chatbot", response_model=ChatResponse, tags=["Chatbot"])
 def chat_with_assistant(
     message: ChatMessage,
-    db: Session = Depends(security.get_db),
-    current_user: User = Depends(security.get_current_user)
+    db: Session = Depends(session.get_db), # sync route: the Groq client blocks
+    current_user: schema.UserInDB = Depends(security.get_current_user)
 ):
     try:
         system_prompt = {"role": "system", "content": "You are a helpful, menu-driven inventory assistant..."}
         messages = [system_prompt] + [turn.dict() for turn in message.history] + [{"role": "user", "content": message.content}]
         
+        client = get_client()
         response = client.chat.completions.create(
             model=LLM_MODEL,
             messages=messages,
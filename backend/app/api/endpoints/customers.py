@@ -1,26 +1,29 @@
 # app/api/endpoints/customers.py
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
 from app.database import session
 from app.schemas import schema
-from app.crud import crud_customer
+from app.crud import crud_customer, pagination
+from app.api import conditional
 
 router = APIRouter()
-def get_db():
-    db = session.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
 
 @router.post("/", response_model=schema.Customer, tags=["Customers"])
-def create_new_customer(
+async def create_new_customer(
     customer: schema.CustomerCreate, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(session.get_async_db)
 ):
-    return crud_customer.create_customer(db=db, customer=customer)
+    return await db.run_sync(crud_customer.create_customer, customer=customer)
 
-@router.get("/", response_model=List[schema.Customer], tags=["Customers"])
-def read_all_customers(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud_customer.get_customers(db, skip=skip, limit=limit)
\ No newline at end of file
+@router.get("/", response_model=Union[List[schema.Customer], schema.CustomerPage], tags=["Customers"])
+async def read_all_customers(request: Request, response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: AsyncSession = Depends(session.get_async_db)):
+    not_modified = await conditional.check_not_modified(request, response, db, "customers")
+    if not_modified:
+        return not_modified
+
+    if cursor is None:
+        return await db.run_sync(crud_customer.get_customers, skip=skip, limit=limit)
+
+    customers = await db.run_sync(crud_customer.get_customers, limit=limit, after_id=pagination.decode_id_cursor(cursor))
+    return {"items": customers, "next_cursor": pagination.next_cursor(customers, limit, lambda c: (c["id"],))}
\ No newline at end of file
@@ -1,7 +1,7 @@
 # app/api/endpoints/dashboard.py
 
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List 
 
 from app.database import session
@@ -11,34 +11,34 @@ from app.crud import crud_dashboard
 # This is the 'router' variable main.py will look for
 router = APIRouter()
 
-# Dependency to get the database session
-def get_db():
-    db = session.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.get("/kpis", response_model=schema.DashboardKPIs, tags=["Dashboard"])
-def get_dashboard_kpi_data(db: Session = Depends(get_db)):
+async def get_dashboard_kpi_data(db: AsyncSession = Depends(session.get_async_db)):
     """
     Get all Key Performance Indicators for the main dashboard.
     """
-    kpis = crud_dashboard.get_dashboard_kpis(db=db)
+    kpis = await db.run_sync(crud_dashboard.get_dashboard_kpis)
     return kpis
 
+@router.get("/summary", response_model=schema.DashboardSummary, tags=["Dashboard"])
+async def get_dashboard_summary_data(db: AsyncSession = Depends(session.get_async_db)):
+    """
+    Get the KPIs, low-stock alerts and priority tasks in a single request.
+    """
+    summary = await db.run_sync(crud_dashboard.get_dashboard_summary)
+    return summary
+
 @router.get("/low-stock-alerts", response_model=List[schema.LowStockAlert], tags=["Dashboard"])
-def get_low_stock_alerts_data(db: Session = Depends(get_db)):
+async def get_low_stock_alerts_data(db: AsyncSession = Depends(session.get_async_db)):
     """
     Get a list of products that are low on stock.
     """
-    alerts = crud_dashboard.get_low_stock_alerts(db=db)
+    alerts = await db.run_sync(crud_dashboard.get_low_stock_alerts)
     return alerts
 
 @router.get("/priority-tasks", response_model=List[schema.PriorityTask], tags=["Dashboard"])
-def get_priority_tasks_data(db: Session = Depends(get_db)):
+async def get_priority_tasks_data(db: AsyncSession = Depends(session.get_async_db)):
     """
     Get a list of the most urgent tasks.
     """
-    tasks = crud_dashboard.get_priority_tasks(db=db)
+    tasks = await db.run_sync(crud_dashboard.get_priority_tasks)
     return tasks
\ No newline at end of file
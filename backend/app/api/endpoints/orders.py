@@ -1,59 +1,77 @@
 # app/api/endpoints/orders.py
 
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List # <-- Add this import
+from datetime import datetime
+from typing import List, Optional, Union # <-- Add this import
 
 from app import security
 from app.schemas import schema
-from app.crud import crud_order
+from app.crud import crud_order, pagination
 # from app.api.api import private_router # <-- We don't need this anymore
 from fastapi import APIRouter # <-- We import APIRouter instead
 from app.database import session # <-- Add this import
+from app.api.streaming import iter_lines
+from app.api import conditional
 
 # --- THIS IS THE 'router' VARIABLE THAT main.py IS LOOKING FOR ---
 router = APIRouter()
 
-# Dependency to get the database session
-def get_db():
-    db = session.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 # --- THIS IS YOUR NEW GET_ALL_ORDERS ENDPOINT ---
-@router.get("/", response_model=List[schema.Order], tags=["Orders"])
-def read_all_orders(
+@router.get("/", response_model=Union[List[schema.Order], schema.OrderPage], tags=["Orders"])
+async def read_all_orders(
+    request: Request,
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(session.get_async_db)
 ):
     """
     Retrieve all orders with calculated totals and customer info.
+    Send 'cursor' (empty for the first page, then the previous 'next_cursor')
+    to get a {items, next_cursor} page. Without it, skip/limit still works.
+    Answers 304 when If-None-Match still matches the ETag.
     """
     # Note: We must re-add security later
-    orders = crud_order.get_all_orders(db, skip=skip, limit=limit)
-    return orders
+    # The customer name is part of each row, so customer writes change the ETag too.
+    not_modified = await conditional.check_not_modified(request, response, db, "orders", "customers")
+    if not_modified:
+        return not_modified
+
+    if cursor is None:
+        return await db.run_sync(crud_order.get_all_orders, skip=skip, limit=limit)
+
+    after = pagination.decode_cursor(cursor, 2)
+    if after:
+        try:
+            after = (datetime.fromisoformat(after[0]), int(after[1]))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
+    orders = await db.run_sync(crud_order.get_all_orders, limit=limit, after=after)
+    return {"items": orders, "next_cursor": pagination.next_cursor(orders, limit, lambda o: (o["order_date"], o["id"]))}
 
 @router.get("/{order_id}", response_model=schema.OrderDetails, tags=["Orders"])
-def read_order_details(
+async def read_order_details(
     order_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(session.get_async_db)
 ):
     """
     Retrieve the full details for a single order.
     """
-    db_order = crud_order.get_order_details(db, order_id=order_id)
+    db_order = await db.run_sync(crud_order.get_order_details, order_id=order_id)
     if db_order is None:
         raise HTTPException(status_code=404, detail="Order not found")
     return db_order
 
 @router.patch("/{order_id}", response_model=schema.Order, tags=["Orders"])
-def change_order_status(
+async def change_order_status(
     order_id: int,
     status_update: schema.OrderUpdateStatus,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(session.get_async_db)
 ):
     """
     Update the status of an order (e.g., "Pending", "Shipped").
@@ -62,8 +80,8 @@ def change_order_status(
     # We need a new CRUD function for this. Let's get the full order
     # to return a full Order object, or we can adapt.
     # Let's call the new crud function:
-    updated_order = crud_order.update_order_status(
-        db=db, 
+    updated_order = await db.run_sync(
+        crud_order.update_order_status,
         order_id=order_id, 
         new_status=status_update.status
     )
@@ -75,21 +93,61 @@ def change_order_status(
     # but our update_order_status just returns a simple Order.
     # We must return the *full* details.
 
-    full_details = crud_order.get_order_details(db, order_id=order_id)
+    full_details = await db.run_sync(crud_order.get_order_details, order_id=order_id)
 
     return full_details
 
 
 # --- THIS IS YOUR ORIGINAL POST_SALE ENDPOINT (using the new 'router') ---
 @router.post("/sales", response_model=schema.SaleResponse, tags=["Sales"])
-def record_new_sale(
+async def record_new_sale(
     sale: schema.SaleCreate, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(session.get_async_db)
 ):
     # Note: We must re-add security later
-    new_order = crud_order.create_sale(db=db, sale=sale)
+    new_order = await db.run_sync(crud_order.create_sale, sale=sale)
     return {
         "sale_id": new_order.id,
         "status": "success",
         "detail": "Inventory levels updated successfully."
-    }
\ No newline at end of file
+    }
+
+@router.post("/sales/bulk", response_model=schema.BulkSaleResponse, tags=["Sales"])
+async def record_sales_bulk(
+    request: Request,
+    chunk_size: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(session.get_db)
+):
+    """
+    Record many sales from a streamed NDJSON body (one SaleCreate per line).
+    Sales are committed in chunks of 'chunk_size'. Each line gets its own
+    success/error result, so a bad sale does not abort the batch.
+    """
+    results = []
+    chunk = []
+
+    # A full chunk takes 100+ ms of CPU; it runs on a sync Session in the
+    # threadpool so the event loop keeps serving other requests meanwhile.
+    async def flush():
+        if chunk:
+            results.extend(await run_in_threadpool(crud_order.create_sales_bulk, db, list(chunk)))
+            chunk.clear()
+
+    line_number = 0
+    async for line in iter_lines(request):
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            sale = schema.SaleCreate.model_validate_json(line)
+        except ValidationError as e:
+            results.append({"line": line_number, "status": "error", "sale_id": None, "detail": str(e.errors()[0]["msg"])})
+            continue
+        chunk.append((line_number, sale))
+        if len(chunk) >= chunk_size:
+            await flush()
+    await flush()
+
+    results.sort(key=lambda r: r["line"])
+    accepted = sum(1 for r in results if r["status"] == "success")
+    return {"accepted": accepted, "rejected": len(results) - accepted, "results": results}
@@ -1,21 +1,37 @@
 # app/api/endpoints/predictions.py
 
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
-from app import security
+from app.database import session
 from app.schemas import schema
 from app.crud import crud_prediction
 from app.api.api import private_router
 
+# Sync routes (run in the threadpool): forecasts are CPU work, and the batch
+# waits on forecast_pool, which would block the event loop.
+
 @private_router.get("/predictions/demand/{product_id}", response_model=schema.DemandPrediction, tags=["Predictions"])
-def get_demand_prediction(product_id: int, forecast_days: int = 30, db: Session = Depends(security.get_db)):
+def get_demand_prediction(product_id: int, forecast_days: int = Query(30, ge=1, le=365), forecast_model: str = "linear", db: Session = Depends(session.get_db)):
     """
     Predicts the future sales demand for a given product based on historical sales data.
+    'forecast_model' is 'linear' (trend line), 'exponential' (damped-trend
+    smoothing) or 'seasonal' (smoothing with a day-of-week pattern).
     """
-    prediction_result = crud_prediction.predict_future_demand(db, product_id=product_id, forecast_days=forecast_days)
+    prediction_result = crud_prediction.predict_future_demand(db, product_id=product_id, forecast_days=forecast_days, forecast_model=forecast_model)
     
     if "error" in prediction_result:
         raise HTTPException(status_code=400, detail=prediction_result["error"])
         
-    return prediction_result
\ No newline at end of file
+    return prediction_result
+@private_router.post("/predictions/demand/batch", response_model=schema.DemandBatchResponse, tags=["Predictions"])
+def get_demand_predictions_batch(request: schema.DemandBatchRequest, db: Session = Depends(session.get_db)):
+    """
+    Predicts demand for many products in one call (every product with sales
+    if 'product_ids' is left out). Uses the same trend model as the
+    single-product endpoint; products without enough history are omitted.
+    """
+    predictions = crud_prediction.predict_demand_batch(
+        db, product_ids=request.product_ids, forecast_days=request.forecast_days, forecast_model=request.forecast_model
+    )
+    return {"forecast_period_days": request.forecast_days, "forecast_model": request.forecast_model, "predictions": predictions}
@@ -1,85 +1,158 @@
 # app/api/endpoints/products.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Union
 
 from app.database import session
 from app.schemas import schema
-from app.crud import crud_product
+from app.crud import crud_product, pagination
+from app.api.streaming import iter_lines, iter_csv_rows
+from app.api import conditional
 
 # THIS IS THE 'router' VARIABLE THAT main.py IS LOOKING FOR
 router = APIRouter()
 
-# Dependency to get the database session
-def get_db():
-    db = session.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.post("/", response_model=schema.Product)
-def create_new_product(
+async def create_new_product(
     product: schema.ProductCreate,  # This uses your new matching schema
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(session.get_async_db)
 ):
     """
     Create a new product.
     """
     # Call the simple create_product function directly
-    return crud_product.create_product(db=db, product=product)
-@router.get("/", response_model=List[schema.Product])
-def read_all_products(
+    return await db.run_sync(crud_product.create_product, product=product)
+
+# Only the first rejected rows are reported back, so the response stays
+# small no matter how large the upload is.
+MAX_REPORTED_ERRORS = 100
+
+async def _iter_ndjson_rows(request: Request):
+    line_number = 0
+    async for line in iter_lines(request):
+        line_number += 1
+        if line.strip():
+            yield line_number, line
+
+@router.post("/import", response_model=schema.ProductImportSummary)
+async def import_products(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    batch_size: int = Query(1000, ge=1, le=10000),
+    db: Session = Depends(session.get_db)
+):
+    """
+    Bulk insert/update products from a streamed CSV or NDJSON upload.
+    Rows are matched on 'sku'. The format comes from the 'format' query
+    parameter, or from the Content-Type header (text/csv means CSV).
+    """
+    if format is None:
+        format = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+
+    summary = {"inserted": 0, "updated": 0, "unchanged": 0, "rejected": 0, "errors": []}
+    batch = []
+
+    def reject(line, detail):
+        summary["rejected"] += 1
+        if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+            summary["errors"].append({"line": line, "detail": detail})
+
+    # Each batch runs on a sync Session in the threadpool, off the event loop
+    async def flush():
+        if batch:
+            inserted, updated, unchanged = await run_in_threadpool(crud_product.upsert_products, db, list(batch))
+            summary["inserted"] += inserted
+            summary["updated"] += updated
+            summary["unchanged"] += unchanged
+            batch.clear()
+
+    rows = iter_csv_rows(request) if format == "csv" else _iter_ndjson_rows(request)
+    async for line, row in rows:
+        try:
+            if format == "csv":
+                product = schema.ProductBase.model_validate(row)
+            else:
+                product = schema.ProductBase.model_validate_json(row)
+        except ValidationError as e:
+            error = e.errors()[0]
+            field = ".".join(str(part) for part in error["loc"])
+            reject(line, f"{field}: {error['msg']}" if field else error["msg"])
+            continue
+        batch.append(product)
+        if len(batch) >= batch_size:
+            await flush()
+    await flush()
+
+    return summary
+
+@router.get("/", response_model=Union[List[schema.Product], schema.ProductPage])
+async def read_all_products(
+    request: Request,
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(session.get_async_db)
 ):
     """
     Retrieve all products.
+    Send 'cursor' (empty for the first page, then the previous 'next_cursor')
+    to get a {items, next_cursor} page. Without it, skip/limit still works.
+    Answers 304 when If-None-Match still matches the ETag.
     """
-    # This calls the get_products function from your crud_product.py file
-    products = crud_product.get_products(db, skip=skip, limit=limit)
-    return products
+    not_modified = await conditional.check_not_modified(request, response, db, "products")
+    if not_modified:
+        return not_modified
+
+    if cursor is None:
+        # This calls the get_products function from your crud_product.py file
+        return await db.run_sync(crud_product.get_products, skip=skip, limit=limit)
+
+    products = await db.run_sync(crud_product.get_products, limit=limit, after_id=pagination.decode_id_cursor(cursor))
+    return {"items": products, "next_cursor": pagination.next_cursor(products, limit, lambda p: (p["id"],))}
 
 @router.get("/{product_id}", response_model=schema.Product)
-def read_one_product(
+async def read_one_product(
     product_id: int, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(session.get_async_db)
 ):
     """
     Retrieve a single product by its ID.
     """
-    db_product = crud_product.get_product(db, product_id=product_id)
+    db_product = await db.run_sync(crud_product.get_product, product_id=product_id)
     if db_product is None:
         raise HTTPException(status_code=404, detail="Product not found")
     return db_product
 
 @router.delete("/{product_id}", response_model=schema.Product)
-def remove_product(
+async def remove_product(
     product_id: int, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(session.get_async_db)
 ):
     """
     Delete a product by its ID.
     """
-    db_product = crud_product.delete_product(db, product_id=product_id)
+    db_product = await db.run_sync(crud_product.delete_product, product_id=product_id)
     if db_product is None:
         raise HTTPException(status_code=404, detail="Product not found")
     return db_product
 
 @router.patch("/{product_id}", response_model=schema.Product, tags=["Products"])
-def update_existing_product(
+async def update_existing_product(
     product_id: int,
     product_update: schema.ProductUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(session.get_async_db)
 ):
     """
     Update an existing product by its ID.
     """
     # This calls the update_product function you already have!
-    db_product = crud_product.update_product(
-        db=db, 
+    db_product = await db.run_sync(
+        crud_product.update_product,
         product_id=product_id, 
         product_update=product_update
     )
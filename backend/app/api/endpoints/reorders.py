@@ -1,7 +1,8 @@
 # app/api/endpoints/reorders.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
+from typing import List
 from pydantic import BaseModel # Import BaseModel for our request
 
 from app.database import session
@@ -11,13 +12,8 @@ from app.crud import crud_reorder # Use the crud_reorder file
 # THIS IS THE 'router' VARIABLE THAT main.py IS LOOKING FOR
 router = APIRouter()
 
-# Dependency to get the database session
-def get_db():
-    db = session.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# These routes stay sync (they run in the threadpool): the suggestions wait
+# on forecast_pool, which would block the event loop.
 
 # 1. Define the "rulebook" for our request.
 # The frontend must send a JSON object with these two keys.
@@ -28,7 +24,7 @@ class ReorderRequest(BaseModel):
 @router.post("/reorder", tags=["Reorders"])
 def create_reorder(
     request: ReorderRequest, 
-    db: Session = Depends(get_db)
+    db: Session = Depends(session.get_db)
 ):
     """
     Create a new purchase order for a single product.
@@ -47,4 +43,33 @@ def create_reorder(
         raise e
     except Exception as e:
         # Catch any other unexpected errors
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/suggestions", response_model=List[schema.SupplierReorderGroup], tags=["Reorders"])
+def read_reorder_suggestions(
+    cover_days: int = Query(30, ge=1, le=365),
+    forecast_model: str = "linear",
+    db: Session = Depends(session.get_db)
+):
+    """
+    Reorder suggestions for every low-stock product that is not already
+    on a pending purchase order, grouped by supplier.
+    """
+    suggestions = crud_reorder.get_reorder_suggestions(db, cover_days=cover_days, forecast_model=forecast_model)
+    return crud_reorder.group_by_supplier(suggestions)
+
+@router.post("/plan", response_model=schema.ReorderPlanResponse, tags=["Reorders"])
+def create_reorder_plan(
+    request: schema.ReorderPlanRequest,
+    db: Session = Depends(session.get_db)
+):
+    """
+    Orders every suggested product at once: one purchase order per
+    supplier, created in a single transaction.
+    """
+    return crud_reorder.create_reorder_plan(
+        db,
+        cover_days=request.cover_days,
+        forecast_model=request.forecast_model,
+        product_ids=request.product_ids
+    )
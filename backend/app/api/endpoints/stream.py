@@ -0,0 +1,44 @@
+# app/api/endpoints/stream.py
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from app.events import event_broker
+
+router = APIRouter()
+
+# How long the browser waits before reconnecting after the stream drops
+RETRY_MS = 3000
+
+@router.get("", tags=["Live updates"])
+async def stream_changes(request: Request):
+    """
+    Server-Sent Events stream of live changes (use EventSource in the browser).
+
+    Event types and their JSON data:
+    - order.created:          {id, order_date, status, total, item_count}
+    - orders.created:         {count, first_id, last_id}  (bulk sales)
+    - order.status:           {id, status}
+    - stock.changed:          {items: [{id, change} or {id, currentStock, reorderPoint}]}
+    - purchase_order.created: {id, supplier_id, product_id, quantity}
+    - purchase_orders.created: {count, first_id, last_id}  (reorder plan)
+    - kpi.sales:              {day, revenue, orders}  (amounts to add)
+    - kpi.counters:           {pending_orders?, low_stock_items?}  (amounts to add)
+    - resync:                 {}  the client fell behind; re-fetch everything
+    """
+    subscriber = event_broker.subscribe()
+
+    async def body():
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            while True:
+                # Everything that is waiting goes out in one write
+                yield await subscriber.next_chunk()
+        finally:
+            event_broker.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,48 +1,51 @@
 # app/api/endpoints/suppliers.py
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
 
 from app.database import session
 from app.schemas import schema
-from app.crud import crud_supplier
+from app.crud import crud_supplier, pagination
+from app.api import conditional
 
 # THIS IS THE 'router' VARIABLE THAT main.py WILL LOOK FOR
 router = APIRouter()
 
-# Dependency to get the database session
-def get_db():
-    db = session.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.post("/", response_model=schema.Supplier, tags=["Suppliers"])
-def create_new_supplier(
+async def create_new_supplier(
     supplier: schema.SupplierCreate, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(session.get_async_db)
 ):
-    return crud_supplier.create_supplier(db=db, supplier=supplier)
+    return await db.run_sync(crud_supplier.create_supplier, supplier=supplier)
 
-@router.get("/", response_model=List[schema.Supplier], tags=["Suppliers"])
-def read_all_suppliers(
+@router.get("/", response_model=Union[List[schema.Supplier], schema.SupplierPage], tags=["Suppliers"])
+async def read_all_suppliers(
+    request: Request,
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(session.get_async_db)
 ):
-    suppliers = crud_supplier.get_suppliers(db, skip=skip, limit=limit)
-    return suppliers
+    not_modified = await conditional.check_not_modified(request, response, db, "suppliers")
+    if not_modified:
+        return not_modified
+
+    if cursor is None:
+        return await db.run_sync(crud_supplier.get_suppliers, skip=skip, limit=limit)
+
+    suppliers = await db.run_sync(crud_supplier.get_suppliers, limit=limit, after_id=pagination.decode_id_cursor(cursor))
+    return {"items": suppliers, "next_cursor": pagination.next_cursor(suppliers, limit, lambda s: (s["id"],))}
 
 @router.patch("/{supplier_id}", response_model=schema.Supplier, tags=["Suppliers"])
-def update_existing_supplier(
+async def update_existing_supplier(
     supplier_id: int,
     supplier_update: schema.SupplierUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(session.get_async_db)
 ):
-    db_supplier = crud_supplier.update_supplier(
-        db=db, 
+    db_supplier = await db.run_sync(
+        crud_supplier.update_supplier,
         supplier_id=supplier_id, 
         supplier_update=supplier_update
     )
@@ -51,11 +54,11 @@ def update_existing_supplier(
     return db_supplier
 
 @router.delete("/{supplier_id}", response_model=schema.Supplier, tags=["Suppliers"])
-def remove_supplier(
+async def remove_supplier(
     supplier_id: int, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(session.get_async_db)
 ):
-    db_supplier = crud_supplier.delete_supplier(db, supplier_id=supplier_id)
+    db_supplier = await db.run_sync(crud_supplier.delete_supplier, supplier_id=supplier_id)
     if db_supplier is None:
         raise HTTPException(status_code=404, detail="Supplier not found")
     return db_supplier
\ No newline at end of file
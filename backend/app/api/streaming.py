@@ -0,0 +1,82 @@
+# app/api/streaming.py
+
+import csv
+import os
+
+from fastapi import HTTPException, Request
+
+# The longest line an upload may contain. Only one line is buffered at a
+# time, so this bounds the memory a request can take.
+MAX_LINE_BYTES = int(os.getenv("MAX_UPLOAD_LINE_BYTES", 1024 * 1024))
+
+def _decode_line(line: bytes, line_number: int, encoding: str, max_line_bytes: int) -> str:
+    if len(line) > max_line_bytes:
+        raise HTTPException(status_code=413, detail=f"Line {line_number} is longer than {max_line_bytes} bytes.")
+    try:
+        return line.decode(encoding)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail=f"Line {line_number} is not valid {encoding}.")
+
+async def iter_lines(request: Request, encoding: str = "utf-8", max_line_bytes: int = MAX_LINE_BYTES):
+    """
+    Yields the request body one text line at a time as it arrives,
+    so large uploads are never held in memory all at once.
+    Line endings are kept, which is what the csv module expects.
+    A line over 'max_line_bytes' is a 413 and one that does not decode
+    is a 400, raised as soon as it is seen.
+    """
+    buffer = b""
+    line_number = 0
+    async for chunk in request.stream():
+        buffer += chunk
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end == -1:
+                break
+            line_number += 1
+            yield _decode_line(buffer[start:end + 1], line_number, encoding, max_line_bytes)
+            start = end + 1
+        buffer = buffer[start:]
+        if len(buffer) > max_line_bytes:
+            # Still no line end: stop buffering instead of waiting for one
+            raise HTTPException(status_code=413, detail=f"Line {line_number + 1} is longer than {max_line_bytes} bytes.")
+    if buffer:
+        yield _decode_line(buffer, line_number + 1, encoding, max_line_bytes)
+
+async def iter_csv_rows(request: Request):
+    """
+    Yields (line_number, row_dict) for each record of a streamed CSV body.
+    The first record is the header. Quoted fields that span several lines
+    are collected before parsing, and only one record is held at a time.
+    """
+    header = None
+    pending = []
+    quotes = 0
+    start_line = 0
+    line_number = 0
+
+    async for line in iter_lines(request):
+        line_number += 1
+        if not pending:
+            start_line = line_number
+        pending.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue # Still inside a quoted field
+
+        fields = next(csv.reader(pending), [])
+        pending = []
+        quotes = 0
+        if not any(field.strip() for field in fields):
+            continue # Skip blank lines
+
+        if header is None:
+            header = [name.strip().lstrip("\ufeff") for name in fields]
+            continue
+        yield start_line, dict(zip(header, fields))
+
+    if pending and header is not None:
+        fields = next(csv.reader(pending), [])
+        if any(field.strip() for field in fields):
+            yield start_line, dict(zip(header, fields))
@@ -0,0 +1,224 @@
+# app/cache.py
+
+"""
+In-process result cache for read-heavy CRUD functions.
+
+Entries expire after a TTL and the least recently used entry is evicted
+when the cache is full. Every entry is tagged with the tables it was read
+from. Write paths call 'touch(db, table, ...)' and, as soon as that
+session commits, every entry tagged with one of those tables is dropped.
+A rolled-back session invalidates nothing. The same touches also bump the
+tables' version counters (crud_version) inside the committing transaction.
+
+A second cache, 'forecast_cache', holds demand forecasts keyed by
+(product_id, forecast_days). Sales call 'touch_forecasts(db, product_ids)'
+and only those products' forecasts are dropped when the session commits.
+
+A third, 'token_cache', maps validated access tokens to their user (see
+security.get_current_user). An entry never outlives its token's 'exp',
+and every commit that touched "users" drops them all.
+
+The caches live in one worker process. With several workers, a write in
+one worker only clears that worker's cache; the others serve the old
+result until their TTL runs out.
+"""
+
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+from pydantic import TypeAdapter
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.crud import crud_version
+
+class TTLCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.enabled = maxsize > 0 and ttl > 0
+        self._entries = OrderedDict() # key -> (expires_at, tags, value)
+        self._tagged = {} # tag -> keys of the entries carrying it
+        self._lock = threading.Lock()
+        self.generation = 0 # bumped by every invalidate()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """
+        Returns (True, value) on a hit, or (False, None) on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[2]
+
+    def set(self, key, value, tags=(), ttl: float = None, generation: int = None):
+        """
+        Stores 'value'. When 'generation' is given and an invalidate() has
+        run since it was read, nothing is stored: the value may have been
+        computed from data that a commit has changed in the meantime.
+        """
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        tags = frozenset(tags)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, tags, value)
+            for tag in tags:
+                self._tagged.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        # Caller holds the lock
+        _, tags, _ = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tagged[tag]
+            keys.discard(key)
+            if not keys:
+                del self._tagged[tag]
+
+    def invalidate(self, *tags):
+        """
+        Drops every entry tagged with any of 'tags'.
+        """
+        with self._lock:
+            self.generation += 1
+            stale = set()
+            for tag in tags:
+                stale.update(self._tagged.get(tag, ()))
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._tagged.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+result_cache = TTLCache(
+    maxsize=int(os.getenv("RESULT_CACHE_SIZE", 1024)),
+    ttl=float(os.getenv("RESULT_CACHE_TTL", 30)),
+)
+
+# Forecasts only change when their product sells, and every sale drops
+# them, so they can be kept much longer than list results.
+forecast_cache = TTLCache(
+    maxsize=int(os.getenv("FORECAST_CACHE_SIZE", 4096)),
+    ttl=float(os.getenv("FORECAST_CACHE_TTL", 600)),
+)
+
+# Tag carried by every forecast entry; touching it drops them all
+ALL_FORECASTS = "all"
+
+token_cache = TTLCache(
+    maxsize=int(os.getenv("TOKEN_CACHE_SIZE", 10000)),
+    ttl=float(os.getenv("TOKEN_CACHE_TTL", 300)),
+)
+
+def cached(*tables, returns, daily: bool = False):
+    """
+    Caches a CRUD read function 'fn(db, *args, **kwargs)'.
+    'tables' are the tables the result depends on. 'returns' is the type
+    the result is converted to (e.g. List[schema.Product]) before caching,
+    so cached values are plain dicts and lists, not ORM objects tied to a
+    closed session. Results that depend on today's date ('daily') are also
+    keyed on it. Calls with unhashable arguments bypass the cache.
+    """
+    adapter = TypeAdapter(returns)
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(db, *args, **kwargs):
+            key = (fn.__module__, fn.__qualname__, args, tuple(sorted(kwargs.items())))
+            # When the request already read the table versions for its ETag
+            # (app/api/conditional.py), key on them too, so a body is never
+            # served under a newer ETag than the data it was read from.
+            versions = db.info.get("table_versions")
+            if versions:
+                key += tuple(versions.get(table) for table in tables)
+            if daily:
+                key += (date.today(),)
+            try:
+                hash(key)
+            except TypeError:
+                return fn(db, *args, **kwargs)
+
+            if result_cache.enabled:
+                hit, value = result_cache.get(key)
+                if hit:
+                    return value
+
+            # A commit that lands while fn runs must not be cached over
+            generation = result_cache.generation
+            result = adapter.dump_python(adapter.validate_python(fn(db, *args, **kwargs), from_attributes=True))
+            if result_cache.enabled:
+                result_cache.set(key, result, tags=tables, generation=generation)
+            return result
+        return wrapper
+    return decorator
+
+def touch(db: Session, *tables):
+    """
+    Records that 'db' wrote to 'tables'. Their versions are bumped as part
+    of the commit and their cached results are dropped after it.
+    """
+    db.info.setdefault("cache_touched_tables", set()).update(tables)
+
+def touch_forecasts(db: Session, product_ids=None):
+    """
+    Records that 'db' changed the forecast state of 'product_ids' (every
+    product if None). Their cached forecasts are dropped after the commit.
+    """
+    touched = db.info.setdefault("forecast_touched_products", set())
+    touched.update([ALL_FORECASTS] if product_ids is None else product_ids)
+
+@event.listens_for(Session, "before_commit")
+def _bump_versions_before_commit(session):
+    crud_version.bump_versions(session, session.info.get("cache_touched_tables"))
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    tables = session.info.pop("cache_touched_tables", None)
+    if tables:
+        result_cache.invalidate(*tables)
+        if "users" in tables:
+            token_cache.invalidate("users")
+    products = session.info.pop("forecast_touched_products", None)
+    if products:
+        forecast_cache.invalidate(*products)
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session):
+    session.info.pop("cache_touched_tables", None)
+    session.info.pop("forecast_touched_products", None)
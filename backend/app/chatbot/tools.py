@@ -2,15 +2,15 @@
 
 from sqlalchemy.orm import Session
 from app.crud import crud_order, crud_product, crud_dashboard # <-- IMPORT CRUD_DASHBOARD
-from app.models import model
+from app.schemas import schema
 
 # --- Tool Functions ---
 
-def get_user_profile(db: Session, current_user: model.User):
+def get_user_profile(db: Session, current_user: schema.UserInDB):
     """Fetches the profile information for the currently logged-in user."""
     return {"id": current_user.id, "email": current_user.email}
 
-def get_last_order(db: Session, current_user: model.User):
+def get_last_order(db: Session, current_user: schema.UserInDB):
     """Retrieves the details of the most recent order for the currently logged-in user."""
     last_order = crud_order.get_most_recent_order_by_user(db, user_id=current_user.id)
     if not last_order:
@@ -18,7 +18,7 @@ def get_last_order(db: Session, current_user: model.User):
     return {
         "order_id": last_order.id,
         "order_date": last_order.order_date.strftime("%Y-%m-%d"),
-        "total_items": len(last_order.items)
+        "total_items": last_order.item_count
     }
 
 def get_product_details(db: Session, product_name: str):
@@ -34,7 +34,7 @@ def get_product_details(db: Session, product_name: str):
     }
 
 # --- NEW TOOL FUNCTION ---
-def study_data(db: Session, current_user: model.User):
+def study_data(db: Session, current_user: schema.UserInDB):
     """
     Analyzes the inventory and returns key performance indicators (KPIs).
     Use this when the user asks for a summary, analysis, report, or to 'study the data'.
@@ -44,7 +44,7 @@ def study_data(db: Session, current_user: model.User):
     return kpis
 
 # --- MODIFIED CAPABILITIES FUNCTION ---
-def get_capabilities(db: Session, current_user: model.User):
+def get_capabilities(db: Session, current_user: schema.UserInDB):
     """
     Provides a summary of all the assistant's capabilities.
     This should be called when the user asks for help or says hello.
@@ -116,7 +116,7 @@ available_tools = {
     "get_product_details": get_product_details,
 }
 # --- MODIFIED CAPABILITIES FUNCTION ---
-def get_capabilities(db: Session, current_user: model.User):
+def get_capabilities(db: Session, current_user: schema.UserInDB):
     """
     Provides a structured, numbered list of the assistant's main capabilities.
     This should be called when the user asks for help or says hello.
@@ -1,13 +1,23 @@
 # app/crud/crud_customer.py
+from typing import List
 from sqlalchemy.orm import Session
+from app import cache
 from app.models import model
 from app.schemas import schema
 
 def get_customer(db: Session, customer_id: int):
     return db.query(model.Customer).filter(model.Customer.id == customer_id).first()
 
-def get_customers(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(model.Customer).offset(skip).limit(limit).all()
+@cache.cached("customers", returns=List[schema.Customer])
+def get_customers(db: Session, skip: int = 0, limit: int = 100, after_id: int = None):
+    """
+    Returns one page ordered by id. Pass 'after_id' (the last id of the
+    previous page) for keyset pagination; otherwise 'skip' is used.
+    """
+    query = db.query(model.Customer).order_by(model.Customer.id)
+    if after_id is not None:
+        return query.filter(model.Customer.id > after_id).limit(limit).all()
+    return query.offset(skip).limit(limit).all()
 
 def create_customer(db: Session, customer: schema.CustomerCreate):
     db_customer = model.Customer(
@@ -15,6 +25,7 @@ def create_customer(db: Session, customer: schema.CustomerCreate):
         contact_info=customer.contact_info
     )
     db.add(db_customer)
+    cache.touch(db, "customers")
     db.commit()
     db.refresh(db_customer)
     return db_customer
\ No newline at end of file
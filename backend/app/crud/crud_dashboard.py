@@ -1,85 +1,80 @@
 # app/crud/crud_dashboard.py
 
+from typing import List
 from sqlalchemy.orm import Session
 from sqlalchemy import func
+from app import cache
+from app.crud import crud_kpi
+from app.database.session import begin_read_snapshot
 from app.models import model
-from datetime import date, timedelta
+from app.schemas import schema
+from datetime import date, datetime, time
 
+# Each dashboard read has a cached public function for its own endpoint
+# and an uncached _implementation. get_dashboard_summary calls the
+# _implementations, so all of its parts come from its one read snapshot
+# rather than from cache entries filled at different times.
+
+@cache.cached("kpi_daily_sales", "kpi_counters", returns=schema.DashboardKPIs, daily=True)
 def get_dashboard_kpis(db: Session):
     """
-    Calculates the four main KPIs for the dashboard.
-    
+    Reads the four main KPIs for the dashboard from the KPI store.
+    The store is kept up to date by the sale, order status and product
+    write paths (see crud_kpi.py), so this never scans orders or products.
     """
-    today = date.today()
-
-    # 1. Revenue Today
-    # We join orders and order_details, filter for today, and sum the totals.
-    # Note: We must hard-code a price here since your Product model doesn't have one.
-    revenue_today_query = (
-        db.query(func.sum(model.OrderDetail.quantity * model.OrderDetail.price_at_sale))
-          .join(model.Order, model.OrderDetail.order_id == model.Order.id)
-          .filter(func.DATE(model.Order.order_date) == today)
-    )
-    revenue_today = revenue_today_query.scalar() or 0.0
+    return _dashboard_kpis(db)
 
-    # 2. Orders Today
-    orders_today = (
-        db.query(func.count(model.Order.id))
-          .filter(func.DATE(model.Order.order_date) == today)
-          .scalar() or 0
-    )
-    
-    # 3. Pending Orders (Total)
-    pending_orders = (
-        db.query(func.count(model.Order.id))
-          .filter(model.Order.status == "Pending")
-          .scalar() or 0
-    )
-    
-    # 4. Low Stock Items (Total)
-    # Finds products where currentStock is at or below the reorderPoint
-    low_stock_items = (
-        db.query(func.count(model.Product.id))
-          .filter(model.Product.currentStock <= model.Product.reorderPoint)
-          .scalar() or 0
-    )
-
-    return {
-        "revenue_today": revenue_today,
-        "orders_today": orders_today,
-        "pending_orders": pending_orders,
-        "low_stock_items": low_stock_items,
-    }
+def _dashboard_kpis(db: Session):
+    return crud_kpi.get_kpis(db, date.today())
 
+@cache.cached("products", returns=List[schema.LowStockAlert])
 def get_low_stock_alerts(db: Session, limit: int = 5):
     """
-    Gets a list of products that are at or below their reorder point.
+    Gets a list of products that are at or below their reorder point,
+    furthest below it first. Served by the partial low-stock index.
     """
+    return _low_stock_alerts(db, limit)
+
+def _low_stock_alerts(db: Session, limit: int = 5):
     low_stock_products = (
         db.query(model.Product)
-          .filter(model.Product.currentStock <= model.Product.reorderPoint)
-          .order_by(model.Product.currentStock.asc()) # Show the lowest stock first
+          .filter(model.LOW_STOCK)
+          .order_by(model.Product.stock_deficit.desc()) # Show the most severe shortage first
           .limit(limit)
           .all()
     )
     return low_stock_products
 
+@cache.cached("orders", "products", "purchase_orders", returns=List[schema.PriorityTask], daily=True)
 def get_priority_tasks(db: Session, limit: int = 3):
     """
     Gets a combined list of high-priority tasks from different tables.
     """
+    return _priority_tasks(db, limit)
+
+def _priority_tasks(db: Session, limit: int = 3, low_stock_alerts=None, pending_orders=None):
+    """
+    Callers that already have the low-stock alerts (Product rows) or the
+    pending order count (see get_dashboard_summary) can pass them in to
+    skip queries.
+    """
     tasks = [] # This is our list of tasks to return
 
     # 1. TASK: Check for old pending orders
-    # Find orders older than 1 day (24 hours) that are still 'Pending'
-    one_day_ago = date.today() - timedelta(days=1)
+    # Find orders placed before today (i.e. on or before yesterday) that are
+    # still 'Pending'. Comparing the raw column against the start of today
+    # lets the (status, order_date) index answer this without a table scan.
+    start_of_today = datetime.combine(date.today(), time.min)
 
-    old_pending_orders_count = (
-        db.query(func.count(model.Order.id))
-          .filter(model.Order.status == "Pending")
-          .filter(func.DATE(model.Order.order_date) <= one_day_ago)
-          .scalar() or 0
-    )
+    if pending_orders == 0:
+        old_pending_orders_count = 0 # No pending orders at all, so none are old
+    else:
+        old_pending_orders_count = (
+            db.query(func.count(model.Order.id))
+              .filter(model.Order.status == "Pending")
+              .filter(model.Order.order_date < start_of_today)
+              .scalar() or 0
+        )
 
     if old_pending_orders_count > 0:
         tasks.append({
@@ -89,17 +84,22 @@ def get_priority_tasks(db: Session, limit: int = 3):
         })
 
     # 2. TASK: Check for the *most* critical low stock item
-    most_critical_item = (
-        db.query(model.Product)
-          .filter(model.Product.currentStock <= model.Product.reorderPoint)
-          .order_by(model.Product.currentStock.asc()) # Get the one with the *least* stock
-          .first()
-    )
+    if low_stock_alerts is not None:
+        # The alerts are already sorted most severe first
+        most_critical_name = low_stock_alerts[0].name if low_stock_alerts else None
+    else:
+        most_critical_name = (
+            db.query(model.Product.name)
+              .filter(model.LOW_STOCK)
+              .order_by(model.Product.stock_deficit.desc()) # Get the one furthest below its reorder point
+              .limit(1)
+              .scalar()
+        )
 
-    if most_critical_item:
+    if most_critical_name:
         tasks.append({
             "type": "Low Stock",
-            "description": f"{most_critical_item.name} is below reorder point.",
+            "description": f"{most_critical_name} is below reorder point.",
             "link_to": f"/inventory" # We'd need to update the Product page to handle filtering
         })
 
@@ -119,4 +119,27 @@ def get_priority_tasks(db: Session, limit: int = 3):
         })
 
     # Return the first 3 tasks, or however many we found
-    return tasks[:limit]
\ No newline at end of file
+    return tasks[:limit]
+
+@cache.cached(
+    "kpi_daily_sales", "kpi_counters", "orders", "products", "purchase_orders",
+    returns=schema.DashboardSummary, daily=True
+)
+def get_dashboard_summary(db: Session):
+    """
+    Gets the KPIs, low-stock alerts and priority tasks in one go.
+    Everything is read from a single snapshot (only the summary as a whole
+    is cached), and the priority tasks reuse the low-stock alerts and
+    pending count instead of querying them again.
+    """
+    begin_read_snapshot(db)
+
+    kpis = _dashboard_kpis(db)
+    alerts = _low_stock_alerts(db)
+    tasks = _priority_tasks(db, low_stock_alerts=alerts, pending_orders=kpis["pending_orders"])
+
+    return {
+        "kpis": kpis,
+        "low_stock_alerts": alerts,
+        "priority_tasks": tasks,
+    }
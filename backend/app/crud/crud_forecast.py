@@ -0,0 +1,200 @@
+# app/crud/crud_forecast.py
+
+"""
+The forecast state behind the demand predictions.
+
+'forecast_daily' holds units sold per (product, day). 'forecast_state'
+holds, per product, the running least-squares sums over those daily
+buckets (n, sum x, sum y, sum xy, sum x^2, with x = days since the first
+sale). create_sale and the bulk sale path update both in the same
+transaction as the sale, so a forecast is one primary-key lookup.
+rebuild_forecast_state regenerates everything from order_details.
+
+The write side assumes sales arrive in day order (they are stamped with
+the current time): a sale for a day after 'last_day' opens a new bucket.
+"""
+
+from datetime import date
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from app import cache
+from app.database.session import upsert_insert
+from app.models import model
+
+# Products per IN (...) query, well below SQLite's bound-parameter limit
+PRODUCT_ID_CHUNK = 5000
+
+EPOCH = date(1970, 1, 1)
+
+def day_number(day: date) -> int:
+    return (day - EPOCH).days
+
+# --- Write side ---
+
+def record_sales(db: Session, day: date, sales):
+    """
+    Adds one day's sales to the buckets and running sums.
+    'sales' is {product_id: (quantity, order_details rows)}.
+    """
+    if not sales:
+        return
+    cache.touch(db, "forecast_daily", "forecast_state")
+    cache.touch_forecasts(db, sales)
+    day = day_number(day)
+
+    daily = model.ForecastDaily.__table__
+    stmt = upsert_insert(db, daily)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[daily.c.product_id, daily.c.day],
+        set_={"quantity": daily.c.quantity + stmt.excluded.quantity}
+    )
+    db.execute(stmt, [
+        {"product_id": product_id, "day": day, "quantity": quantity}
+        for product_id, (quantity, _) in sales.items()
+    ])
+
+    # On conflict every right-hand side sees the row as it was before the
+    # update. A later day adds a new point x; the same day only adds to y.
+    state = model.ForecastState.__table__
+    stmt = upsert_insert(db, state)
+    x = stmt.excluded.last_day - state.c.first_day
+    new_day = stmt.excluded.last_day > state.c.last_day
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[state.c.product_id],
+        set_={
+            "last_day": case((new_day, stmt.excluded.last_day), else_=state.c.last_day),
+            "days": state.c.days + case((new_day, 1), else_=0),
+            "records": state.c.records + stmt.excluded.records,
+            "sum_x": state.c.sum_x + case((new_day, x), else_=0),
+            "sum_xx": state.c.sum_xx + case((new_day, x * x), else_=0),
+            "sum_y": state.c.sum_y + stmt.excluded.sum_y,
+            "sum_xy": state.c.sum_xy + x * stmt.excluded.sum_y,
+        }
+    )
+    db.execute(stmt, [
+        {
+            "product_id": product_id, "first_day": day, "last_day": day, "days": 1, "records": records,
+            "sum_x": 0, "sum_y": quantity, "sum_xy": 0, "sum_xx": 0,
+        }
+        for product_id, (quantity, records) in sales.items()
+    ])
+
+# --- Rebuild from the sales history ---
+
+def daily_sales_query(product_ids=None):
+    """
+    SELECT product_id, day, sum(quantity), count(*) per (product, day).
+    Line items are first summed per (product, order), which follows the
+    (product_id, order_id, quantity) index without touching table rows.
+    Only then is each order's date looked up and the sums grouped by day,
+    so the orders table is read once per order rather than per line item.
+    """
+    per_order = (
+        select(
+            model.OrderDetail.product_id,
+            model.OrderDetail.order_id,
+            func.sum(model.OrderDetail.quantity).label("quantity"),
+            func.count().label("records")
+        )
+        .group_by(model.OrderDetail.product_id, model.OrderDetail.order_id)
+    )
+    if product_ids is not None:
+        per_order = per_order.where(model.OrderDetail.product_id.in_(product_ids))
+    per_order = per_order.subquery()
+
+    day = func.date(model.Order.order_date)
+    return (
+        select(per_order.c.product_id, day, func.sum(per_order.c.quantity), func.sum(per_order.c.records))
+        .select_from(per_order.join(model.Order, model.Order.id == per_order.c.order_id))
+        .group_by(per_order.c.product_id, day)
+        .order_by(per_order.c.product_id, day)
+    )
+
+def daily_sales_arrays(db: Session, product_ids=None):
+    """
+    Quantity sold and number of sale records per (product, day), ordered by
+    product then day, as four parallel NumPy arrays:
+    (product_ids, days since 1970-01-01, quantities, record_counts).
+    The grouping happens in the database, so only one row per product and
+    day is transferred, and rows go straight into arrays.
+    """
+    import numpy as np # loaded on first use, not at startup
+
+    if product_ids is None:
+        rows = db.execute(daily_sales_query()).all()
+    else:
+        rows = []
+        product_ids = sorted(set(product_ids))
+        for start in range(0, len(product_ids), PRODUCT_ID_CHUNK):
+            rows.extend(db.execute(daily_sales_query(product_ids[start:start + PRODUCT_ID_CHUNK])).all())
+
+    if not rows:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, empty, empty
+
+    ids, days, quantities, record_counts = zip(*rows)
+    return (
+        np.array(ids, dtype=np.int64),
+        np.array(days, dtype="datetime64[D]").astype(np.int64),
+        np.array(quantities, dtype=np.int64),
+        np.array(record_counts, dtype=np.int64),
+    )
+
+def compute_states(db: Session, product_ids=None):
+    """
+    Recomputes the daily buckets and running sums from order_details.
+    Returns (daily, states): parallel arrays of (product_id, day, quantity)
+    and a dict of per-product arrays named like the forecast_state columns.
+    """
+    import numpy as np
+
+    product_ids, days, quantities, record_counts = daily_sales_arrays(db, product_ids)
+    daily = (product_ids, days, quantities)
+    if len(product_ids) == 0:
+        return daily, None
+
+    starts = np.flatnonzero(np.r_[True, product_ids[1:] != product_ids[:-1]])
+    n = np.diff(np.r_[starts, len(product_ids)])
+    first_day = days[starts]
+    x = days - np.repeat(first_day, n)
+    states = {
+        "product_id": product_ids[starts],
+        "first_day": first_day,
+        "last_day": days[starts + n - 1],
+        "days": n,
+        "records": np.add.reduceat(record_counts, starts),
+        "sum_x": np.add.reduceat(x, starts),
+        "sum_y": np.add.reduceat(quantities, starts),
+        "sum_xy": np.add.reduceat(x * quantities, starts),
+        "sum_xx": np.add.reduceat(x * x, starts),
+    }
+    return daily, states
+
+def rebuild_forecast_state(db: Session, commit: bool = True, batch: int = 50_000):
+    """
+    Replaces both forecast tables with values recomputed from order_details.
+    """
+    (product_ids, days, quantities), states = compute_states(db)
+    db.execute(model.ForecastDaily.__table__.delete())
+    db.execute(model.ForecastState.__table__.delete())
+
+    daily_rows = [
+        {"product_id": p, "day": d, "quantity": q}
+        for p, d, q in zip(product_ids.tolist(), days.tolist(), quantities.tolist())
+    ]
+    for start in range(0, len(daily_rows), batch):
+        db.execute(model.ForecastDaily.__table__.insert(), daily_rows[start:start + batch])
+
+    if states is not None:
+        columns = {name: values.tolist() for name, values in states.items()}
+        state_rows = [dict(zip(columns, row)) for row in zip(*columns.values())]
+        for start in range(0, len(state_rows), batch):
+            db.execute(model.ForecastState.__table__.insert(), state_rows[start:start + batch])
+
+    cache.touch(db, "forecast_daily", "forecast_state")
+    cache.touch_forecasts(db)
+    if commit:
+        db.commit()
+    return 0 if states is None else len(states["product_id"])
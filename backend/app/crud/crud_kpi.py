@@ -0,0 +1,159 @@
+# app/crud/crud_kpi.py
+
+"""
+The KPI store behind the dashboard.
+
+Per-day revenue and order counts live in 'kpi_daily_sales'; global counts
+live in 'kpi_counters'. The write paths in crud_order and crud_product
+update them in the same transaction as the change itself, so reading the
+KPIs is a couple of primary-key lookups. rebuild/verify recompute
+everything from the base tables to repair or detect drift.
+"""
+
+from datetime import date
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app import cache, events
+from app.database.session import upsert_insert
+from app.models import model
+
+PENDING_ORDERS = "pending_orders"
+LOW_STOCK_ITEMS = "low_stock_items"
+
+def is_low_stock(current_stock, reorder_point) -> bool:
+    """
+    The same test as 'currentStock <= reorderPoint' in SQL (NULL is never low).
+    """
+    return current_stock is not None and reorder_point is not None and current_stock <= reorder_point
+
+# --- Write side ---
+
+def record_sales(db: Session, day_totals):
+    """
+    Adds {day: (revenue, order_count)} to the daily sales buckets.
+    """
+    if not day_totals:
+        return
+    cache.touch(db, "kpi_daily_sales")
+    for day, (revenue, count) in day_totals.items():
+        events.emit(db, "kpi.sales", {"day": day.isoformat(), "revenue": revenue, "orders": count})
+    table = model.DailySalesKPI.__table__
+    stmt = upsert_insert(db, table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.day],
+        set_={
+            "revenue": table.c.revenue + stmt.excluded.revenue,
+            "order_count": table.c.order_count + stmt.excluded.order_count,
+        }
+    )
+    db.execute(stmt, [
+        {"day": day, "revenue": revenue, "order_count": count}
+        for day, (revenue, count) in day_totals.items()
+    ])
+
+def adjust_counters(db: Session, **deltas):
+    """
+    Adds each delta to its counter, e.g. adjust_counters(db, pending_orders=1).
+    """
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    cache.touch(db, "kpi_counters")
+    events.emit(db, "kpi.counters", deltas)
+    table = model.KPICounter.__table__
+    stmt = upsert_insert(db, table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.name],
+        set_={"value": table.c.value + stmt.excluded.value}
+    )
+    db.execute(stmt, [{"name": name, "value": delta} for name, delta in deltas.items()])
+
+# --- Read side ---
+
+def get_kpis(db: Session, day: date):
+    """
+    Reads the four dashboard KPIs for 'day' from the store.
+    """
+    daily = db.get(model.DailySalesKPI, day)
+    counters = dict(
+        db.query(model.KPICounter.name, model.KPICounter.value)
+          .filter(model.KPICounter.name.in_([PENDING_ORDERS, LOW_STOCK_ITEMS]))
+          .all()
+    )
+    return {
+        "revenue_today": daily.revenue if daily else 0.0,
+        "orders_today": daily.order_count if daily else 0,
+        "pending_orders": counters.get(PENDING_ORDERS, 0),
+        "low_stock_items": counters.get(LOW_STOCK_ITEMS, 0),
+    }
+
+# --- Rebuild / verification ---
+
+def _as_date(value):
+    # SQLite's DATE() returns text; PostgreSQL returns a date
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+def compute_from_tables(db: Session):
+    """
+    Recomputes every KPI from the base tables (the slow way).
+    Returns (daily {day: (revenue, count)}, counters {name: value}).
+    """
+    day = func.date(model.Order.order_date)
+    daily = {
+        _as_date(d): (float(revenue or 0.0), count)
+        for d, revenue, count in (
+            db.query(day, func.sum(model.Order.total), func.count(model.Order.id))
+              .group_by(day)
+              .all()
+        )
+    }
+    counters = {
+        PENDING_ORDERS: db.query(func.count(model.Order.id)).filter(model.Order.status == "Pending").scalar() or 0,
+        LOW_STOCK_ITEMS: db.query(func.count(model.Product.id)).filter(model.LOW_STOCK).scalar() or 0,
+    }
+    return daily, counters
+
+def verify_kpis(db: Session):
+    """
+    Compares the store with the base tables.
+    Returns a list of drift entries; an empty list means no drift.
+    """
+    daily, counters = compute_from_tables(db)
+    drift = []
+
+    stored_daily = {row.day: (row.revenue, row.order_count) for row in db.query(model.DailySalesKPI).all()}
+    for day in sorted(set(daily) | set(stored_daily)):
+        expected = daily.get(day, (0.0, 0))
+        stored = stored_daily.get(day, (0.0, 0))
+        if abs(expected[0] - stored[0]) > 0.005:
+            drift.append({"kpi": f"revenue[{day}]", "stored": stored[0], "expected": expected[0]})
+        if expected[1] != stored[1]:
+            drift.append({"kpi": f"order_count[{day}]", "stored": stored[1], "expected": expected[1]})
+
+    stored_counters = dict(db.query(model.KPICounter.name, model.KPICounter.value).all())
+    for name, expected in counters.items():
+        stored = stored_counters.get(name, 0)
+        if stored != expected:
+            drift.append({"kpi": name, "stored": stored, "expected": expected})
+    return drift
+
+def rebuild_kpis(db: Session, commit: bool = True):
+    """
+    Replaces the whole store with values recomputed from the base tables.
+    """
+    daily, counters = compute_from_tables(db)
+    db.execute(model.DailySalesKPI.__table__.delete())
+    db.execute(model.KPICounter.__table__.delete())
+    if daily:
+        db.execute(model.DailySalesKPI.__table__.insert(), [
+            {"day": day, "revenue": revenue, "order_count": count}
+            for day, (revenue, count) in daily.items()
+        ])
+    db.execute(model.KPICounter.__table__.insert(), [
+        {"name": name, "value": value} for name, value in counters.items()
+    ])
+    cache.touch(db, "kpi_daily_sales", "kpi_counters")
+    if commit:
+        db.commit()
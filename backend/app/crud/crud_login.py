@@ -1,6 +1,7 @@
 # app/crud/crud_login.py
 
 from sqlalchemy.orm import Session
+from app import cache
 from app.models import model
 from app.schemas import schema
 
@@ -13,6 +14,17 @@ def get_user_by_email(db: Session, email: str):
 def create_user(db: Session, user: schema.UserCreate, hashed_password: str):
     db_user = model.User(email=user.email, hashed_password=hashed_password)
     db.add(db_user)
+    cache.touch(db, "users")
     db.commit()
     db.refresh(db_user)
-    return db_user
\ No newline at end of file
+    return db_user
+
+def update_password_hash(db: Session, user: model.User, hashed_password: str):
+    """
+    Replaces a user's stored hash (e.g. with one using the current bcrypt cost).
+    The hash is not part of any cached token identity, so "users" is not touched.
+    """
+    user.hashed_password = hashed_password
+    db.add(user)
+    db.commit()
+    return user
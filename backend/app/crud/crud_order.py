@@ -5,67 +5,339 @@ from app.models import model
 from app.schemas import schema
 from fastapi import HTTPException
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from app import cache, events
+from app.crud import crud_forecast, crud_kpi
+from datetime import datetime
+from sqlalchemy import case, func, update, insert, select, tuple_
 
 # In app/crud/crud_order.py
 
+# Price used for every line item until products carry their own price.
+DEFAULT_PRICE_AT_SALE = 99.99
+
+def _total_quantities(items):
+    """
+    Collapses the line items of a sale into {product_id: total quantity}.
+    A product listed twice must have stock for both lines combined.
+    """
+    totals = {}
+    for item in items:
+        totals[item.product_id] = totals.get(item.product_id, 0) + item.quantity
+    return totals
+
+def _forecast_sales(sales):
+    """
+    {product_id: (quantity, line items)} over all the given sales, for the
+    forecast state.
+    """
+    result = {}
+    for sale in sales:
+        for item in sale.items_sold:
+            quantity, lines = result.get(item.product_id, (0, 0))
+            result[item.product_id] = (quantity + item.quantity, lines + 1)
+    return result
+
+def _get_products_by_id(db: Session, product_ids):
+    """
+    Loads every referenced product with a single 'WHERE id IN (...)' query.
+    """
+    if not product_ids:
+        return {}
+    rows = (
+        db.query(model.Product.id, model.Product.name, model.Product.currentStock, model.Product.reorderPoint)
+          .filter(model.Product.id.in_(product_ids))
+          .all()
+    )
+    return {row.id: row for row in rows}
+
+# Products per stock UPDATE: two bound parameters each, well under
+# SQLite's limit of 32766 per statement.
+STOCK_UPDATE_BATCH = 500
+
+def _decrement_stock(db: Session, totals):
+    """
+    Reduces stock for {product_id: quantity}, up to STOCK_UPDATE_BATCH
+    products per UPDATE. The 'currentStock >= qty' guard makes each
+    decrement atomic, so a concurrent sale can never push stock below
+    zero. Returns {product_id: (currentStock, reorderPoint)} as they are
+    after the update (UPDATE ... RETURNING), or None unless every product
+    was updated.
+    """
+    products = model.Product.__table__
+    pids = list(totals)
+    after = {}
+    for i in range(0, len(pids), STOCK_UPDATE_BATCH):
+        batch = pids[i:i + STOCK_UPDATE_BATCH]
+        quantity = case({pid: totals[pid] for pid in batch}, value=products.c.id)
+        stmt = (
+            update(products)
+            .where(products.c.id.in_(batch))
+            .where(products.c.currentStock >= quantity)
+            .values(currentStock=products.c.currentStock - quantity)
+            .returning(products.c.id, products.c.currentStock, products.c.reorderPoint)
+        )
+        after.update((row.id, (row.currentStock, row.reorderPoint)) for row in db.execute(stmt))
+    return after if len(after) == len(pids) else None
+
+def _newly_low_stock(after, totals):
+    """
+    Counts products that dropped to or below their reorder point with this
+    decrement. 'after' is what _decrement_stock returned: the stock the
+    UPDATE itself left, so concurrent sales between our read and our
+    write cannot skew the count.
+    """
+    count = 0
+    for pid, quantity in totals.items():
+        stock, reorder_point = after[pid]
+        if not crud_kpi.is_low_stock(stock + quantity, reorder_point) and crud_kpi.is_low_stock(stock, reorder_point):
+            count += 1
+    return count
+
+def _insert_order_details(db: Session, rows):
+    """
+    Bulk-inserts OrderDetail rows (a list of dicts) with one executemany INSERT.
+    """
+    if rows:
+        db.execute(insert(model.OrderDetail.__table__), rows)
+
+def _sale_total(sale: schema.SaleCreate):
+    return sum(item.quantity * DEFAULT_PRICE_AT_SALE for item in sale.items_sold)
+
+def recalculate_order_totals(db: Session, first_id: int, last_id: int):
+    """
+    Recomputes orders.total and orders.item_count from order_details for
+    orders with first_id <= id <= last_id. Any path that edits line items
+    of existing orders must call this in the same transaction.
+    Returns how many orders were out of date.
+    """
+    orders = model.Order.__table__
+    details = model.OrderDetail.__table__
+    total = (
+        select(func.coalesce(func.sum(details.c.quantity * details.c.price_at_sale), 0.0))
+        .where(details.c.order_id == orders.c.id)
+        .scalar_subquery()
+    )
+    item_count = (
+        select(func.count(details.c.id))
+        .where(details.c.order_id == orders.c.id)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(orders)
+        .where(orders.c.id >= first_id, orders.c.id <= last_id)
+        .where((func.abs(orders.c.total - total) > 1e-6) | (orders.c.item_count != item_count))
+        .values(total=total, item_count=item_count)
+    )
+    return db.execute(stmt).rowcount
+
+def reconcile_order_totals(db: Session, chunk_size: int = 1000, commit: bool = True):
+    """
+    Walks every order in id ranges of 'chunk_size' and fixes stored totals
+    that disagree with order_details. Each chunk is committed on its own
+    (unless commit=False) so the write lock is never held for long.
+    Returns the number of orders that were corrected.
+    """
+    max_id = db.execute(select(func.max(model.Order.__table__.c.id))).scalar() or 0
+    fixed = 0
+    for first_id in range(1, max_id + 1, chunk_size):
+        fixed += recalculate_order_totals(db, first_id, first_id + chunk_size - 1)
+        cache.touch(db, "orders")
+        if commit:
+            db.commit()
+    return fixed
+
+def _emit_stock_changes(db: Session, totals):
+    """
+    Live 'stock.changed' event for a sale: each product's stock change,
+    not its new level (concurrent sales may have moved it since we read it).
+    """
+    events.emit(db, "stock.changed", {
+        "items": [{"id": product_id, "change": -quantity} for product_id, quantity in totals.items()]
+    })
+
 def create_sale(db: Session, sale: schema.SaleCreate):
-    # 1. Create the main Order record
-    new_order = model.Order(customer_id=sale.customer_id)
-    db.add(new_order)
-    db.flush() # Use flush to get the new_order.id before committing
+    totals = _total_quantities(sale.items_sold)
 
-    # 2. Process each item in the sale
-    for item in sale.items_sold:
-        product = db.query(model.Product).filter(model.Product.id == item.product_id).first()
+    # 1. Fetch every product in the sale at once
+    products = _get_products_by_id(db, list(totals))
 
-        # Check if product exists and if there is enough stock
+    # 2. Check that each product exists and has enough stock
+    for product_id, quantity in totals.items():
+        product = products.get(product_id)
         if not product:
             db.rollback() # Abort the transaction
-            raise HTTPException(status_code=404, detail=f"Product with id {item.product_id} not found.")
-        
-        if product.currentStock < item.quantity:
+            raise HTTPException(status_code=404, detail=f"Product with id {product_id} not found.")
+
+        if product.currentStock < quantity:
             db.rollback() # Abort the transaction
-            raise HTTPException(status_code=400, detail=f"Not enough stock for {product.name}. Available: {product.currentStock}, Requested: {item.quantity}")
+            raise HTTPException(status_code=400, detail=f"Not enough stock for {product.name}. Available: {product.currentStock}, Requested: {quantity}")
 
-        # 3. Reduce the stock quantity (This is the real-time sync)
-        product.currentStock -= item.quantity
+    # 3. Create the main Order record, with its total stored up front
+    order_date = datetime.utcnow()
+    new_order = model.Order(
+        customer_id=sale.customer_id,
+        order_date=order_date,
+        total=_sale_total(sale),
+        item_count=len(sale.items_sold)
+    )
+    db.add(new_order)
+    db.flush() # Use flush to get the new_order.id before committing
 
-        # 4. Create the OrderDetail record
-        order_detail = model.OrderDetail(
-            order_id=new_order.id,
-            product_id=item.product_id,
-            quantity=item.quantity,
-            price_at_sale=99.99  
-        )
-        db.add(order_detail)
+    # 4. Reduce the stock quantities in one batch (This is the real-time sync).
+    # If another sale took the stock since step 2, the guarded UPDATE skips
+    # that row and we abort instead of overselling.
+    stock_after = _decrement_stock(db, totals)
+    if stock_after is None:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Stock changed while the sale was being recorded. Please retry.")
+
+    # 5. Create all OrderDetail records in one batch
+    _insert_order_details(db, [
+        {
+            "order_id": new_order.id,
+            "product_id": item.product_id,
+            "quantity": item.quantity,
+            "price_at_sale": DEFAULT_PRICE_AT_SALE,
+        }
+        for item in sale.items_sold
+    ])
+
+    # 6. Keep the dashboard KPIs in step, in the same transaction
+    crud_kpi.record_sales(db, {order_date.date(): (new_order.total, 1)})
+    crud_forecast.record_sales(db, order_date.date(), _forecast_sales([sale]))
+    crud_kpi.adjust_counters(
+        db,
+        pending_orders=1,
+        low_stock_items=_newly_low_stock(stock_after, totals)
+    )
 
-    # 5. Commit the entire transaction
+    # 7. Commit the entire transaction (live events go out after the commit)
+    events.emit(db, "order.created", {
+        "id": new_order.id,
+        "order_date": order_date,
+        "status": "Pending",
+        "total": new_order.total,
+        "item_count": new_order.item_count,
+    })
+    _emit_stock_changes(db, totals)
+    cache.touch(db, "orders", "order_details", "products")
     db.commit()
     db.refresh(new_order)
     return new_order
 
+def create_sales_bulk(db: Session, sales):
+    """
+    Records a chunk of sales in one transaction.
+    'sales' is a list of (line_number, SaleCreate) pairs. Stock is validated
+    for the whole chunk at once and every sale gets its own result, so one
+    bad sale never aborts the others.
+    """
+    results = {}
+
+    # 1. Fetch every product referenced anywhere in the chunk with one query
+    product_ids = {item.product_id for _, sale in sales for item in sale.items_sold}
+    products = _get_products_by_id(db, list(product_ids))
+    available = {pid: product.currentStock for pid, product in products.items()}
+
+    # 2. Walk the sales in order, reserving stock as we go
+    accepted = []
+    for line, sale in sales:
+        totals = _total_quantities(sale.items_sold)
+        error = None
+        for product_id, quantity in totals.items():
+            if product_id not in available:
+                error = f"Product with id {product_id} not found."
+                break
+            if available[product_id] < quantity:
+                error = f"Not enough stock for {products[product_id].name}. Available: {available[product_id]}, Requested: {quantity}"
+                break
+        if error:
+            results[line] = {"line": line, "status": "error", "sale_id": None, "detail": error}
+            continue
+        for product_id, quantity in totals.items():
+            available[product_id] -= quantity
+        accepted.append((line, sale, totals))
+
+    if not accepted:
+        db.rollback()
+        return [results[line] for line, _ in sales]
+
+    # 3. Insert all the accepted orders at once and get their ids back in order
+    order_date = datetime.utcnow()
+    orders_table = model.Order.__table__
+    order_rows = [
+        {"customer_id": sale.customer_id, "order_date": order_date, "total": _sale_total(sale), "item_count": len(sale.items_sold)}
+        for _, sale, _ in accepted
+    ]
+    order_ids = db.execute(
+        insert(orders_table).returning(orders_table.c.id, sort_by_parameter_order=True),
+        order_rows
+    ).scalars().all()
+
+    # 4. Decrement stock for the chunk in one guarded batch
+    combined = {}
+    for _, _, totals in accepted:
+        for product_id, quantity in totals.items():
+            combined[product_id] = combined.get(product_id, 0) + quantity
+
+    stock_after = _decrement_stock(db, combined)
+    if stock_after is None:
+        # Another writer took stock since step 1. Fall back to recording
+        # the accepted sales one at a time so each gets an accurate result.
+        db.rollback()
+        for line, sale, _ in accepted:
+            try:
+                new_order = create_sale(db, sale)
+                results[line] = {"line": line, "status": "success", "sale_id": new_order.id, "detail": "Inventory levels updated successfully."}
+            except HTTPException as e:
+                results[line] = {"line": line, "status": "error", "sale_id": None, "detail": e.detail}
+        return [results[line] for line, _ in sales]
+
+    # 5. Bulk-insert the line items for every accepted order
+    _insert_order_details(db, [
+        {
+            "order_id": order_id,
+            "product_id": item.product_id,
+            "quantity": item.quantity,
+            "price_at_sale": DEFAULT_PRICE_AT_SALE,
+        }
+        for order_id, (_, sale, _) in zip(order_ids, accepted)
+        for item in sale.items_sold
+    ])
+
+    # 6. Keep the dashboard KPIs in step, then commit the chunk
+    crud_kpi.record_sales(db, {order_date.date(): (sum(row["total"] for row in order_rows), len(order_rows))})
+    crud_forecast.record_sales(db, order_date.date(), _forecast_sales(sale for _, sale, _ in accepted))
+    crud_kpi.adjust_counters(
+        db,
+        pending_orders=len(order_rows),
+        low_stock_items=_newly_low_stock(stock_after, combined)
+    )
+    # One summary event per chunk rather than one per order
+    events.emit(db, "orders.created", {"count": len(order_ids), "first_id": order_ids[0], "last_id": order_ids[-1]})
+    _emit_stock_changes(db, combined)
+    cache.touch(db, "orders", "order_details", "products")
+    db.commit()
+
+    for order_id, (line, _, _) in zip(order_ids, accepted):
+        results[line] = {"line": line, "status": "success", "sale_id": order_id, "detail": "Inventory levels updated successfully."}
+    return [results[line] for line, _ in sales]
+
 def get_most_recent_order_by_user(db: Session, user_id: int):
     # Orders the results by date in descending order and picks the first one
     return db.query(model.Order).filter(model.Order.user_id == user_id).order_by(model.Order.order_date.desc()).first()
 
-def get_all_orders(db: Session, skip: int = 0, limit: int = 100):
+def get_all_orders(db: Session, skip: int = 0, limit: int = 100, after=None):
     """
     Gets a list of all orders with calculated totals and customer names.
     This is a complex query that joins multiple tables.
-            """
-
-    # 1. Subquery to calculate the total for each order
-    total_subquery = (
-        db.query(
-            model.OrderDetail.order_id,
-            func.sum(model.OrderDetail.quantity * model.OrderDetail.price_at_sale).label("total")
-        )
-        .group_by(model.OrderDetail.order_id)
-        .subquery()
-    )
+    Orders are sorted newest first by (order_date, id). Pass 'after' (the
+    (order_date, id) of the last order on the previous page) for keyset
+    pagination; otherwise 'skip' is used.
+    """
 
-    # 2. Main query to get all order details
+    # Main query to get all orders. The total is stored on each order,
+    # so there is no need to aggregate order_details here.
     query = (
         db.query(
             model.Order.id,
@@ -73,18 +345,19 @@ def get_all_orders(db: Session, skip: int = 0, limit: int = 100):
             func.coalesce(model.Customer.name, "N/A").label("customer_name"),
             model.Order.order_date,
             model.Order.status,
-            # Use coalesce to return 0.0 if total is null (for orders with no items)
-            func.coalesce(total_subquery.c.total, 0.0).label("total")
+            model.Order.total
         )
         # Use outerjoin to include orders even if customer_id is null
         .outerjoin(model.Customer, model.Order.customer_id == model.Customer.id)
-        .outerjoin(total_subquery, model.Order.id == total_subquery.c.order_id)
-        .order_by(model.Order.order_date.desc()) # Show newest orders first
-        .offset(skip)
-        .limit(limit)
+        .order_by(model.Order.order_date.desc(), model.Order.id.desc()) # Show newest orders first
     )
+    if after is not None:
+        query = query.filter(tuple_(model.Order.order_date, model.Order.id) < tuple_(*after))
+    else:
+        query = query.offset(skip)
+    query = query.limit(limit)
 
-    # 3. We must return a list of dictionaries that matches our new 'Order' schema
+    # We must return a list of dictionaries that matches our new 'Order' schema
     results = query.all()
 
     orders_list = [
@@ -157,7 +430,11 @@ def update_order_status(db: Session, order_id: int, new_status: str):
     db_order = db.query(model.Order).filter(model.Order.id == order_id).first()
 
     if db_order:
+        was_pending = db_order.status == "Pending"
         db_order.status = new_status
+        crud_kpi.adjust_counters(db, pending_orders=int(new_status == "Pending") - int(was_pending))
+        events.emit(db, "order.status", {"id": order_id, "status": new_status})
+        cache.touch(db, "orders")
         db.commit()
         db.refresh(db_order)
 
@@ -1,55 +1,224 @@
 # app/crud/crud_prediction.py
 
-import pandas as pd
+# NumPy (and app.forecasting, which needs it) is imported inside the
+# functions that use it, so the API process starts without loading it;
+# the first forecast pays for the import.
+
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, select
 from sqlalchemy.orm import Session
-from sklearn.linear_model import LinearRegression
-import numpy as np
 
+from app.cache import ALL_FORECASTS, forecast_cache
+from app.crud.crud_forecast import PRODUCT_ID_CHUNK, day_number
+from app.forecast_pool import PoolBusy, forecast_pool
 from app.models import model
 
-def predict_future_demand(db: Session, product_id: int, forecast_days: int = 30):
-    # 1. Fetch historical sales data for the specific product
-    sales_records = db.query(model.OrderDetail, model.Order.order_date).\
-        join(model.Order).\
-        filter(model.OrderDetail.product_id == product_id).\
-        order_by(model.Order.order_date.asc()).all()
+STATE_COLUMNS = ("days", "records", "sum_x", "sum_y", "sum_xy", "sum_xx", "first_day", "last_day")
+
+DEFAULT_MODEL = "linear"
+
+def predict_future_demand(db: Session, product_id: int, forecast_days: int = 30, forecast_model: str = DEFAULT_MODEL):
+    """
+    Served from forecast_cache when possible. A sale of the product drops
+    its entries when it commits; a session with uncommitted sales skips
+    the cache, so it never stores or reads around its own writes. Entries
+    are keyed on the day too: the smoothing models read up to yesterday.
+    """
+    key = (product_id, forecast_days, forecast_model, _today())
+    if not forecast_cache.enabled or "forecast_touched_products" in db.info:
+        return _predict_future_demand(db, product_id, forecast_days, forecast_model)
+
+    hit, result = forecast_cache.get(key)
+    if hit:
+        return dict(result)
+    # A sale committed while we compute must not leave its old forecast behind
+    generation = forecast_cache.generation
+    result = _predict_future_demand(db, product_id, forecast_days, forecast_model)
+    forecast_cache.set(key, dict(result), tags=(product_id, ALL_FORECASTS), generation=generation)
+    return result
+
+def _predict_future_demand(db: Session, product_id: int, forecast_days: int, forecast_model: str = DEFAULT_MODEL):
+    import numpy as np
+
+    check_model(forecast_model)
+
+    # 1. Read the product's running regression sums (kept up to date by every sale)
+    state = db.get(model.ForecastState, product_id)
 
-    if not sales_records or len(sales_records) < 2:
+    if state is None or state.records < 2:
         # Not enough data to make a prediction
         return {"error": "Not enough historical sales data to generate a forecast."}
 
-    # 2. Prepare the data using pandas
-    # We will group sales by day
-    data = [{"date": record.order_date.date(), "quantity": record.OrderDetail.quantity} for record in sales_records]
-    df = pd.DataFrame(data)
-    daily_sales = df.groupby('date')['quantity'].sum().reset_index()
-    
-    if len(daily_sales) < 2:
+    if state.days < 2:
         return {"error": "Sales data exists, but on a single day. At least two different days are needed for a trend."}
 
-    # 3. Create features for the model (days since the first sale)
-    daily_sales['day_number'] = (daily_sales['date'] - daily_sales['date'].min()).dt.days
-    
-    X = daily_sales[['day_number']] # Features (input)
-    y = daily_sales['quantity']     # Target (output)
-
-    # 4. Train a Simple Linear Regression model
-    model_lr = LinearRegression()
-    model_lr.fit(X, y)
-
-    # 5. Predict the demand for the next 'forecast_days'
-    last_day = daily_sales['day_number'].max()
-    future_days = np.arange(last_day + 1, last_day + 1 + forecast_days).reshape(-1, 1)
-    
-    predicted_sales = model_lr.predict(future_days)
-    
-    # Ensure predictions are non-negative
-    predicted_sales[predicted_sales < 0] = 0
-    
-    total_predicted_demand = int(round(sum(predicted_sales)))
+    # 2. Run the model and add up the (non-negative) predictions for the
+    # next 'forecast_days' days
+    states = {name: np.array([getattr(state, name)], dtype=np.int64) for name in ("product_id", *STATE_COLUMNS)}
+    predicted = _forecast(db, states, forecast_days, forecast_model)
 
     return {
         "product_id": product_id,
         "forecast_period_days": forecast_days,
-        "predicted_demand": total_predicted_demand
-    }
\ No newline at end of file
+        "forecast_model": forecast_model,
+        "predicted_demand": int(predicted[0])
+    }
+
+def check_model(forecast_model: str):
+    from app import forecasting
+
+    if forecast_model not in forecasting.MODELS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown forecast model '{forecast_model}'. Choose one of: {', '.join(forecasting.MODELS)}."
+        )
+
+def _forecast(db: Session, states, forecast_days: int, forecast_model: str):
+    """
+    Runs 'forecast_model' for the products in 'states' (arrays named like
+    the forecast_state columns, ordered by product_id). Models that need
+    the daily series get it read from forecast_daily, a chunk of products
+    at a time.
+    """
+    import numpy as np
+    from app import forecasting
+
+    window, _ = forecasting.MODELS[forecast_model]
+    if window is None:
+        return forecasting.predict(forecast_model, states, None, forecast_days)
+
+    # The series run up to yesterday, the last full day (or the last sale,
+    # if that was today), so the days since a product's last sale count as
+    # days without sales
+    states = dict(states, series_end=np.maximum(states["last_day"], _today() - 1))
+
+    count = len(states["product_id"])
+    demand = np.empty(count, dtype=int)
+    for start in range(0, count, PRODUCT_ID_CHUNK):
+        part = slice(start, start + PRODUCT_ID_CHUNK)
+        chunk = {name: values[part] for name, values in states.items()}
+        demand[part] = forecasting.predict(forecast_model, chunk, _daily_series(db, chunk, window), forecast_days)
+    return demand
+
+def _today() -> int:
+    # Sales are stamped in UTC (crud_order), so "today" is the UTC date too
+    return day_number(datetime.utcnow().date())
+
+def _daily_series(db: Session, states, window: int):
+    """
+    Units sold per day over the 'window' days up to each product's
+    'series_end' day: a (products x window) float matrix, NaN before the
+    first sale and 0 on every later day without a sale.
+    """
+    import numpy as np
+
+    daily = model.ForecastDaily
+    ids = states["product_id"]
+    window_start = states["series_end"] - (window - 1)
+    rows = _fetch_array(db, (
+        select(daily.product_id, daily.day, daily.quantity)
+        .where(daily.product_id.in_(ids.tolist()), daily.day >= int(window_start.min()))
+    ))
+
+    days = np.arange(window)
+    series = np.where(days >= (states["first_day"] - window_start)[:, None], 0.0, np.nan)
+    row = np.searchsorted(ids, rows[:, 0])
+    offset = rows[:, 1] - window_start[row]
+    inside = offset >= 0 # products whose window starts later than the earliest one
+    series[row[inside], offset[inside]] = rows[inside, 2]
+    return series
+
+def _fetch_array(db: Session, query):
+    """
+    Runs a query of integer columns and returns its rows as one int64
+    (rows x columns) array. The rows are taken from the DBAPI cursor as
+    plain tuples, skipping SQLAlchemy's Row objects: for the hundreds of
+    thousands of rows of a batch forecast that is most of the read time.
+    """
+    import numpy as np
+
+    result = db.connection().execute(query)
+    try:
+        rows = result.cursor.fetchall()
+    finally:
+        result.close()
+    return np.array(rows, dtype=np.int64).reshape(-1, len(query.selected_columns))
+
+def predict_demand_batch(db: Session, product_ids=None, forecast_days: int = 30, forecast_model: str = DEFAULT_MODEL):
+    """
+    Forecasts demand for many products (or every product with sales) from
+    their forecast state rows, with one vectorized solve. Returns the same
+    numbers as predict_future_demand, as a list of DemandPrediction dicts;
+    products without enough history are left out.
+
+    When forecast_pool is enabled the rows are read and solved in a worker
+    process, which only sees committed data; a session with uncommitted
+    sales, or an in-memory database, computes inline instead.
+    """
+    import numpy as np
+
+    check_model(forecast_model)
+    url = db.get_bind().url
+    if forecast_pool.enabled and url.database not in (None, "", ":memory:") and "forecast_touched_products" not in db.info:
+        if product_ids is not None:
+            product_ids = np.array(sorted(set(product_ids)), dtype=np.int64)
+        try:
+            ids, demand = forecast_pool.run(
+                _predict_batch_in_worker, url.render_as_string(hide_password=False), product_ids, forecast_days, forecast_model
+            )
+        except PoolBusy:
+            raise HTTPException(
+                status_code=503,
+                detail="Too many forecasts are already running. Please try again shortly.",
+                headers={"Retry-After": "1"},
+            )
+    else:
+        ids, demand = _predict_batch_arrays(db, product_ids, forecast_days, forecast_model)
+
+    return [
+        {"product_id": product_id, "forecast_period_days": forecast_days, "forecast_model": forecast_model, "predicted_demand": predicted}
+        for product_id, predicted in zip(ids.tolist(), demand.tolist())
+    ]
+
+def _predict_batch_arrays(db: Session, product_ids, forecast_days: int, forecast_model: str = DEFAULT_MODEL):
+    """
+    Returns (product ids, predicted demand) as two NumPy arrays.
+    """
+    import numpy as np
+
+    state = model.ForecastState
+    query = (
+        select(state.product_id, *(getattr(state, name) for name in STATE_COLUMNS))
+        .where(state.records >= 2, state.days >= 2)
+        .order_by(state.product_id)
+    )
+    if product_ids is None:
+        rows = _fetch_array(db, query)
+    else:
+        product_ids = sorted(set(int(product_id) for product_id in product_ids))
+        chunks = [
+            _fetch_array(db, query.where(state.product_id.in_(product_ids[start:start + PRODUCT_ID_CHUNK])))
+            for start in range(0, len(product_ids), PRODUCT_ID_CHUNK)
+        ]
+        rows = np.concatenate(chunks) if chunks else np.empty((0, len(STATE_COLUMNS) + 1), dtype=np.int64)
+    if len(rows) == 0:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty
+
+    states = dict(zip(("product_id", *STATE_COLUMNS), rows.T))
+    return states["product_id"], _forecast(db, states, forecast_days, forecast_model)
+
+# Engines opened by forecast_pool worker processes, per database URL
+_worker_engines = {}
+
+def _predict_batch_in_worker(database_url: str, product_ids, forecast_days: int, forecast_model: str):
+    """
+    Runs in a forecast_pool process, on that process's own engine.
+    """
+    engine = _worker_engines.get(database_url)
+    if engine is None:
+        engine = _worker_engines[database_url] = create_engine(database_url)
+    with Session(engine) as db:
+        return _predict_batch_arrays(db, product_ids, forecast_days, forecast_model)
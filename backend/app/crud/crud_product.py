@@ -1,6 +1,11 @@
 # app/crud/crud_product.py
 
+from typing import List
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
+from app import cache, events
+from app.crud import crud_kpi, crud_supplier
+from app.database.session import upsert_insert
 from app.models import model
 from app.schemas import schema
 
@@ -9,27 +14,101 @@ from app.schemas import schema
 def get_product(db: Session, product_id: int):
     return db.query(model.Product).filter(model.Product.id == product_id).first()
 
-def get_products(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(model.Product).offset(skip).limit(limit).all()
+@cache.cached("products", returns=List[schema.Product])
+def get_products(db: Session, skip: int = 0, limit: int = 100, after_id: int = None):
+    """
+    Returns one page ordered by id. Pass 'after_id' (the last id of the
+    previous page) for keyset pagination; otherwise 'skip' is used.
+    """
+    query = db.query(model.Product).order_by(model.Product.id)
+    if after_id is not None:
+        return query.filter(model.Product.id > after_id).limit(limit).all()
+    return query.offset(skip).limit(limit).all()
 
 def create_product(db: Session, product: schema.ProductBase):
     # This function now correctly uses ProductBase
     db_product = model.Product(**product.dict())
+    db_product.supplier_id = crud_supplier.supplier_ids_by_name(db, [product.supplier]).get(product.supplier)
     db.add(db_product)
+    crud_kpi.adjust_counters(db, low_stock_items=int(crud_kpi.is_low_stock(product.currentStock, product.reorderPoint)))
+    cache.touch(db, "products")
     db.commit()
     db.refresh(db_product)
     return db_product
 
+def upsert_products(db: Session, products):
+    """
+    Inserts or updates a batch of products keyed by their unique SKU, using
+    one executemany 'INSERT ... ON CONFLICT(sku) DO UPDATE'.
+    Returns (inserted, updated, unchanged) counts for the batch. Unchanged
+    rows match the stored product exactly (the update skips them) or are
+    replaced by a later row for the same SKU.
+    """
+    # 1. De-duplicate by SKU; the last row for a SKU wins
+    rows = {}
+    for product in products:
+        rows[product.sku] = product.dict()
+    if not rows:
+        return 0, 0, len(products)
+
+    # Link each row to its supplier (one query for the whole batch)
+    supplier_ids = crud_supplier.supplier_ids_by_name(db, {r["supplier"] for r in rows.values()})
+    for row in rows.values():
+        row["supplier_id"] = supplier_ids.get(row["supplier"])
+
+    # 2. Find which SKUs already exist (one IN query) so we can report
+    # counts and keep the low-stock KPI in step
+    existing = (
+        db.query(model.Product.sku, model.Product.currentStock, model.Product.reorderPoint)
+          .filter(model.Product.sku.in_(list(rows)))
+          .all()
+    )
+    low_before = sum(1 for p in existing if crud_kpi.is_low_stock(p.currentStock, p.reorderPoint))
+    low_after = sum(1 for r in rows.values() if crud_kpi.is_low_stock(r["currentStock"], r["reorderPoint"]))
+
+    # 3. Upsert the whole batch. Existing rows are only rewritten when a
+    # value differs; RETURNING lists the SKUs actually inserted or updated.
+    table = model.Product.__table__
+    columns = [key for key in (*schema.ProductBase.model_fields, "supplier_id") if key != "sku"]
+    stmt = upsert_insert(db, table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.sku],
+        set_={key: stmt.excluded[key] for key in columns},
+        where=or_(*(table.c[key].is_distinct_from(stmt.excluded[key]) for key in columns))
+    ).returning(table.c.sku)
+    touched = db.execute(stmt, list(rows.values())).scalars().all()
+    crud_kpi.adjust_counters(db, low_stock_items=low_after - low_before)
+    if touched:
+        cache.touch(db, "products")
+    db.commit()
+
+    existing_skus = {p.sku for p in existing}
+    updated = sum(1 for sku in touched if sku in existing_skus)
+    inserted = len(touched) - updated
+    return inserted, updated, len(products) - len(touched)
+
 def update_product(db: Session, product_id: int, product_update: schema.ProductUpdate):
     db_product = get_product(db, product_id=product_id)
     if not db_product:
         return None
     
     update_data = product_update.dict(exclude_unset=True)
+    was_low = crud_kpi.is_low_stock(db_product.currentStock, db_product.reorderPoint)
     
     for key, value in update_data.items():
         setattr(db_product, key, value)
+    if "supplier" in update_data:
+        db_product.supplier_id = crud_supplier.supplier_ids_by_name(db, [db_product.supplier]).get(db_product.supplier)
 
+    is_low = crud_kpi.is_low_stock(db_product.currentStock, db_product.reorderPoint)
+    crud_kpi.adjust_counters(db, low_stock_items=int(is_low) - int(was_low))
+    if "currentStock" in update_data or "reorderPoint" in update_data:
+        events.emit(db, "stock.changed", {"items": [{
+            "id": db_product.id,
+            "currentStock": db_product.currentStock,
+            "reorderPoint": db_product.reorderPoint,
+        }]})
+    cache.touch(db, "products")
     db.add(db_product)
     db.commit()
     db.refresh(db_product)
@@ -42,6 +121,8 @@ def delete_product(db: Session, product_id: int):
     db_product = get_product(db, product_id=product_id)
     if db_product:
         db.delete(db_product)
+        crud_kpi.adjust_counters(db, low_stock_items=-int(crud_kpi.is_low_stock(db_product.currentStock, db_product.reorderPoint)))
+        cache.touch(db, "products")
         db.commit()
         return db_product
     return None # Return None if product not found
\ No newline at end of file
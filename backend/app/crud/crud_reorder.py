@@ -1,15 +1,18 @@
 # app/crud/crud_reorder.py
 
+from datetime import datetime
+from sqlalchemy import exists, insert
 from sqlalchemy.orm import Session
+from app import cache, events
 from app.models import model
 from app.schemas import schema
-from app.crud import crud_supplier, crud_product # Import our other crud files
+from app.crud import crud_product, crud_prediction # Import our other crud files
 from fastapi import HTTPException
 
 def create_purchase_order_for_product(db: Session, product_id: int, quantity: int):
     """
-    Creates a new Purchase Order for a single product.
-    This function "translates" a product's supplier name into a supplier_id.
+    Creates a new Purchase Order for a single product, from the
+    supplier the product is linked to.
     """
 
     # 1. Get the product to reorder
@@ -17,15 +20,14 @@ def create_purchase_order_for_product(db: Session, product_id: int, quantity: in
     if not product:
         raise HTTPException(status_code=404, detail="Product to reorder not found.")
 
-    # 2. Find the supplier ID from the product's supplier name (the "magic" translation)
-    supplier = crud_supplier.get_supplier_by_name(db, name=product.supplier)
-    if not supplier:
+    # 2. The product carries its supplier's id (no lookup by name)
+    if product.supplier_id is None:
         # If supplier doesn't exist, we can't create a PO
         raise HTTPException(status_code=404, detail=f"Supplier '{product.supplier}' not found in database.")
 
     # 3. Create the main PurchaseOrder
     new_po = model.PurchaseOrder(
-        supplier_id=supplier.id,
+        supplier_id=product.supplier_id,
         status="Pending" # Default to Pending
     )
     db.add(new_po)
@@ -40,6 +42,138 @@ def create_purchase_order_for_product(db: Session, product_id: int, quantity: in
     db.add(po_item)
 
     # 5. Commit the transaction
+    events.emit(db, "purchase_order.created", {
+        "id": new_po.id,
+        "supplier_id": product.supplier_id,
+        "product_id": product.id,
+        "quantity": quantity,
+    })
+    cache.touch(db, "purchase_orders", "purchase_order_details")
     db.commit()
     db.refresh(new_po)
-    return new_po
\ No newline at end of file
+    return new_po
+
+def get_reorder_suggestions(db: Session, cover_days: int = 30, forecast_model: str = "linear"):
+    """
+    Computes a ReorderSuggestion for every low-stock product that is not
+    already on a pending purchase order, most severe shortage first.
+    Each product is topped up to its reorder point plus the demand
+    forecast for the next 'cover_days' days (or plus its reorder point
+    again when it has too little sales history for a forecast).
+    """
+
+    # 1. Every low-stock product with its supplier, in one query
+    on_pending_order = (
+        exists()
+        .where(model.PurchaseOrderDetail.product_id == model.Product.id)
+        .where(model.PurchaseOrder.id == model.PurchaseOrderDetail.purchase_order_id)
+        .where(model.PurchaseOrder.status == "Pending")
+    )
+    products = (
+        db.query(
+            model.Product.id,
+            model.Product.name,
+            model.Product.currentStock,
+            model.Product.reorderPoint,
+            model.Product.supplier,
+            model.Supplier.id.label("supplier_id")
+        )
+        .outerjoin(model.Supplier, model.Supplier.id == model.Product.supplier_id)
+        .filter(model.LOW_STOCK, ~on_pending_order)
+        .order_by(model.Product.stock_deficit.desc(), model.Product.id)
+        .all()
+    )
+    if not products:
+        return []
+
+    # 2. Forecast them all at once
+    forecasts = {
+        p["product_id"]: p["predicted_demand"]
+        for p in crud_prediction.predict_demand_batch(
+            db, product_ids=[p.id for p in products], forecast_days=cover_days, forecast_model=forecast_model
+        )
+    }
+
+    # 3. Order enough to reach the reorder point plus the expected demand
+    suggestions = []
+    for p in products:
+        demand = forecasts.get(p.id)
+        target = p.reorderPoint + (p.reorderPoint if demand is None else demand)
+        suggestions.append({
+            "product_id": p.id,
+            "product_name": p.name,
+            "current_quantity": p.currentStock,
+            "reorder_point": p.reorderPoint,
+            "recommended_order_quantity": max(1, target - p.currentStock),
+            "supplier": p.supplier,
+            "supplier_id": p.supplier_id,
+            "forecast_demand": demand,
+        })
+    return suggestions
+
+def group_by_supplier(suggestions):
+    """
+    Groups suggestions into SupplierReorderGroup dicts, keeping their order.
+    Products without a known supplier form one group with supplier_id None.
+    """
+    groups = {}
+    for suggestion in suggestions:
+        group = groups.setdefault(suggestion["supplier_id"], {
+            "supplier_id": suggestion["supplier_id"],
+            "supplier_name": suggestion["supplier"] if suggestion["supplier_id"] is not None else None,
+            "items": [],
+        })
+        group["items"].append(suggestion)
+    return list(groups.values())
+
+def create_reorder_plan(db: Session, cover_days: int = 30, forecast_model: str = "linear", product_ids=None):
+    """
+    Turns the current reorder suggestions into one Pending PurchaseOrder
+    per supplier, all in one transaction. 'product_ids' limits the plan
+    to those products. Products whose supplier is unknown are returned
+    as 'skipped' instead of ordered.
+    """
+
+    # 1. Compute the suggestions and group them by supplier
+    suggestions = get_reorder_suggestions(db, cover_days=cover_days, forecast_model=forecast_model)
+    if product_ids is not None:
+        wanted = set(product_ids)
+        suggestions = [s for s in suggestions if s["product_id"] in wanted]
+    groups = group_by_supplier(suggestions)
+    skipped = [s for group in groups if group["supplier_id"] is None for s in group["items"]]
+    groups = [group for group in groups if group["supplier_id"] is not None]
+    if not groups:
+        return {"purchase_orders": [], "skipped": skipped}
+
+    # 2. Insert one purchase order per supplier and get their ids back in order
+    po_table = model.PurchaseOrder.__table__
+    order_date = datetime.utcnow()
+    po_ids = db.execute(
+        insert(po_table).returning(po_table.c.id, sort_by_parameter_order=True),
+        [{"supplier_id": group["supplier_id"], "order_date": order_date, "status": "Pending"} for group in groups]
+    ).scalars().all()
+
+    # 3. Bulk-insert every line of every order
+    db.execute(insert(model.PurchaseOrderDetail.__table__), [
+        {"purchase_order_id": po_id, "product_id": s["product_id"], "quantity": s["recommended_order_quantity"]}
+        for po_id, group in zip(po_ids, groups)
+        for s in group["items"]
+    ])
+
+    # 4. Commit the whole plan at once
+    events.emit(db, "purchase_orders.created", {"count": len(po_ids), "first_id": po_ids[0], "last_id": po_ids[-1]})
+    cache.touch(db, "purchase_orders", "purchase_order_details")
+    db.commit()
+
+    return {
+        "purchase_orders": [
+            {
+                "purchase_order_id": po_id,
+                "supplier_id": group["supplier_id"],
+                "item_count": len(group["items"]),
+                "total_quantity": sum(s["recommended_order_quantity"] for s in group["items"]),
+            }
+            for po_id, group in zip(po_ids, groups)
+        ],
+        "skipped": skipped,
+    }
@@ -1,14 +1,25 @@
 # app/crud/crud_supplier.py
 
+from typing import List
+from sqlalchemy import func, select, update
 from sqlalchemy.orm import Session
+from app import cache
 from app.models import model
 from app.schemas import schema
 
 def get_supplier(db: Session, supplier_id: int):
     return db.query(model.Supplier).filter(model.Supplier.id == supplier_id).first()
 
-def get_suppliers(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(model.Supplier).offset(skip).limit(limit).all()
+@cache.cached("suppliers", returns=List[schema.Supplier])
+def get_suppliers(db: Session, skip: int = 0, limit: int = 100, after_id: int = None):
+    """
+    Returns one page ordered by id. Pass 'after_id' (the last id of the
+    previous page) for keyset pagination; otherwise 'skip' is used.
+    """
+    query = db.query(model.Supplier).order_by(model.Supplier.id)
+    if after_id is not None:
+        return query.filter(model.Supplier.id > after_id).limit(limit).all()
+    return query.offset(skip).limit(limit).all()
 
 def create_supplier(db: Session, supplier: schema.SupplierCreate):
     """
@@ -17,6 +28,11 @@ def create_supplier(db: Session, supplier: schema.SupplierCreate):
     """
     db_supplier = model.Supplier(**supplier.dict())
     db.add(db_supplier)
+    db.flush() # Get the id
+
+    # Products already naming this supplier (and not linked yet) now have one
+    link_products(db, names=[db_supplier.name])
+    cache.touch(db, "suppliers", "products")
     db.commit()
     db.refresh(db_supplier)
     return db_supplier
@@ -29,10 +45,25 @@ def update_supplier(db: Session, supplier_id: int, supplier_update: schema.Suppl
         return None
 
     update_data = supplier_update.dict(exclude_unset=True)
+    old_name = db_supplier.name
     for key, value in update_data.items():
         setattr(db_supplier, key, value)
 
+    touched = ["suppliers"]
+    if db_supplier.name != old_name:
+        # Linked products follow the rename; unlinked ones that already
+        # use the new name are linked to this supplier
+        products = model.Product.__table__
+        db.execute(
+            update(products)
+            .where(products.c.supplier_id == db_supplier.id)
+            .values(supplier=db_supplier.name)
+        )
+        link_products(db, names=[db_supplier.name])
+        touched.append("products")
+
     db.add(db_supplier)
+    cache.touch(db, *touched)
     db.commit()
     db.refresh(db_supplier)
     return db_supplier
@@ -41,6 +72,18 @@ def delete_supplier(db: Session, supplier_id: int):
     db_supplier = get_supplier(db, supplier_id=supplier_id)
     if db_supplier:
         db.delete(db_supplier)
+        db.flush()
+
+        # Unlink its products, then relink any that another supplier of
+        # the same name can take over
+        products = model.Product.__table__
+        db.execute(
+            update(products)
+            .where(products.c.supplier_id == supplier_id)
+            .values(supplier_id=None)
+        )
+        link_products(db, names=[db_supplier.name])
+        cache.touch(db, "suppliers", "products")
         db.commit()
         return db_supplier
     return None
@@ -49,4 +92,41 @@ def get_supplier_by_name(db: Session, name: str):
     """
     Finds a supplier by their exact name.
     """
-    return db.query(model.Supplier).filter(model.Supplier.name == name).first()
\ No newline at end of file
+    return db.query(model.Supplier).filter(model.Supplier.name == name).first()
+
+def supplier_ids_by_name(db: Session, names):
+    """
+    Maps each supplier name in 'names' to its supplier id, in one query.
+    Names are not unique, so the lowest id wins (as in get_supplier_by_name
+    ordered by id); unknown names are left out.
+    """
+    names = {name for name in names if name is not None}
+    if not names:
+        return {}
+    rows = db.execute(
+        select(model.Supplier.name, func.min(model.Supplier.id))
+        .where(model.Supplier.name.in_(names))
+        .group_by(model.Supplier.name)
+    )
+    return dict(rows.all())
+
+def link_products(db: Session, names=None):
+    """
+    Sets supplier_id on every product that has none yet from its supplier
+    name (lowest matching supplier id). 'names' limits it to products with
+    those supplier names. Does not commit.
+    """
+    products = model.Product.__table__
+    supplier_id = (
+        select(func.min(model.Supplier.id))
+        .where(model.Supplier.name == products.c.supplier)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(products)
+        .where(products.c.supplier_id.is_(None), products.c.supplier.in_(select(model.Supplier.name)))
+        .values(supplier_id=supplier_id)
+    )
+    if names is not None:
+        stmt = stmt.where(products.c.supplier.in_(list(names)))
+    db.execute(stmt)
@@ -0,0 +1,41 @@
+# app/crud/crud_version.py
+
+"""
+Per-table version counters.
+
+Every commit that wrote to a table (recorded with cache.touch) adds one
+to that table's version in the same transaction. Readers compare
+versions instead of rows to tell whether anything changed.
+"""
+
+from sqlalchemy.orm import Session
+
+from app.database.session import upsert_insert
+from app.models import model
+
+def bump_versions(db: Session, tables):
+    """
+    Adds one to the version of each table in 'tables'.
+    """
+    if not tables:
+        return
+    table = model.TableVersion.__table__
+    stmt = upsert_insert(db, table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.name],
+        set_={"version": table.c.version + 1}
+    )
+    db.execute(stmt, [{"name": name, "version": 1} for name in sorted(tables)])
+
+def get_versions(db: Session, *tables):
+    """
+    Returns {table: version}. A table that was never written is version 0.
+    """
+    rows = (
+        db.query(model.TableVersion.name, model.TableVersion.version)
+        .filter(model.TableVersion.name.in_(tables))
+        .all()
+    )
+    versions = dict.fromkeys(tables, 0)
+    versions.update({name: version for name, version in rows})
+    return versions
@@ -0,0 +1,58 @@
+# app/crud/pagination.py
+
+"""
+Opaque cursors for keyset pagination.
+
+A cursor is the sort key of the last row on a page, JSON-encoded and then
+base64url-encoded. The next page starts strictly after that key, so it is
+served straight from an index no matter how deep the page is, and rows
+inserted meanwhile never shift the page boundaries.
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from fastapi import HTTPException
+
+def encode_cursor(*values) -> str:
+    key = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(key, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, size: int):
+    """
+    Returns the key stored in 'cursor' as a list of 'size' values,
+    or None for an empty cursor (the first page).
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
+    if not isinstance(key, list) or len(key) != size:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
+    return key
+
+def decode_id_cursor(cursor: str):
+    """
+    Decodes a cursor for a list keyed on 'id' into the last id seen
+    (None for the first page).
+    """
+    key = decode_cursor(cursor, 1)
+    if key is None:
+        return None
+    if not isinstance(key[0], int):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
+    return key[0]
+
+def next_cursor(rows, limit: int, key):
+    """
+    Cursor for the page after 'rows', or None if this was the last page.
+    'key' maps a row to its sort key tuple.
+    """
+    if len(rows) < limit or not rows:
+        return None
+    return encode_cursor(*key(rows[-1]))
@@ -0,0 +1,212 @@
+# app/database/migrations.py
+
+"""
+Versioned schema migrations.
+
+'Base.metadata.create_all()' only creates tables that are missing; it never
+changes a table that already exists. Each migration below upgrades an
+existing database by one step. Applied versions are recorded in the
+'schema_migrations' table, so every migration runs exactly once.
+Migrations must also be safe on a brand-new database that create_all()
+has just built with the latest models.
+
+Data steps are written as plain SQL, frozen as they were when the
+migration was added. They never call the CRUD modules: those follow the
+latest schema (a column a later migration adds, say) and load what they
+need (NumPy for the forecasts) at app startup.
+"""
+
+import logging
+
+from sqlalchemy import inspect, text
+
+from app.models import model
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS = []
+
+def migration(version: int, description: str):
+    """
+    Registers a function as migration number 'version'.
+    """
+    def register(fn):
+        MIGRATIONS.append((version, description, fn))
+        return fn
+    return register
+
+def has_column(conn, table: str, column: str) -> bool:
+    return any(c["name"] == column for c in inspect(conn).get_columns(table))
+
+def create_index(conn, table, name: str):
+    """
+    Creates the index 'name' declared on a model's table, if it is missing.
+    """
+    index = next(i for i in table.indexes if i.name == name)
+    index.create(bind=conn, checkfirst=True)
+
+def add_column(conn, table, name: str):
+    """
+    Adds the column 'name' declared on a model's table, if it is missing.
+    """
+    if has_column(conn, table.name, name):
+        return
+    column = table.c[name]
+    ddl = f"ALTER TABLE {table.name} ADD COLUMN {name} {column.type.compile(dialect=conn.dialect)}"
+    if column.server_default is not None:
+        ddl += f" DEFAULT {column.server_default.arg}"
+    if not column.nullable:
+        ddl += " NOT NULL"
+    conn.execute(text(ddl))
+
+def day_number_sql(conn, column: str) -> str:
+    """
+    SQL for the UTC day of a timestamp column as days since 1970-01-01.
+    """
+    if conn.dialect.name == "postgresql":
+        return f"(date({column}) - DATE '1970-01-01')"
+    return f"CAST(julianday(date({column})) - 2440587.5 AS INTEGER)"
+
+def run_migrations(engine):
+    """
+    Applies every migration that has not been recorded yet, in order.
+    Each migration runs in its own transaction.
+    """
+    model.SchemaMigration.__table__.create(bind=engine, checkfirst=True)
+    with engine.connect() as conn:
+        applied = {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+    for version, description, fn in sorted(MIGRATIONS, key=lambda m: m[0]):
+        if version in applied:
+            continue
+        with engine.begin() as conn:
+            fn(conn)
+            conn.execute(
+                model.SchemaMigration.__table__.insert(),
+                {"version": version, "description": description}
+            )
+        logger.info("Applied migration %s: %s", version, description)
+
+# --- Migrations ---
+
+@migration(1, "Normalize SQLite order timestamps")
+def normalize_order_dates(conn):
+    # Rows written through the 'server_default' are stored as
+    # 'YYYY-MM-DD HH:MM:SS', while SQLAlchemy writes and binds
+    # 'YYYY-MM-DD HH:MM:SS.ffffff'. SQLite compares them as text, so mixed
+    # formats break range and keyset comparisons on order_date.
+    if conn.dialect.name != "sqlite":
+        return
+    for table in ("orders", "purchase_orders"):
+        conn.execute(text(
+            f"UPDATE {table} SET order_date = order_date || '.000000' "
+            f"WHERE length(order_date) = 19"
+        ))
+
+@migration(2, "Index orders by (order_date, id) for keyset pagination")
+def index_orders_by_date(conn):
+    create_index(conn, model.Order.__table__, "ix_orders_order_date_id")
+
+@migration(3, "Store order total and item_count on orders")
+def add_order_totals(conn):
+    add_column(conn, model.Order.__table__, "total")
+    add_column(conn, model.Order.__table__, "item_count")
+    create_index(conn, model.OrderDetail.__table__, "ix_order_details_order_id")
+    conn.execute(text(
+        "UPDATE orders SET "
+        "total = (SELECT coalesce(sum(quantity * price_at_sale), 0.0) FROM order_details WHERE order_id = orders.id), "
+        "item_count = (SELECT count(*) FROM order_details WHERE order_id = orders.id)"
+    ))
+
+@migration(4, "Fill the dashboard KPI store")
+def fill_kpi_store(conn):
+    # create_all() has already created the (empty) KPI tables
+    conn.execute(text("DELETE FROM kpi_daily_sales"))
+    conn.execute(text("DELETE FROM kpi_counters"))
+    conn.execute(text(
+        "INSERT INTO kpi_daily_sales (day, revenue, order_count) "
+        "SELECT date(order_date), coalesce(sum(total), 0.0), count(*) FROM orders "
+        "WHERE order_date IS NOT NULL GROUP BY date(order_date)"
+    ))
+    conn.execute(text(
+        "INSERT INTO kpi_counters (name, value) VALUES "
+        "('pending_orders', (SELECT count(*) FROM orders WHERE status = 'Pending')), "
+        "('low_stock_items', (SELECT count(*) FROM products WHERE \"currentStock\" <= \"reorderPoint\"))"
+    ))
+
+@migration(5, "Add indexes for the dashboard and forecasting hot queries")
+def add_hot_path_indexes(conn):
+    create_index(conn, model.Order.__table__, "ix_orders_status_order_date")
+    create_index(conn, model.OrderDetail.__table__, "ix_order_details_product_id_order_id")
+    create_index(conn, model.PurchaseOrder.__table__, "ix_purchase_orders_status")
+
+@migration(6, "Add products.stock_deficit with a partial low-stock index")
+def add_stock_deficit(conn):
+    if not has_column(conn, "products", "stock_deficit"):
+        # SQLite can only add VIRTUAL generated columns to an existing
+        # table (they can still be indexed); PostgreSQL only has STORED.
+        kind = "STORED" if conn.dialect.name == "postgresql" else "VIRTUAL"
+        conn.execute(text(
+            'ALTER TABLE products ADD COLUMN stock_deficit INTEGER '
+            f'GENERATED ALWAYS AS ("reorderPoint" - "currentStock") {kind}'
+        ))
+    create_index(conn, model.Product.__table__, "ix_products_low_stock")
+
+@migration(7, "Include quantity in the order_details product index")
+def cover_order_details_quantity(conn):
+    index = next(
+        (i for i in inspect(conn).get_indexes("order_details") if i["name"] == "ix_order_details_product_id_order_id"),
+        None
+    )
+    if index is not None and "quantity" not in index["column_names"]:
+        conn.execute(text("DROP INDEX ix_order_details_product_id_order_id"))
+    create_index(conn, model.OrderDetail.__table__, "ix_order_details_product_id_order_id")
+
+@migration(8, "Fill the forecast state")
+def fill_forecast_state(conn):
+    # create_all() has already created the (empty) forecast tables
+    conn.execute(text("DELETE FROM forecast_daily"))
+    conn.execute(text("DELETE FROM forecast_state"))
+    day = day_number_sql(conn, "o.order_date")
+    # Units sold per (product, day)
+    conn.execute(text(
+        "INSERT INTO forecast_daily (product_id, day, quantity) "
+        f"SELECT d.product_id, {day}, coalesce(sum(d.quantity), 0) "
+        "FROM order_details d JOIN orders o ON o.id = d.order_id "
+        f"WHERE d.product_id IS NOT NULL AND o.order_date IS NOT NULL GROUP BY d.product_id, {day}"
+    ))
+    # The regression sums over those days, x = day - first_day
+    conn.execute(text(
+        "INSERT INTO forecast_state "
+        "(product_id, first_day, last_day, days, records, sum_x, sum_y, sum_xy, sum_xx) "
+        "SELECT f.product_id, s.first_day, max(f.day), count(*), r.records, "
+        "sum(f.day - s.first_day), sum(f.quantity), "
+        "sum((f.day - s.first_day) * f.quantity), sum((f.day - s.first_day) * (f.day - s.first_day)) "
+        "FROM forecast_daily f "
+        "JOIN (SELECT product_id, min(day) AS first_day FROM forecast_daily GROUP BY product_id) s "
+        "ON s.product_id = f.product_id "
+        "JOIN (SELECT d.product_id, count(*) AS records FROM order_details d JOIN orders o ON o.id = d.order_id "
+        "WHERE o.order_date IS NOT NULL GROUP BY d.product_id) r "
+        "ON r.product_id = f.product_id "
+        "GROUP BY f.product_id, s.first_day, r.records"
+    ))
+
+@migration(9, "Index purchase order lines by product")
+def index_purchase_order_details_by_product(conn):
+    create_index(conn, model.PurchaseOrderDetail.__table__, "ix_purchase_order_details_product_id")
+
+@migration(10, "Link products to suppliers by supplier_id")
+def add_product_supplier_id(conn):
+    if not has_column(conn, "products", "supplier_id"):
+        # SQLite can add a REFERENCES column as long as it defaults to NULL
+        conn.execute(text(
+            "ALTER TABLE products ADD COLUMN supplier_id INTEGER "
+            "REFERENCES suppliers (id) ON DELETE SET NULL"
+        ))
+    create_index(conn, model.Product.__table__, "ix_products_supplier_id")
+    # Each product's supplier name, matched to the lowest supplier id
+    conn.execute(text(
+        "UPDATE products SET supplier_id = "
+        "(SELECT min(id) FROM suppliers WHERE suppliers.name = products.supplier) "
+        "WHERE supplier_id IS NULL AND supplier IN (SELECT name FROM suppliers)"
+    ))
@@ -1,18 +1,114 @@
+import os
+from functools import lru_cache
+
 from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-# Define the database URL for SQLite
-SQLALCHEMY_DATABASE_URL = "sqlite:///./inventory.db"
+from app.database.sqlite_tuning import SQLITE_PRAGMAS, apply_pragmas
+
+# Define the database URL (SQLite or PostgreSQL)
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./inventory.db")
 
 # Create the SQLAlchemy engine
 # The 'connect_args' is needed only for SQLite to allow multi-threaded interaction
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {}
 )
+# WAL mode and the other SQLITE_PROFILE settings, on every connection
+apply_pragmas(engine)
 
 # Create a SessionLocal class, which will be a factory for new session objects
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# --- Async sessions (used by the async routes) ---
+# Only the session is async. The CRUD functions are still written for a
+# sync Session and the routes run them with AsyncSession.run_sync.
+
+# The async driver for each supported database
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def async_url(url):
+    """
+    The same database as 'url', through its async driver.
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver for {backend!r}; supported: {', '.join(ASYNC_DRIVERS)}")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+def make_async_sessionmaker(url, pragmas=SQLITE_PRAGMAS):
+    """
+    Returns an async_sessionmaker for the database at (sync) 'url'.
+    Objects stay loaded after commit (expire_on_commit=False): an async
+    route reads them after the CRUD call returns, where a lazy reload
+    cannot run.
+    """
+    async_engine = apply_pragmas(create_async_engine(async_url(url)), pragmas)
+    return async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+@lru_cache(maxsize=None)
+def async_session_factory():
+    """
+    The async_sessionmaker for SQLALCHEMY_DATABASE_URL, created on first
+    use so importing this module never needs the async driver.
+    """
+    return make_async_sessionmaker(SQLALCHEMY_DATABASE_URL)
+
 # Create a Base class. Our ORM models will inherit from this class.
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
+
+# --- Request dependencies ---
+
+def get_db():
+    """
+    A Session for sync routes (they run in Starlette's threadpool).
+    """
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    """
+    An AsyncSession for async routes. The CRUD functions are written for
+    a sync Session; call them as 'await db.run_sync(crud_x.fn, ...)'.
+    run_sync runs the function itself on the event-loop thread (only the
+    driver I/O is awaited), so it suits short queries. Long CPU-bound
+    work such as bulk writes belongs on a sync Session from get_db in
+    run_in_threadpool.
+    """
+    async with async_session_factory()() as db:
+        yield db
+
+def upsert_insert(db, table):
+    """
+    Returns an INSERT for 'table' that supports .on_conflict_do_update()
+    on the database behind 'db' (SQLite or PostgreSQL).
+    """
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    return dialect.insert(table)
+
+def begin_read_snapshot(db):
+    """
+    Makes every following query in 'db' read from one consistent snapshot,
+    until the session is closed or rolled back.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        # pysqlite only opens a transaction before writes, so plain SELECTs
+        # would each see the latest commit. An explicit BEGIN holds one
+        # read snapshot for the whole session.
+        conn = db.connection()
+        if not conn.connection.driver_connection.in_transaction:
+            conn.exec_driver_sql("BEGIN")
+    else:
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
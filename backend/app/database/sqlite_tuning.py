@@ -0,0 +1,145 @@
+# app/database/sqlite_tuning.py
+
+"""
+Connection settings and upkeep for SQLite.
+
+Out of the box SQLite uses a rollback journal: while a sale commits, the
+writer holds an exclusive lock on the whole file and every dashboard read
+waits for it. In WAL mode readers keep reading the last committed
+snapshot while a writer appends to the write-ahead log, so reads and
+writes no longer block each other (writers still take turns).
+
+SQLITE_PROFILE picks the PRAGMAs every new connection runs (through a
+'connect' event, so pooled and async connections get them too):
+
+    tuned    WAL, synchronous=NORMAL, a busy timeout and bigger caches (default)
+    default  SQLite's own settings (rollback journal), as before
+
+synchronous=NORMAL is safe in WAL mode: a crash of the app loses nothing,
+a power cut can lose the last commits but never corrupts the file.
+SQLITE_BUSY_TIMEOUT_MS, SQLITE_CACHE_SIZE_KB and SQLITE_MMAP_SIZE_MB
+change single values of the tuned profile.
+
+The WAL is folded back into the database file (a checkpoint) when it
+grows past 1000 pages, by whichever commit crosses that size.
+'sqlite_maintenance' also checkpoints every SQLITE_MAINTENANCE_SECONDS
+and runs 'PRAGMA optimize', which refreshes the planner statistics of
+tables that changed a lot since the last run.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+PROFILES = {
+    "default": {},
+    "tuned": {
+        # Wait this long for a lock instead of failing with "database is locked"
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        # Page cache per connection (a negative size is in KiB)
+        "cache_size": -int(os.getenv("SQLITE_CACHE_SIZE_KB", 32 * 1024)),
+        # Read pages straight from the OS page cache instead of copying them
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE_MB", 256)) * 1024 * 1024,
+        # Sorts and temporary indexes stay in memory
+        "temp_store": "MEMORY",
+    },
+}
+
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "tuned")
+if SQLITE_PROFILE not in PROFILES:
+    raise ValueError(f"Unknown SQLITE_PROFILE {SQLITE_PROFILE!r}; valid profiles: {', '.join(PROFILES)}")
+SQLITE_PRAGMAS = PROFILES[SQLITE_PROFILE]
+
+def apply_pragmas(engine, pragmas=SQLITE_PRAGMAS):
+    """
+    Makes every new connection of 'engine' (sync or async) run 'pragmas'.
+    Does nothing for databases other than SQLite.
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if sync_engine.dialect.name != "sqlite" or not pragmas:
+        return engine
+
+    @event.listens_for(sync_engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+    return engine
+
+class SQLiteMaintenance:
+    """
+    Runs a WAL checkpoint and 'PRAGMA optimize' every 'interval' seconds
+    on a background thread.
+    """
+    def __init__(self, interval: float = 300, checkpoint_mode: str = "PASSIVE"):
+        self.interval = interval
+        # PASSIVE copies what it can without waiting for readers or writers
+        self.checkpoint_mode = checkpoint_mode
+        self._thread = None
+        self._stop = threading.Event()
+        self.runs = 0
+        self.failures = 0
+        self.last_checkpoint = None
+        self.last_run_ms = None
+
+    def run_once(self, engine):
+        """
+        Checkpoints and optimizes the database behind 'engine' now.
+        """
+        start = time.perf_counter()
+        with engine.connect() as conn:
+            busy, wal_pages, checkpointed = conn.exec_driver_sql(f"PRAGMA wal_checkpoint({self.checkpoint_mode})").one()
+            conn.exec_driver_sql("PRAGMA optimize")
+        self.runs += 1
+        # (-1, -1) when the database is not in WAL mode
+        self.last_checkpoint = {"busy": bool(busy), "wal_pages": wal_pages, "checkpointed_pages": checkpointed}
+        self.last_run_ms = (time.perf_counter() - start) * 1000
+
+    def start(self, engine):
+        """
+        Starts the background thread (once). Does nothing for databases
+        other than SQLite, or when 'interval' is 0.
+        """
+        if engine.dialect.name != "sqlite" or self.interval <= 0:
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, args=(engine,), name="sqlite-maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self, engine):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once(engine)
+            except Exception:
+                # A locked or busy database is retried on the next run
+                self.failures += 1
+                logger.exception("SQLite maintenance failed")
+
+    def stats(self):
+        return {
+            "profile": SQLITE_PROFILE,
+            "pragmas": SQLITE_PRAGMAS,
+            "interval_seconds": self.interval,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_checkpoint": self.last_checkpoint,
+            "last_run_ms": self.last_run_ms,
+        }
+
+sqlite_maintenance = SQLiteMaintenance(interval=float(os.getenv("SQLITE_MAINTENANCE_SECONDS", 300)))
@@ -0,0 +1,190 @@
+# app/events.py
+
+"""
+Live change events for the dashboard and orders pages.
+
+CRUD write paths call 'emit(db, type, data)'. The events are held on the
+session and published only after it commits (a rollback drops them),
+so clients never see a change that did not happen.
+
+The broker fans events out to one bounded buffer per subscriber, on the
+event loop that serves the subscribers. Commits that arrive while
+a fan-out is pending are merged into it, so each queue slot holds one or
+more commits' events. Events are serialized to Server-Sent Events text once, not
+once per client.
+A client that falls behind is never allowed to slow down the writers
+or the other clients: when its queue is full its pending events are
+dropped and replaced by a single 'resync' event, which tells it to
+re-fetch instead of applying deltas.
+
+Like the result cache, the broker is per process; clients only see
+writes made by the worker they are connected to.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import threading
+from collections import deque
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+RESYNC = "resync"
+
+# A comment line sent to every client this often, so proxies and the
+# browser keep idle connections open
+HEARTBEAT_SECONDS = 15
+HEARTBEAT = ": keep-alive\n\n"
+
+def format_sse(event_id: int, event_type: str, data) -> str:
+    payload = json.dumps(data, separators=(",", ":"), default=str)
+    return f"id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n"
+
+class Subscriber:
+    """
+    One client's bounded buffer of chunks waiting to be sent. It does the
+    job of an asyncio.Queue with less work per put, which is what the
+    fan-out to thousands of clients spends its time on.
+    """
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.pending = deque()
+        self.resyncs = 0
+        self._waiter = None
+
+    def push(self, chunk: str) -> bool:
+        """
+        Buffers 'chunk'. Returns False, and buffers nothing, if it is full.
+        """
+        if len(self.pending) >= self.queue_size:
+            return False
+        self.pending.append(chunk)
+        self._wake()
+        return True
+
+    def reset(self, chunk: str):
+        """
+        Drops everything buffered and leaves only 'chunk'.
+        """
+        self.pending.clear()
+        self.pending.append(chunk)
+        self._wake()
+
+    def _wake(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def next_chunk(self) -> str:
+        """
+        Waits until something is buffered, then returns all of it as one string.
+        """
+        while not self.pending:
+            self._waiter = asyncio.get_running_loop().create_future()
+            await self._waiter
+        self._waiter = None
+        chunk = "".join(self.pending)
+        self.pending.clear()
+        return chunk
+
+class EventBroker:
+    def __init__(self, queue_size: int = 256):
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self._loop = None
+        self._heartbeat = None
+        self._ids = itertools.count(1)
+        self._pending = [] # chunks published but not yet fanned out
+        self._pending_count = 0
+        self._lock = threading.Lock()
+        self.published = 0
+        self.resyncs = 0
+
+    def subscribe(self) -> Subscriber:
+        """
+        Registers a new client. Must be called from the event loop that
+        will read the subscriber's chunks.
+        """
+        self._loop = asyncio.get_running_loop()
+        if self._heartbeat is None or self._heartbeat.done():
+            # One timer for all clients, rather than a timeout per client
+            self._heartbeat = self._loop.create_task(self._send_heartbeats())
+        subscriber = Subscriber(self.queue_size)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+
+    def publish(self, events):
+        """
+        Sends a list of (type, data) events to every subscriber.
+        Safe to call from any thread; the fan-out runs on the event loop.
+        """
+        if not events or not self._subscribers or self._loop is None:
+            return
+        with self._lock:
+            chunk = "".join(format_sse(next(self._ids), event_type, data) for event_type, data in events)
+            self._pending.append(chunk)
+            self._pending_count += len(events)
+            if len(self._pending) > 1:
+                return # a fan-out is already scheduled and will take this too
+            try:
+                self._loop.call_soon_threadsafe(self._fan_out)
+            except RuntimeError:
+                # The loop has been closed (e.g. during shutdown)
+                self._pending.clear()
+                self._pending_count = 0
+
+    async def _send_heartbeats(self):
+        while self._subscribers:
+            await asyncio.sleep(HEARTBEAT_SECONDS)
+            for subscriber in list(self._subscribers):
+                if not subscriber.pending:
+                    subscriber.push(HEARTBEAT)
+
+    def _fan_out(self):
+        # Everything published since the last fan-out goes out as one chunk:
+        # one queue slot and one write per client. Under a burst of commits
+        # the clients wake once per fan-out, not once per commit.
+        with self._lock:
+            chunk = "".join(self._pending)
+            count = self._pending_count
+            self._pending.clear()
+            self._pending_count = 0
+        self.published += count
+        for subscriber in list(self._subscribers):
+            if subscriber.push(chunk):
+                continue
+
+            # Too slow: replace everything it has not read with one resync
+            with self._lock:
+                subscriber.reset(format_sse(next(self._ids), RESYNC, {}))
+            subscriber.resyncs += 1
+            self.resyncs += 1
+
+    def stats(self):
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "resyncs": self.resyncs,
+        }
+
+event_broker = EventBroker(queue_size=int(os.getenv("EVENT_QUEUE_SIZE", 256)))
+
+def emit(db: Session, event_type: str, data):
+    """
+    Queues an event on 'db'; it is published when the session commits.
+    """
+    db.info.setdefault("pending_events", []).append((event_type, data))
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session):
+    events = session.info.pop("pending_events", None)
+    if events:
+        event_broker.publish(events)
+
+@event.listens_for(Session, "after_rollback")
+def _drop_after_rollback(session):
+    session.info.pop("pending_events", None)
@@ -0,0 +1,115 @@
+# app/forecast_pool.py
+
+"""
+Worker processes for CPU-heavy forecast work.
+
+A sync route runs in Starlette's shared threadpool, so Python work done
+there holds the GIL and delays every other request in the process. The
+whole-catalog forecast reads and solves up to one row per product; it is
+sent to a small ProcessPoolExecutor instead, and the request thread just
+waits for the result (which does not hold the GIL).
+
+FORECAST_WORKERS sets the number of processes (0 runs the work inline,
+in the calling thread). At most FORECAST_QUEUE_LIMIT jobs wait behind the
+running ones; past that, 'run' raises PoolBusy at once instead of
+letting requests pile up. The workers run at a lower CPU priority
+(FORECAST_NICE, on systems that have os.nice), so on a busy machine the
+API's own requests are scheduled first.
+
+The processes are started with 'spawn' on first use, so the API starts
+without them and they never inherit the server's threads or database
+connections. Jobs and results are pickled: pass ids and NumPy arrays, not
+ORM objects.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+def _lower_priority(increment: int):
+    # Runs once in every new worker process
+    if increment and hasattr(os, "nice"):
+        os.nice(increment)
+
+class PoolBusy(Exception):
+    """
+    Raised by 'run' when the pool's queue is full.
+    """
+
+class ForecastPool:
+    def __init__(self, workers: int = 2, queue_limit: int = 8, nice: int = 10):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.nice = nice
+        self._executor = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0 # raised an exception (the job's own, or a dead worker)
+        self.rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def run(self, fn, *args):
+        """
+        Runs 'fn(*args)' in a worker process and returns its result.
+        'fn' must be a module-level function. Raises PoolBusy if
+        'workers + queue_limit' jobs are already in flight.
+        """
+        with self._lock:
+            if self.in_flight >= self.workers + self.queue_limit:
+                self.rejected += 1
+                raise PoolBusy()
+            self.in_flight += 1
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_lower_priority,
+                    initargs=(self.nice,),
+                )
+            executor = self._executor
+        succeeded = False
+        try:
+            result = executor.submit(fn, *args).result()
+            succeeded = True
+            return result
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a new pool next time
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                if succeeded:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+forecast_pool = ForecastPool(
+    workers=int(os.getenv("FORECAST_WORKERS", 2)),
+    queue_limit=int(os.getenv("FORECAST_QUEUE_LIMIT", 8)),
+    nice=int(os.getenv("FORECAST_NICE", 10)),
+)
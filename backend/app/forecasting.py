@@ -0,0 +1,149 @@
+# app/forecasting.py
+
+"""
+Demand forecasting models.
+
+Every model forecasts many products at once: it works on arrays with one
+entry (or one row) per product, and only loops over days, never over
+products. A model is a function registered under a name with
+'@register(name, window)' and called as
+
+    fn(state, series, forecast_days) -> (products x forecast_days) array
+
+'state' is a dict of per-product arrays named like the forecast_state
+columns (plus 'product_id'). Models with a 'window' also get 'series':
+units sold per day over the last 'window' days up to 'state["series_end"]'
+(yesterday, the last full day, or the last sale day if that is later), as
+a float matrix with NaN for the days before its first sale (days without
+a sale after that are 0). 'predict' clips the daily forecasts at zero and
+returns their rounded totals.
+
+The smoothing models forecast the days after 'series_end', so a product
+that stopped selling weeks ago is forecast from those empty weeks, and
+one that sells every day is forecast from today on. The
+straight-line model starts the day after the product's last sale, as the
+original implementation did.
+
+NumPy is imported at the top of this module. Import the module inside the
+functions that use it, so the API starts without NumPy.
+"""
+
+import numpy as np
+
+# Rows of the (products x forecast days) prediction matrix built at a time
+FORECAST_CHUNK_CELLS = 1_000_000
+
+MODELS = {} # name -> (window, fn)
+
+def register(name: str, window: int = None):
+    def decorator(fn):
+        MODELS[name] = (window, fn)
+        return fn
+    return decorator
+
+def weekday(day_numbers):
+    """
+    Monday = 0 for days counted from 1970-01-01 (a Thursday).
+    """
+    return (day_numbers + 3) % 7
+
+def predict(model_name: str, state, series, forecast_days: int):
+    """
+    Total forecast demand over the next 'forecast_days' days, per product.
+    """
+    _, fn = MODELS[model_name]
+    count = len(state["days"])
+    if forecast_days <= 0:
+        return np.zeros(count, dtype=int) # nothing to forecast
+    totals = np.empty(count)
+    chunk = max(1, FORECAST_CHUNK_CELLS // forecast_days)
+    for i in range(0, count, chunk):
+        part = slice(i, i + chunk)
+        daily = fn(
+            {name: values[part] for name, values in state.items()},
+            None if series is None else series[part],
+            forecast_days,
+        )
+        totals[part] = np.clip(daily, 0, None).sum(axis=1)
+    return np.rint(totals).astype(int)
+
+# --- Straight line over the whole history ---
+
+@register("linear")
+def linear_trend(state, series, forecast_days: int):
+    """
+    Least-squares line y = a + b*x through every daily bucket, solved from
+    the running sums. Days without sales are not points on the line.
+    """
+    n = state["days"]
+    # n*Sxx and n*Sxy are exact in integers; only the division is rounded
+    sxx = n * state["sum_xx"] - state["sum_x"] * state["sum_x"]
+    sxy = n * state["sum_xy"] - state["sum_x"] * state["sum_y"]
+    slope = sxy / sxx
+    intercept = (state["sum_y"] - slope * state["sum_x"]) / n
+    last_x = (state["last_day"] - state["first_day"]).astype(float)
+    steps = np.arange(1, forecast_days + 1)
+    return intercept[:, None] + slope[:, None] * (last_x[:, None] + steps)
+
+# --- Exponential smoothing over recent days ---
+
+# Smoothing weights of the level, trend and weekday terms, and the trend
+# damping: each forecast day keeps PHI of the previous day's trend.
+ALPHA = 0.1
+BETA = 0.01
+GAMMA = 0.2
+PHI = 0.9
+
+def _damped_steps(forecast_days: int):
+    # PHI + PHI^2 + ... + PHI^h for h = 1..forecast_days
+    return np.cumsum(PHI ** np.arange(1, forecast_days + 1))
+
+@register("exponential", window=91)
+def damped_trend(state, series, forecast_days: int):
+    """
+    Holt's exponential smoothing with a damped trend, over every day
+    (including days without sales) of the last 13 weeks.
+    """
+    count, days = series.shape
+    level = np.zeros(count)
+    trend = np.zeros(count)
+    started = np.zeros(count, dtype=bool)
+    for t in range(days):
+        y = series[:, t]
+        seen = ~np.isnan(y)
+        update = seen & started
+        new_level = ALPHA * y + (1 - ALPHA) * (level + PHI * trend)
+        trend = np.where(update, BETA * (new_level - level) + (1 - BETA) * PHI * trend, trend)
+        level = np.where(update, new_level, np.where(seen & ~started, y, level))
+        started |= seen
+    return level[:, None] + trend[:, None] * _damped_steps(forecast_days)
+
+@register("seasonal", window=182)
+def weekly_holt_winters(state, series, forecast_days: int):
+    """
+    Additive Holt-Winters: damped-trend exponential smoothing plus one
+    smoothed offset per day of the week, over the last 26 weeks. Suits
+    products that sell mostly on some weekdays (e.g. weekends).
+    """
+    count, days = series.shape
+    rows = np.arange(count)
+    level = np.zeros(count)
+    trend = np.zeros(count)
+    season = np.zeros((count, 7))
+    started = np.zeros(count, dtype=bool)
+    first_weekday = weekday(state["series_end"] - (days - 1))
+    for t in range(days):
+        y = series[:, t]
+        seen = ~np.isnan(y)
+        update = seen & started
+        day = (first_weekday + t) % 7
+        offset = season[rows, day]
+        new_level = ALPHA * (y - offset) + (1 - ALPHA) * (level + PHI * trend)
+        trend = np.where(update, BETA * (new_level - level) + (1 - BETA) * PHI * trend, trend)
+        season[rows, day] = np.where(update, GAMMA * (y - new_level) + (1 - GAMMA) * offset, offset)
+        level = np.where(update, new_level, np.where(seen & ~started, y, level))
+        started |= seen
+
+    ahead = np.arange(1, forecast_days + 1)
+    future_days = weekday(state["series_end"][:, None] + ahead)
+    return level[:, None] + trend[:, None] * _damped_steps(forecast_days) + season[rows[:, None], future_days]
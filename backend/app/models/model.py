@@ -1,6 +1,8 @@
 # app/models/model.py
 
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, BigInteger, String, Float, ForeignKey, Date, DateTime, Index, Computed, literal_column
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database.session import Base # Absolute import
@@ -15,7 +17,29 @@ class Product(Base):
     category = Column(String, index=True)
     currentStock = Column(Integer)
     reorderPoint = Column(Integer)
+    # The supplier's name, as the API sends and shows it. supplier_id is
+    # the link the reorder paths use; the name is kept in step with it.
     supplier = Column(String)
+    supplier_id = Column(Integer, ForeignKey("suppliers.id", ondelete="SET NULL"), nullable=True)
+
+    # How far stock is below the reorder point (>= 0 means "low stock").
+    # Computed by the database, so every write path keeps it correct.
+    stock_deficit = Column(Integer, Computed('"reorderPoint" - "currentStock"', persisted=True))
+
+    __table_args__ = (
+        # Partial index holding only low-stock products, most severe first
+        Index(
+            "ix_products_low_stock",
+            stock_deficit.desc(),
+            sqlite_where=stock_deficit >= literal_column("0"),
+            postgresql_where=stock_deficit >= literal_column("0"),
+        ),
+        Index("ix_products_supplier_id", "supplier_id"),
+    )
+
+# Filter for low-stock products. It must use a literal 0 (not a bound
+# parameter) so it matches the partial index's WHERE clause exactly.
+LOW_STOCK = Product.stock_deficit >= literal_column("0")
 
 class Supplier(Base):
     __tablename__ = "suppliers"
@@ -45,12 +69,26 @@ class Order(Base):
     __tablename__ = "orders"
     id = Column(Integer, primary_key=True, index=True)
     customer_id = Column(Integer, ForeignKey("customers.id"), nullable=True)
-    order_date = Column(DateTime(timezone=True), server_default=func.now())
+    # Set from Python (UTC, like CURRENT_TIMESTAMP) so every row is stored in
+    # the same format and can be compared and paginated reliably.
+    order_date = Column(DateTime(timezone=True), default=datetime.utcnow, server_default=func.now())
     
     status = Column(String, default="Pending") # e.g., Pending, Shipped, Delivered
 
+    # Kept in step with the order's line items by every write path in
+    # crud_order, so listing orders never has to aggregate order_details.
+    total = Column(Float, nullable=False, default=0.0, server_default="0")
+    item_count = Column(Integer, nullable=False, default=0, server_default="0")
+
     items = relationship("OrderDetail", back_populates="order")
     customer = relationship("Customer")
+
+    __table_args__ = (
+        # Serves the newest-first orders list and its keyset pagination
+        Index("ix_orders_order_date_id", "order_date", "id"),
+        # Serves "pending orders" counts and "pending and older than X" filters
+        Index("ix_orders_status_order_date", "status", "order_date"),
+    )
     
 class OrderDetail(Base):
     __tablename__ = "order_details"
@@ -63,16 +101,27 @@ class OrderDetail(Base):
     order = relationship("Order", back_populates="items")
     product = relationship("Product")
 
+    __table_args__ = (
+        Index("ix_order_details_order_id", "order_id"),
+        # Serves per-product sales history (forecasting) joined to orders.
+        # 'quantity' is included so the daily sums never read the table rows.
+        Index("ix_order_details_product_id_order_id", "product_id", "order_id", "quantity"),
+    )
+
 class PurchaseOrder(Base):
     __tablename__ = "purchase_orders"
     id = Column(Integer, primary_key=True, index=True)
     supplier_id = Column(Integer, ForeignKey("suppliers.id"))
-    order_date = Column(DateTime(timezone=True), server_default=func.now())
+    order_date = Column(DateTime(timezone=True), default=datetime.utcnow, server_default=func.now())
     status = Column(String, default="Pending") # e.g., Pending, Approved, Received
 
     items = relationship("PurchaseOrderDetail", back_populates="purchase_order")
     supplier = relationship("Supplier")
 
+    __table_args__ = (
+        Index("ix_purchase_orders_status", "status"),
+    )
+
 class PurchaseOrderDetail(Base):
     __tablename__ = "purchase_order_details"
     id = Column(Integer, primary_key=True, index=True)
@@ -81,4 +130,65 @@ class PurchaseOrderDetail(Base):
     quantity = Column(Integer)
 
     purchase_order = relationship("PurchaseOrder", back_populates="items")
-    product = relationship("Product")
\ No newline at end of file
+    product = relationship("Product")
+
+    __table_args__ = (
+        # "Is this product already on an open purchase order?" (reorder planner)
+        Index("ix_purchase_order_details_product_id", "product_id", "purchase_order_id"),
+    )
+
+class SchemaMigration(Base):
+    """ One row per migration applied by app/database/migrations.py """
+    __tablename__ = "schema_migrations"
+    version = Column(Integer, primary_key=True)
+    description = Column(String)
+    applied_at = Column(DateTime(timezone=True), default=datetime.utcnow, server_default=func.now())
+
+# --- KPI store ---
+# Maintained by the CRUD write paths (see crud_kpi.py) so the dashboard can
+# read its numbers directly instead of aggregating the base tables.
+
+class DailySalesKPI(Base):
+    __tablename__ = "kpi_daily_sales"
+    day = Column(Date, primary_key=True) # UTC day of orders.order_date
+    revenue = Column(Float, nullable=False, default=0.0)
+    order_count = Column(Integer, nullable=False, default=0)
+
+class KPICounter(Base):
+    __tablename__ = "kpi_counters"
+    name = Column(String, primary_key=True) # e.g., "pending_orders", "low_stock_items"
+    value = Column(Integer, nullable=False, default=0)
+
+# --- Forecast state ---
+# Maintained by the sale write paths (see crud_forecast.py) so a demand
+# forecast reads one row instead of the product's whole sales history.
+# Days are day numbers: days since 1970-01-01 (UTC).
+
+class ForecastDaily(Base):
+    __tablename__ = "forecast_daily"
+    product_id = Column(Integer, primary_key=True)
+    day = Column(Integer, primary_key=True)
+    quantity = Column(BigInteger, nullable=False, default=0) # units sold that day
+
+class ForecastState(Base):
+    __tablename__ = "forecast_state"
+    product_id = Column(Integer, primary_key=True)
+    first_day = Column(Integer, nullable=False) # x = day - first_day
+    last_day = Column(Integer, nullable=False)
+    days = Column(Integer, nullable=False, default=0) # n: days with sales
+    records = Column(Integer, nullable=False, default=0) # order_details rows
+    # Running least-squares sums over the daily buckets (y = units sold)
+    sum_x = Column(BigInteger, nullable=False, default=0)
+    sum_y = Column(BigInteger, nullable=False, default=0)
+    sum_xy = Column(BigInteger, nullable=False, default=0)
+    sum_xx = Column(BigInteger, nullable=False, default=0)
+
+# --- Table versions ---
+# Bumped in the same transaction as every write that goes through
+# cache.touch(), so a list endpoint can tell whether its rows changed
+# (see app/api/conditional.py) without reading them.
+
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+    name = Column(String, primary_key=True) # table name, e.g. "products"
+    version = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,94 @@
+# app/password_pool.py
+
+"""
+A small, dedicated thread pool for bcrypt.
+
+Hashing or checking a password takes a few hundred milliseconds of CPU.
+Run in a sync route, that time holds one of the threads of Starlette's
+shared threadpool, so a burst of logins (everyone signing in at shift
+start) takes every thread and stalls all other sync routes. The auth
+routes are async instead and send only the bcrypt call here; the event
+loop and the shared threadpool stay free while it runs. bcrypt releases
+the GIL, so threads (not processes) are enough.
+
+PASSWORD_WORKERS sets the number of threads (0 runs the work in
+Starlette's threadpool, as before). At most PASSWORD_QUEUE_LIMIT calls
+wait behind the running ones; past that, 'run' raises PoolBusy at once
+and the route answers 503 with Retry-After.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.concurrency import run_in_threadpool
+
+class PoolBusy(Exception):
+    """
+    Raised by 'run' when the pool's queue is full.
+    """
+
+class PasswordPool:
+    def __init__(self, workers: int = 2, queue_limit: int = 32):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._executor = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    async def run(self, fn, *args):
+        """
+        Runs 'fn(*args)' in a pool thread and returns its result. Raises
+        PoolBusy if 'workers + queue_limit' calls are already in flight.
+        """
+        if not self.enabled:
+            return await run_in_threadpool(fn, *args)
+        with self._lock:
+            if self.in_flight >= self.workers + self.queue_limit:
+                self.rejected += 1
+                raise PoolBusy()
+            self.in_flight += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password")
+            executor = self._executor
+        succeeded = False
+        try:
+            result = await asyncio.wrap_future(executor.submit(fn, *args))
+            succeeded = True
+            return result
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                if succeeded:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+password_pool = PasswordPool(
+    workers=int(os.getenv("PASSWORD_WORKERS", 2)),
+    queue_limit=int(os.getenv("PASSWORD_QUEUE_LIMIT", 32)),
+)
@@ -54,6 +54,11 @@ class Supplier(SupplierBase):
     class Config:
         from_attributes = True
 
+# One page of suppliers when using cursor pagination
+class SupplierPage(BaseModel):
+    items: List[Supplier]
+    next_cursor: Optional[str] = None
+
 # --- END OF SUPPLIER SCHEMAS ---
 
 # --- Customer Schemas ---
@@ -71,6 +76,10 @@ class Customer(CustomerBase):
     id: int
     class Config:
         from_attributes = True
+
+class CustomerPage(BaseModel):
+    items: List[Customer]
+    next_cursor: Optional[str] = None
         
 # --- END OF CUSTOMER SCHEMAS ---
 
@@ -100,9 +109,26 @@ class ProductUpdate(BaseModel):
 # This is what the API will return (includes the ID)
 class Product(ProductBase):
     id: int
+    supplier_id: Optional[int] = None
     class Config:
         from_attributes = True
 
+# One page of products when using cursor pagination
+class ProductPage(BaseModel):
+    items: List[Product]
+    next_cursor: Optional[str] = None
+
+class ImportRowError(BaseModel):
+    line: int
+    detail: str
+
+class ProductImportSummary(BaseModel):
+    inserted: int
+    updated: int
+    unchanged: int # Same as the stored product, or replaced by a later row for its SKU
+    rejected: int
+    errors: List[ImportRowError] # Only the first few rejected rows are listed
+
 # --- Sales Schemas ---
 
 class ItemSold(BaseModel):
@@ -118,6 +144,17 @@ class SaleResponse(BaseModel):
     status: str
     detail: str
 
+class BulkSaleResult(BaseModel):
+    line: int # 1-based line number in the uploaded NDJSON body
+    status: str # "success" or "error"
+    sale_id: Optional[int] = None
+    detail: str
+
+class BulkSaleResponse(BaseModel):
+    accepted: int
+    rejected: int
+    results: List[BulkSaleResult]
+
 # --- Dashboard Schemas ---
 
 class DashboardKPIs(BaseModel):
@@ -157,10 +194,34 @@ class ReorderSuggestion(BaseModel):
     current_quantity: int
     reorder_point: int
     recommended_order_quantity: int = 100 # Default placeholder for now
+    supplier: Optional[str] = None # the supplier name on the product
+    supplier_id: Optional[int] = None # None when the product is not linked to a supplier
+    forecast_demand: Optional[int] = None # None when there is too little sales history
 
     class Config:
         from_attributes = True
 
+class SupplierReorderGroup(BaseModel):
+    supplier_id: Optional[int]
+    supplier_name: Optional[str]
+    items: List[ReorderSuggestion]
+
+class ReorderPlanRequest(BaseModel):
+    cover_days: int = Field(30, ge=1, le=365) # order enough stock for this many days of demand
+    forecast_model: str = "linear"
+    product_ids: Optional[List[int]] = None # None means every low-stock product
+
+class ReorderPlanOrder(BaseModel):
+    purchase_order_id: int
+    supplier_id: int
+    item_count: int
+    total_quantity: int
+
+class ReorderPlanResponse(BaseModel):
+    purchase_orders: List[ReorderPlanOrder]
+    # Low-stock products not linked to any supplier
+    skipped: List[ReorderSuggestion]
+
 class PurchaseOrderItemCreate(BaseModel):
     product_id: int
     quantity: int
@@ -179,13 +240,32 @@ class PriorityTask(BaseModel):
     description: str
     link_to: str # e.g., "/orders", "/inventory/1"
 
+class DashboardSummary(BaseModel):
+    """ Everything the dashboard page needs, in one response """
+    kpis: DashboardKPIs
+    low_stock_alerts: List[LowStockAlert]
+    priority_tasks: List[PriorityTask]
+
 # --- Prediction Schemas ---
 
 class DemandPrediction(BaseModel):
     product_id: int
     forecast_period_days: int
+    forecast_model: str = "linear"
     predicted_demand: int
 
+class DemandBatchRequest(BaseModel):
+    product_ids: Optional[List[int]] = None # None means every product with sales
+    forecast_days: int = Field(30, ge=1, le=365)
+    forecast_model: str = "linear" # 'linear', 'exponential' or 'seasonal' (app/forecasting.py)
+
+class DemandBatchResponse(BaseModel):
+    forecast_period_days: int
+    forecast_model: str = "linear"
+    # Products without enough history (two sales on two different days)
+    # are left out, just as the single-product endpoint answers 400
+    predictions: List[DemandPrediction]
+
 class Order(BaseModel):
     id: int
     customer_name: str
@@ -195,6 +275,11 @@ class Order(BaseModel):
 
     class Config:
         from_attributes = True
+
+class OrderPage(BaseModel):
+    items: List[Order]
+    next_cursor: Optional[str] = None
+
 class OrderDetailProduct(BaseModel):
     """ A schema for the product details inside an order """
     name: str
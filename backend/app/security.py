@@ -1,6 +1,7 @@
 # app/security.py
 
 import os
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -9,10 +10,12 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # Use absolute imports for clarity and consistency
-from app.database.session import SessionLocal
+from app.cache import token_cache
+from app.database.session import get_async_db
+from app.password_pool import PoolBusy, password_pool
 from app.crud import crud_login
 from app.schemas import schema
 
@@ -22,9 +25,11 @@ load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+# bcrypt cost. Stored hashes made with another cost are rehashed at login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
 
 # --- Security Utilities ---
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login") # Tells Swagger where to log in
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -33,6 +38,30 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+async def _run_password_work(fn, *args):
+    try:
+        return await password_pool.run(fn, *args)
+    except PoolBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins are in progress. Please try again shortly.",
+            headers={"Retry-After": "1"},
+        )
+
+async def hash_password(password: str) -> str:
+    """
+    get_password_hash, run in password_pool (for async routes).
+    """
+    return await _run_password_work(pwd_context.hash, password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str):
+    """
+    Checks a password in password_pool. Returns (verified, new_hash);
+    new_hash is set when the stored hash is outdated (pwd_context.needs_update)
+    and should be replaced.
+    """
+    return await _run_password_work(pwd_context.verify_and_update, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -42,17 +71,22 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-# --- Database Dependency ---
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 # --- THIS IS THE MISSING FUNCTION ---
 # This function will be used as a dependency to protect routes.
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> schema.UserInDB:
+    """
+    Returns the id and email of the user the bearer token belongs to.
+    A validated token is kept in token_cache until its 'exp' (or until a
+    user changes), so repeat requests skip the JWT decode and the user
+    query.
+    """
+    if token_cache.enabled:
+        hit, user = token_cache.get(token)
+        if hit:
+            return user
+    # A user change committed while we look this one up must not be cached over
+    generation = token_cache.generation
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -67,7 +101,16 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     except JWTError:
         raise credentials_exception
     
-    user = crud_login.get_user_by_email(db, email=token_data.email)
-    if user is None:
+    db_user = await db.run_sync(crud_login.get_user_by_email, email=token_data.email)
+    if db_user is None:
         raise credentials_exception
-    return user
\ No newline at end of file
+    user = schema.UserInDB.model_validate(db_user)
+
+    if token_cache.enabled:
+        # 'exp' is a UTC timestamp; decode() has already rejected expired tokens
+        ttl = token_cache.ttl
+        if "exp" in payload:
+            ttl = min(ttl, payload["exp"] - time.time())
+        if ttl > 0:
+            token_cache.set(token, user, tags=("users",), ttl=ttl, generation=generation)
+    return user
@@ -0,0 +1,115 @@
+# benchmarks/bench_async_db.py
+
+"""
+Requests per second at 1, 100 and 1,000 concurrent clients, for the async
+routes (AsyncSession on aiosqlite) and for sync copies of the same routes
+(a Session per request, run in Starlette's threadpool, as the routes used
+to be).
+
+    python -m benchmarks.bench_async_db [--requests 3000] [--clients 1 100 1000] [--write-ratio 0.1]
+
+The app runs in-process behind httpx's ASGI transport, so the requests go
+through the real event loop and threadpool (the clients share the one
+process and CPU with it). Every client sends requests back to back: a
+product by id or the dashboard KPIs, and a one-item sale for
+'--write-ratio' of them. 'errors' counts responses other than 200, and
+requests given up after '--timeout' seconds.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.api.endpoints import dashboard, orders, products
+from app.crud import crud_dashboard, crud_order, crud_product
+from app.database import session
+from app.schemas import schema
+from benchmarks.common import make_app, make_database, seed_products, summarize, print_table
+
+# The same three routes as sync 'def' functions
+sync_router = APIRouter()
+
+@sync_router.get("/products/{product_id}", response_model=schema.Product)
+def read_one_product(product_id: int, db: Session = Depends(session.get_db)):
+    db_product = crud_product.get_product(db, product_id=product_id)
+    if db_product is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return db_product
+
+@sync_router.get("/dashboard/kpis", response_model=schema.DashboardKPIs)
+def get_dashboard_kpi_data(db: Session = Depends(session.get_db)):
+    return crud_dashboard.get_dashboard_kpis(db=db)
+
+@sync_router.post("/orders/sales", response_model=schema.SaleResponse)
+def record_new_sale(sale: schema.SaleCreate, db: Session = Depends(session.get_db)):
+    new_order = crud_order.create_sale(db=db, sale=sale)
+    return {"sale_id": new_order.id, "status": "success", "detail": "Inventory levels updated successfully."}
+
+async def client_loop(client, requests: int, catalog: int, write_ratio: float, timeout: float, latencies, errors, seed: int):
+    rng = random.Random(seed)
+    for _ in range(requests):
+        roll = rng.random()
+        if roll < write_ratio:
+            request = client.post("/orders/sales", json={"items_sold": [{"product_id": rng.randint(1, catalog), "quantity": 1}]})
+        elif roll < write_ratio + (1 - write_ratio) * 0.2:
+            request = client.get("/dashboard/kpis")
+        else:
+            request = client.get(f"/products/{rng.randint(1, catalog)}")
+        start = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(request, timeout)
+        except asyncio.TimeoutError:
+            errors.append("timeout")
+            continue
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            errors.append(response.status_code)
+
+async def run(app, clients: int, requests: int, catalog: int, write_ratio: float, timeout: float):
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        latencies, errors = [], []
+        per_client = max(1, requests // clients)
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            client_loop(client, per_client, catalog, write_ratio, timeout, latencies, errors, seed)
+            for seed in range(clients)
+        ))
+        elapsed = time.perf_counter() - start
+    return (len(latencies) - sum(1 for e in errors if e != "timeout")) / elapsed, summarize(latencies), len(errors)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=3_000)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 100, 1000])
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--timeout", type=float, default=10, help="seconds before a request counts as failed")
+    args = parser.parse_args()
+
+    rows = []
+    for name, routes in (
+        ("sync (threadpool)", ((sync_router, ""),)),
+        ("async (AsyncSession)", ((products.router, "/products"), (dashboard.router, "/dashboard"), (orders.router, "/orders"))),
+    ):
+        engine, SessionLocal = make_database("async-db")
+        db = SessionLocal()
+        seed_products(db, args.products)
+        db.close()
+        for clients in args.clients:
+            # A new app (and async engine) per run: pooled aiosqlite
+            # connections belong to the event loop that opened them
+            app = make_app(SessionLocal, *routes)
+            rate, stats, errors = asyncio.run(run(app, clients, args.requests, args.products, args.write_ratio, args.timeout))
+            rows.append((name, clients, f"{rate:,.0f}", f"{stats['p50_ms']:.1f}", f"{stats['p99_ms']:.1f}", errors))
+        engine.dispose()
+
+    print_table(("routes", "clients", "ok requests/s", "p50 ms", "p99 ms", "errors"), rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/bench_auth_cache.py
+
+"""
+Authenticated request throughput with and without the token cache.
+
+    python -m benchmarks.bench_auth_cache [--requests 5000] [--users 100]
+
+Each request sends the bearer token of a random user to a route that only
+depends on security.get_current_user. 'user queries' counts the SELECTs
+on the users table per request. Halfway through, a new user registers
+(a write to "users"), which drops every cached token once.
+"""
+
+import argparse
+import random
+
+from fastapi import APIRouter, Depends
+from sqlalchemy import event, insert
+from sqlalchemy.engine import Engine
+
+from app import security
+from app.cache import token_cache
+from app.crud import crud_login
+from app.models import model
+from app.schemas import schema
+from benchmarks.common import make_client, make_database, summarize, timer, print_table
+
+# No .env is needed to run the benchmark
+security.SECRET_KEY = security.SECRET_KEY or "benchmark-secret"
+security.ALGORITHM = security.ALGORITHM or "HS256"
+
+router = APIRouter()
+
+@router.get("/me")
+def read_me(current_user: schema.UserInDB = Depends(security.get_current_user)):
+    return {"id": current_user.id, "email": current_user.email}
+
+def count_user_queries():
+    """
+    Counts on every Engine: get_current_user queries through the async
+    engine that make_client builds, not the one make_database returns.
+    Returns (counter, remove).
+    """
+    counter = [0]
+    def count(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM users" in statement:
+            counter[0] += 1
+    event.listen(Engine, "before_cursor_execute", count)
+    return counter, lambda: event.remove(Engine, "before_cursor_execute", count)
+
+def run(client, SessionLocal, tokens, requests: int, seed: int = 11):
+    rng = random.Random(seed)
+    samples = []
+    for i in range(requests):
+        if i == requests // 2:
+            db = SessionLocal()
+            crud_login.create_user(db, schema.UserCreate(email="new@example.com", password="secret"), hashed_password="x")
+            db.close()
+        headers = {"Authorization": f"Bearer {rng.choice(tokens)}"}
+        with timer() as elapsed:
+            response = client.get("/me", headers=headers)
+        assert response.status_code == 200, response.text
+        samples.append(elapsed())
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--users", type=int, default=100)
+    args = parser.parse_args()
+
+    # One bcrypt hash for every user: only token checks are measured
+    hashed = security.get_password_hash("secret")
+    tokens = [security.create_access_token({"sub": f"user{i}@example.com"}) for i in range(args.users)]
+
+    rows = []
+    for enabled in (False, True):
+        engine, SessionLocal = make_database("auth-cache-on" if enabled else "auth-cache-off")
+        db = SessionLocal()
+        db.execute(insert(model.User.__table__), [
+            {"email": f"user{i}@example.com", "hashed_password": hashed} for i in range(args.users)
+        ])
+        db.commit()
+        db.close()
+
+        client = make_client(SessionLocal, (router, ""))
+        token_cache.clear()
+        token_cache.enabled = enabled
+        token_cache.hits = token_cache.misses = token_cache.invalidations = 0
+        queries, remove = count_user_queries()
+        with timer() as elapsed:
+            samples = run(client, SessionLocal, tokens, args.requests)
+        remove()
+        stats = summarize(samples)
+        rows.append((
+            "on" if enabled else "off",
+            f"{args.requests / elapsed():,.0f}",
+            f"{stats['p50_ms']:.3f}",
+            f"{stats['p99_ms']:.3f}",
+            # the registration's own email check is not a token lookup
+            f"{(queries[0] - 1) / args.requests:.3f}",
+            f"{token_cache.stats()['hit_rate']:.1%}" if enabled else "-",
+        ))
+        engine.dispose()
+
+    print_table(("token cache", "requests/s", "p50 ms", "p99 ms", "user queries/request", "hit rate"), rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/bench_batch_forecast.py
+
+"""
+Whole-catalog demand forecasting: one predict_future_demand call per
+product versus one predict_demand_batch call.
+
+    python -m benchmarks.bench_batch_forecast [--products 1000 10000 100000] [--sample 200]
+
+The per-product path is timed on a random sample of products and scaled
+up to the whole catalog (running it 100k times would take many minutes).
+The same sample is used to check that both paths return the same numbers.
+"""
+
+import argparse
+import random
+import warnings
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app.crud import crud_forecast, crud_prediction
+from app.models import model
+from benchmarks.common import make_database, seed_products, timer, print_table
+
+def seed_sales(db, products: int, days: int = 90, sales_per_product: int = 6, seed: int = 11, batch: int = 50_000):
+    """
+    One order per day; every product is sold on 'sales_per_product'
+    random days (some products on a single day, so they cannot be forecast).
+    """
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1, 9, 0)
+    db.execute(insert(model.Order.__table__), [
+        {"id": day + 1, "order_date": start + timedelta(days=day), "status": "Shipped", "total": 0.0, "item_count": 0}
+        for day in range(days)
+    ])
+
+    rows = []
+    for product_id in range(1, products + 1):
+        sale_days = [rng.randrange(days)] if product_id % 25 == 0 else rng.sample(range(days), sales_per_product)
+        for day in sale_days:
+            rows.append({"order_id": day + 1, "product_id": product_id, "quantity": rng.randint(1, 20), "price_at_sale": 9.99})
+        if len(rows) >= batch:
+            db.execute(insert(model.OrderDetail.__table__), rows)
+            rows = []
+    if rows:
+        db.execute(insert(model.OrderDetail.__table__), rows)
+    db.commit()
+    # Raw inserts bypass create_sale, so build the forecast state from them
+    crud_forecast.rebuild_forecast_state(db)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--sample", type=int, default=200)
+    parser.add_argument("--days", type=int, default=30, help="forecast horizon")
+    args = parser.parse_args()
+    # sklearn warns on every per-product predict() about feature names
+    warnings.filterwarnings("ignore", category=UserWarning)
+
+    rows = []
+    for count in args.products:
+        engine, SessionLocal = make_database(f"forecast-{count}")
+        db = SessionLocal()
+        seed_products(db, count)
+        seed_sales(db, count)
+
+        with timer() as batch_elapsed:
+            batch = crud_prediction.predict_demand_batch(db, forecast_days=args.days)
+        batch_by_id = {p["product_id"]: p["predicted_demand"] for p in batch}
+
+        sample = random.Random(count).sample(range(1, count + 1), min(args.sample, count))
+        mismatches = 0
+        with timer() as single_elapsed:
+            for product_id in sample:
+                result = crud_prediction.predict_future_demand(db, product_id, args.days)
+                if result.get("predicted_demand") != batch_by_id.get(product_id):
+                    mismatches += 1
+        per_product = single_elapsed() / len(sample)
+
+        rows.append((
+            f"{count:,}",
+            f"{per_product * count:.1f} (est.)",
+            f"{batch_elapsed():.2f}",
+            f"{per_product * count / batch_elapsed():,.0f}x",
+            len(batch),
+            f"{mismatches}/{len(sample)}",
+        ))
+        db.close()
+        engine.dispose()
+
+    print_table(("products", "per-product s", "batch s", "speedup", "forecast", "mismatches"), rows)
+
+if __name__ == "__main__":
+    main()
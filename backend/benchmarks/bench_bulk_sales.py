@@ -0,0 +1,73 @@
+# benchmarks/bench_bulk_sales.py
+
+"""
+Compares POST /orders/sales (one sale per request) with the streamed
+NDJSON endpoint POST /orders/sales/bulk.
+
+    python -m benchmarks.bench_bulk_sales [--counts 10000 100000] [--chunk-size 500]
+"""
+
+import argparse
+import json
+
+from app.api.endpoints import orders
+from benchmarks.common import make_client, make_database, seed_products, timer, print_table
+
+def make_sales(count: int, catalog: int, lines: int):
+    for n in range(count):
+        yield {
+            "customer_id": None,
+            "items_sold": [{"product_id": (n * lines + i) % catalog + 1, "quantity": 1} for i in range(lines)],
+        }
+
+def fresh_client(catalog: int):
+    engine, SessionLocal = make_database()
+    db = SessionLocal()
+    seed_products(db, catalog)
+    db.close()
+    return engine, make_client(SessionLocal, (orders.router, "/orders"))
+
+def bench_single(count: int, catalog: int, lines: int):
+    engine, client = fresh_client(catalog)
+    with client, timer() as elapsed:
+        for sale in make_sales(count, catalog, lines):
+            client.post("/orders/sales", json=sale).raise_for_status()
+    engine.dispose()
+    return elapsed()
+
+def bench_bulk(count: int, catalog: int, lines: int, chunk_size: int):
+    engine, client = fresh_client(catalog)
+
+    def body():
+        for sale in make_sales(count, catalog, lines):
+            yield (json.dumps(sale) + "\n").encode()
+
+    with client, timer() as elapsed:
+        response = client.post(
+            f"/orders/sales/bulk?chunk_size={chunk_size}",
+            content=body(),
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        response.raise_for_status()
+        assert response.json()["accepted"] == count
+    engine.dispose()
+    return elapsed()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--counts", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--catalog", type=int, default=5000)
+    parser.add_argument("--lines", type=int, default=3, help="line items per sale")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+
+    rows = []
+    for count in args.counts:
+        single = bench_single(count, args.catalog, args.lines)
+        bulk = bench_bulk(count, args.catalog, args.lines, args.chunk_size)
+        rows.append((count, f"{single:.1f}", f"{count / single:.0f}", f"{bulk:.1f}", f"{count / bulk:.0f}", f"{single / bulk:.1f}x"))
+
+    print_table(("sales", "single s", "single sales/s", "bulk s", "bulk sales/s", "speedup"), rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# benchmarks/bench_conditional_get.py
+
+"""
+Bytes on the wire and server CPU for repeated list loads, as the frontend
+does after every action:
+
+  full        plain 200 with the full JSON body every time
+  gzip        200 with 'Accept-Encoding: gzip'
+  revalidate  'If-None-Match' with the previous ETag (304 while unchanged)
+
+    python -m benchmarks.bench_conditional_get [--rows 5000] [--requests 200]
+
+CPU is process CPU time per request. The TestClient runs in the same
+process, so it includes a small amount of client-side work as well.
+"""
+
+import argparse
+import time
+
+from fastapi.middleware.gzip import GZipMiddleware
+
+from app.api.endpoints import orders, products, suppliers
+from app.cache import result_cache
+from benchmarks.bench_pagination import seed_orders
+from benchmarks.common import make_client, make_database, seed_products, print_table
+
+def measure(client, url: str, requests: int, headers=None, revalidate: bool = False):
+    """
+    Returns (bytes per response, CPU ms per request, status of the last response).
+    """
+    headers = dict(headers or {})
+    total_bytes = 0
+    start = time.process_time()
+    for _ in range(requests):
+        response = client.get(url, headers=headers)
+        if response.status_code not in (200, 304):
+            response.raise_for_status()
+        total_bytes += response.num_bytes_downloaded + sum(len(k) + len(v) + 4 for k, v in response.headers.items())
+        if revalidate and "etag" in response.headers:
+            headers["If-None-Match"] = response.headers["etag"]
+    cpu = time.process_time() - start
+    return total_bytes / requests, cpu / requests * 1000, response.status_code
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5_000)
+    parser.add_argument("--limit", type=int, default=1_000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--cache", action="store_true", help="enable the result cache as well")
+    args = parser.parse_args()
+
+    engine, SessionLocal = make_database()
+    db = SessionLocal()
+    seed_products(db, args.rows)
+    seed_orders(db, args.rows)
+    db.close()
+    result_cache.enabled = args.cache
+
+    routes = ((products.router, "/products"), (orders.router, "/orders"), (suppliers.router, "/suppliers"))
+    plain = make_client(SessionLocal, *routes)
+    compressed = make_client(SessionLocal, *routes)
+    compressed.app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+    rows = []
+    for url in (f"/products/?limit={args.limit}", f"/orders/?limit={args.limit}"):
+        runs = (
+            ("full", plain, {"Accept-Encoding": "identity"}, False),
+            ("gzip", compressed, {"Accept-Encoding": "gzip"}, False),
+            ("revalidate", compressed, {"Accept-Encoding": "gzip"}, True),
+        )
+        for name, client, headers, revalidate in runs:
+            size, cpu_ms, status = measure(client, url, args.requests, headers, revalidate)
+            rows.append((url, name, status, f"{size:,.0f}", f"{cpu_ms:.3f}"))
+
+    print_table(("url", "mode", "status", "bytes/request", "cpu ms/request"), rows)
+    engine.dispose()
+
+if __name__ == "__main__":
+    main()
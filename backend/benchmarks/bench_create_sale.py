@@ -0,0 +1,85 @@
+# benchmarks/bench_create_sale.py
+
+"""
+Compares the old per-item sale path with the set-based crud_order.create_sale.
+
+    python -m benchmarks.bench_create_sale [--sizes 1 10 100 1000] [--repeat 20]
+"""
+
+import argparse
+
+from fastapi import HTTPException
+
+from app.crud import crud_order
+from app.models import model
+from app.schemas import schema
+from benchmarks.common import make_database, seed_products, timer, print_table
+
+def legacy_create_sale(db, sale: schema.SaleCreate):
+    """
+    The original implementation: one SELECT and one ORM update per line item.
+    """
+    new_order = model.Order(customer_id=sale.customer_id)
+    db.add(new_order)
+    db.flush()
+    for item in sale.items_sold:
+        product = db.query(model.Product).filter(model.Product.id == item.product_id).first()
+        if not product:
+            db.rollback()
+            raise HTTPException(status_code=404, detail=f"Product with id {item.product_id} not found.")
+        if product.currentStock < item.quantity:
+            db.rollback()
+            raise HTTPException(status_code=400, detail="Not enough stock")
+        product.currentStock -= item.quantity
+        db.add(model.OrderDetail(
+            order_id=new_order.id,
+            product_id=item.product_id,
+            quantity=item.quantity,
+            price_at_sale=99.99
+        ))
+    db.commit()
+    db.refresh(new_order)
+    return new_order
+
+def run(sale_fn, SessionLocal, lines: int, repeat: int, catalog: int):
+    sale = schema.SaleCreate(items_sold=[
+        schema.ItemSold(product_id=(i % catalog) + 1, quantity=1) for i in range(lines)
+    ])
+    with timer() as elapsed:
+        for _ in range(repeat):
+            db = SessionLocal()
+            try:
+                sale_fn(db, sale)
+            finally:
+                db.close()
+    return elapsed()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--catalog", type=int, default=5000)
+    args = parser.parse_args()
+
+    rows = []
+    for lines in args.sizes:
+        results = {}
+        for label, fn in (("legacy", legacy_create_sale), ("set-based", crud_order.create_sale)):
+            engine, SessionLocal = make_database(label)
+            db = SessionLocal()
+            seed_products(db, args.catalog)
+            db.close()
+            results[label] = run(fn, SessionLocal, lines, args.repeat, args.catalog)
+            engine.dispose()
+        legacy, new = results["legacy"], results["set-based"]
+        rows.append((
+            lines,
+            f"{args.repeat / legacy:.1f}",
+            f"{args.repeat / new:.1f}",
+            f"{legacy / new:.2f}x",
+        ))
+
+    print_table(("lines/order", "legacy sales/s", "set-based sales/s", "speedup"), rows)
+
+if __name__ == "__main__":
+    main()
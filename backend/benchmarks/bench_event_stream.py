@@ -0,0 +1,134 @@
+# benchmarks/bench_event_stream.py
+
+"""
+Load test for the live update stream: thousands of subscribers on one
+event loop while sales are recorded.
+
+Every subscriber consumes the real GET /api/v1/stream response body
+(no sockets), so the numbers cover the broker fan-out, the per-client
+queues and the endpoint's batching, but not the network. A share of the
+subscribers never read, to show that a stuck client is resynced instead
+of holding up the others.
+
+    python -m benchmarks.bench_event_stream [--subscribers 5000] [--sales 200] [--rate 50] [--stuck 0.02]
+"""
+
+import argparse
+import asyncio
+import re
+import resource
+import time
+
+from app.api.endpoints import stream
+from app.crud import crud_order
+from app.events import event_broker
+from app.schemas import schema
+from benchmarks.common import make_database, seed_products, summarize, print_table
+
+ORDER_CREATED = re.compile(r"event: order\.created\ndata: \{\"id\":(\d+)")
+
+async def subscriber(received, ready, stuck: bool):
+    response = await stream.stream_changes(request=None)
+    body = response.body_iterator
+    await body.__anext__() # the 'retry:' preamble, sent once the client is registered
+    ready.release()
+    try:
+        if stuck:
+            await asyncio.Event().wait()
+        async for chunk in body:
+            now = time.perf_counter()
+            for order_id in ORDER_CREATED.findall(chunk):
+                received.append((int(order_id), now))
+    finally:
+        await body.aclose()
+
+def record_sale(SessionLocal, product_id: int, committed_at):
+    db = SessionLocal()
+    try:
+        order = crud_order.create_sale(db, schema.SaleCreate(items_sold=[
+            schema.ItemSold(product_id=product_id, quantity=1)
+        ]))
+        # The event is published by the commit, before this line runs, so
+        # the measured latency errs on the low side by the cost of db.refresh().
+        committed_at[order.id] = time.perf_counter()
+    finally:
+        db.close()
+
+async def run(args):
+    engine, SessionLocal = make_database()
+    db = SessionLocal()
+    seed_products(db, 1000)
+    db.close()
+
+    committed_at = {}
+    received = []
+    stuck = int(args.subscribers * args.stuck)
+    ready = asyncio.Semaphore(0)
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tasks = [
+        asyncio.create_task(subscriber(received, ready, i < stuck))
+        for i in range(args.subscribers)
+    ]
+    for _ in tasks:
+        await ready.acquire()
+    rss_connected = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Watch event loop lag while the writers run
+    lags = []
+    done = asyncio.Event()
+    async def watch_loop():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lags.append(time.perf_counter() - start - 0.01)
+    watcher = asyncio.create_task(watch_loop())
+
+    # Sales arrive at a fixed rate, whether or not earlier ones have finished
+    start = time.perf_counter()
+    sales = []
+    for i in range(args.sales):
+        sales.append(asyncio.create_task(asyncio.to_thread(record_sale, SessionLocal, i % 1000 + 1, committed_at)))
+        await asyncio.sleep(max(0.0, start + (i + 1) / args.rate - time.perf_counter()))
+    await asyncio.gather(*sales)
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(0.5) # let the last events drain
+    done.set()
+    await watcher
+
+    rss_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    engine.dispose()
+
+    latencies = [now - committed_at[order_id] for order_id, now in received]
+    delivered = summarize(latencies)
+    loop_lag = summarize(lags)
+    expected = args.sales * (args.subscribers - stuck)
+    print_table(("metric", "value"), [
+        ("subscribers (stuck)", f"{args.subscribers} ({stuck})"),
+        ("sales", f"{args.sales} in {elapsed:.1f}s"),
+        ("events published", event_broker.published),
+        ("order events delivered", f"{len(latencies):,} / {expected:,}"),
+        ("delivery p50 ms", f"{delivered['p50_ms']:.2f}"),
+        ("delivery p99 ms", f"{delivered['p99_ms']:.2f}"),
+        ("event loop lag p99 ms", f"{loop_lag['p99_ms']:.2f}"),
+        ("resyncs (slow clients)", event_broker.resyncs),
+        ("RSS growth from connecting MB", f"{(rss_connected - rss_before) / 1024:.1f}"),
+        ("peak RSS MB", f"{rss_peak / 1024:.1f}"),
+    ])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--subscribers", type=int, default=5000)
+    parser.add_argument("--sales", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=50, help="sales per second")
+    parser.add_argument("--queue-size", type=int, default=64, help="pending commits per subscriber")
+    parser.add_argument("--stuck", type=float, default=0.02, help="share of subscribers that never read")
+    args = parser.parse_args()
+    event_broker.queue_size = args.queue_size
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/bench_forecast_cache.py
+
+"""
+Single-product forecast latency for a dashboard-like mix: most requests
+ask for a few popular (product, horizon) pairs, and sales of random
+products arrive in between. Run with and without the forecast cache.
+
+    python -m benchmarks.bench_forecast_cache [--ops 20000] [--sale-ratio 0.05]
+
+With the cache on, every answer is also compared with a fresh,
+uncached forecast; 'stale' counts answers that differed (it should be 0).
+"""
+
+import argparse
+import random
+
+from app.cache import forecast_cache
+from app.crud import crud_order, crud_prediction
+from app.schemas import schema
+from benchmarks.bench_batch_forecast import seed_sales
+from benchmarks.common import make_database, seed_products, summarize, timer, print_table
+
+HORIZONS = (7, 14, 30)
+
+def run(SessionLocal, ops: int, sale_ratio: float, catalog: int, check: bool, seed: int = 5):
+    rng = random.Random(seed)
+    # A skewed catalog: low product ids are asked for far more often
+    weights = [1 / rank for rank in range(1, catalog + 1)]
+    products = list(range(1, catalog + 1))
+    reads, stale = [], 0
+    for _ in range(ops):
+        db = SessionLocal()
+        try:
+            if rng.random() < sale_ratio:
+                crud_order.create_sale(db, schema.SaleCreate(items_sold=[
+                    schema.ItemSold(product_id=rng.choices(products, weights)[0], quantity=rng.randint(1, 5))
+                ]))
+                continue
+            product_id = rng.choices(products, weights)[0]
+            forecast_days = rng.choice(HORIZONS)
+            with timer() as elapsed:
+                result = crud_prediction.predict_future_demand(db, product_id, forecast_days)
+            reads.append(elapsed())
+            if check and result != crud_prediction._predict_future_demand(db, product_id, forecast_days):
+                stale += 1
+        finally:
+            db.close()
+    return summarize(reads), stale
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ops", type=int, default=20_000)
+    parser.add_argument("--sale-ratio", type=float, default=0.05)
+    parser.add_argument("--catalog", type=int, default=5_000)
+    args = parser.parse_args()
+
+    rows = []
+    for enabled in (False, True):
+        engine, SessionLocal = make_database("forecast-cache-on" if enabled else "forecast-cache-off")
+        db = SessionLocal()
+        seed_products(db, args.catalog)
+        seed_sales(db, args.catalog)
+        db.close()
+
+        forecast_cache.clear()
+        forecast_cache.enabled = enabled
+        forecast_cache.hits = forecast_cache.misses = forecast_cache.evictions = forecast_cache.invalidations = 0
+        stats, stale = run(SessionLocal, args.ops, args.sale_ratio, args.catalog, check=enabled)
+        cache_stats = forecast_cache.stats()
+        rows.append((
+            "on" if enabled else "off",
+            f"{stats['mean_ms']:.3f}",
+            f"{stats['p50_ms']:.3f}",
+            f"{stats['p99_ms']:.3f}",
+            f"{cache_stats['hit_rate']:.1%}" if enabled else "-",
+            cache_stats["invalidations"] if enabled else "-",
+            stale if enabled else "-",
+        ))
+        engine.dispose()
+
+    forecast_cache.enabled = False
+    print_table(("cache", "mean ms", "p50 ms", "p99 ms", "hit rate", "invalidated", "stale"), rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# benchmarks/bench_forecast_memory.py
+
+"""
+Memory and latency of the single-product forecast for a fast-moving SKU.
+
+'legacy' is the previous implementation, kept here for comparison: it
+loaded every OrderDetail row as an ORM object and grouped by day in
+pandas. 'history' aggregates the product's sales in SQL to one
+(day, sum(quantity)) row per day and builds its regression sums, which
+is what 'manage.py rebuild-forecast-state' does. 'state' is the current
+predict_future_demand, which reads the sums kept up to date by each sale.
+
+    python -m benchmarks.bench_forecast_memory [--items 5000000] [--legacy-items 500000]
+
+The legacy path needs minutes and gigabytes at 5M line items, so it is
+measured on a smaller product ('--legacy-items') as well.
+"""
+
+import argparse
+import tracemalloc
+import warnings
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import insert
+
+from app.crud import crud_forecast, crud_prediction
+from app.models import model
+from benchmarks.common import make_database, seed_products, timer, print_table
+
+def legacy_predict(db, product_id: int, forecast_days: int = 30):
+    import pandas as pd
+    from sklearn.linear_model import LinearRegression
+
+    sales_records = db.query(model.OrderDetail, model.Order.order_date).\
+        join(model.Order).\
+        filter(model.OrderDetail.product_id == product_id).\
+        order_by(model.Order.order_date.asc()).all()
+    data = [{"date": record.order_date.date(), "quantity": record.OrderDetail.quantity} for record in sales_records]
+    df = pd.DataFrame(data)
+    df['date'] = pd.to_datetime(df['date'])
+    daily_sales = df.groupby('date')['quantity'].sum().reset_index()
+    daily_sales['day_number'] = (daily_sales['date'] - daily_sales['date'].min()).dt.days
+    model_lr = LinearRegression()
+    model_lr.fit(daily_sales[['day_number']], daily_sales['quantity'])
+    last_day = daily_sales['day_number'].max()
+    predicted_sales = model_lr.predict(np.arange(last_day + 1, last_day + 1 + forecast_days).reshape(-1, 1))
+    predicted_sales[predicted_sales < 0] = 0
+    db.expunge_all()
+    return {
+        "product_id": product_id,
+        "forecast_period_days": forecast_days,
+        "predicted_demand": int(round(sum(predicted_sales))),
+        "unrounded": float(sum(predicted_sales)),
+    }
+
+def seed_line_items(db, product_id: int, items: int, days: int = 730, batch: int = 100_000):
+    """
+    One order per day for 'days' days, with 'items' line items for the
+    product spread across them (demand slowly rising).
+    """
+    start = datetime(2023, 1, 1, 12, 0)
+    first_order = (db.query(model.Order.id).order_by(model.Order.id.desc()).limit(1).scalar() or 0) + 1
+    db.execute(insert(model.Order.__table__), [
+        {"id": first_order + day, "order_date": start + timedelta(days=day), "status": "Shipped", "total": 0.0, "item_count": 0}
+        for day in range(days)
+    ])
+    rng = np.random.default_rng(product_id)
+    order_days = np.sort(rng.triangular(0, days, days, size=items).astype(int))
+    quantities = rng.integers(1, 5, size=items)
+    for begin in range(0, items, batch):
+        db.execute(insert(model.OrderDetail.__table__), [
+            {"order_id": first_order + int(day), "product_id": product_id, "quantity": int(qty), "price_at_sale": 9.99}
+            for day, qty in zip(order_days[begin:begin + batch], quantities[begin:begin + batch])
+        ])
+    db.commit()
+    crud_forecast.rebuild_forecast_state(db)
+
+def history_predict(db, product_id: int, forecast_days: int = 30):
+    from app import forecasting
+
+    _, state = crud_forecast.compute_states(db, [product_id])
+    demand = forecasting.predict("linear", state, None, forecast_days)
+    return {"product_id": product_id, "forecast_period_days": forecast_days, "predicted_demand": int(demand[0])}
+
+def measure(fn, db, product_id: int):
+    with timer() as elapsed:
+        result = fn(db, product_id)
+    tracemalloc.start()
+    fn(db, product_id)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result["predicted_demand"], elapsed(), peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=5_000_000)
+    parser.add_argument("--legacy-items", type=int, default=500_000)
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore", category=UserWarning)
+
+    engine, SessionLocal = make_database("forecast-memory")
+    db = SessionLocal()
+    seed_products(db, 2)
+    seed_line_items(db, 1, args.legacy_items)
+    seed_line_items(db, 2, args.items)
+
+    rows = []
+    for product_id, items, paths in (
+        (1, args.legacy_items, (("legacy", legacy_predict), ("history", history_predict), ("state", crud_prediction.predict_future_demand))),
+        (2, args.items, (("history", history_predict), ("state", crud_prediction.predict_future_demand))),
+    ):
+        for name, fn in paths:
+            demand, seconds, peak = measure(fn, db, product_id)
+            rows.append((f"{items:,}", name, demand, f"{seconds * 1000:,.0f}", f"{peak / 1e6:,.1f}"))
+
+    db.close()
+    engine.dispose()
+    print_table(("line items", "path", "predicted", "latency ms", "peak Python MB"), rows)
+
+if __name__ == "__main__":
+    main()
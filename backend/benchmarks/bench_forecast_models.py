@@ -0,0 +1,120 @@
+# benchmarks/bench_forecast_models.py
+
+"""
+Backtest of the forecasting models: accuracy (MAPE) and throughput.
+
+    python -m benchmarks.bench_forecast_models [--products 3000] [--history 210] [--horizons 3 10 30]
+
+Daily demand is simulated for three kinds of product: steady, trending
+(up or down) and weekend-heavy (most units sold on Friday to Sunday). The
+first '--history' days are loaded as sales; every model then forecasts
+each product through predict_demand_batch, and the forecast totals are
+compared with the demand that was simulated for the following days.
+
+MAPE is the mean of |forecast - actual| / actual over products that sold
+anything in the horizon. Throughput is products forecast per second by
+predict_demand_batch (database read included) at the longest horizon.
+"""
+
+import argparse
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import insert
+
+from app import forecasting
+from app.crud import crud_forecast, crud_prediction
+from app.models import model
+from benchmarks.common import make_database, seed_products, timer, print_table
+
+KINDS = ("steady", "trending", "weekend")
+# Relative demand from Monday to Sunday for the weekend-heavy products
+WEEKEND_PROFILE = np.array([0.5, 0.5, 0.6, 0.7, 1.2, 2.0, 2.5])
+
+def simulate(products: int, days: int, start: datetime, seed: int = 3):
+    """
+    Units sold per product (row) and day (column); the kind of product
+    i + 1 is KINDS[i % 3].
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(days)
+    base = rng.uniform(2, 20, size=products)[:, None]
+    kind = np.arange(products) % 3
+    slope = np.where(kind == 1, rng.uniform(-0.5, 1.0, size=products) / 100, rng.normal(0, 0.0005, size=products))
+    mean = base * np.clip(1 + slope[:, None] * t, 0.1, None)
+    weekdays = (start.weekday() + t) % 7
+    mean = np.where((kind == 2)[:, None], mean * WEEKEND_PROFILE[weekdays] / WEEKEND_PROFILE.mean(), mean)
+    return rng.poisson(mean)
+
+def seed_history(db, demand, start: datetime, batch: int = 100_000):
+    products, days = demand.shape
+    db.execute(insert(model.Order.__table__), [
+        {"id": day + 1, "order_date": start + timedelta(days=day), "status": "Shipped", "total": 0.0, "item_count": 0}
+        for day in range(days)
+    ])
+    product_rows, day_columns = np.nonzero(demand)
+    rows = [
+        {"order_id": int(day) + 1, "product_id": int(row) + 1, "quantity": int(demand[row, day]), "price_at_sale": 9.99}
+        for row, day in zip(product_rows, day_columns)
+    ]
+    for begin in range(0, len(rows), batch):
+        db.execute(insert(model.OrderDetail.__table__), rows[begin:begin + batch])
+    db.commit()
+    crud_forecast.rebuild_forecast_state(db)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=3_000)
+    parser.add_argument("--history", type=int, default=210, help="days of sales loaded before the forecast")
+    parser.add_argument("--horizons", type=int, nargs="+", default=[3, 10, 30])
+    args = parser.parse_args()
+
+    start = datetime(2024, 1, 1, 12, 0)
+    # Forecast as of the day after the history, so the smoothing models
+    # read it up to its last day
+    crud_prediction._today = lambda: crud_forecast.day_number(start.date()) + args.history
+    longest = max(args.horizons)
+    demand = simulate(args.products, args.history + longest, start)
+
+    engine, SessionLocal = make_database("forecast-models")
+    db = SessionLocal()
+    seed_products(db, args.products)
+    seed_history(db, demand[:, :args.history], start)
+
+    # The straight line forecasts from the day after each product's last
+    # sale, the smoothing models from the day after the history ends
+    first_day = crud_forecast.day_number(start.date())
+    last_sale = {state.product_id: state.last_day - first_day for state in db.query(model.ForecastState)}
+    kinds = np.array(KINDS)[np.arange(args.products) % 3]
+
+    rows = []
+    for name, (window, _) in forecasting.MODELS.items():
+        errors = {}
+        for horizon in args.horizons:
+            with timer() as elapsed:
+                predictions = crud_prediction.predict_demand_batch(db, forecast_days=horizon, forecast_model=name)
+            ids = np.array([p["product_id"] for p in predictions])
+            forecast = np.array([p["predicted_demand"] for p in predictions])
+            ends = np.array([last_sale[i] if window is None else args.history - 1 for i in ids])
+            actual = np.array([demand[i - 1, end + 1:end + 1 + horizon].sum() for i, end in zip(ids, ends)])
+            sold = actual > 0
+            ape = np.abs(forecast - actual)[sold] / actual[sold]
+            errors[horizon] = ape.mean()
+            weekend = kinds[ids - 1][sold] == "weekend"
+            errors[("weekend", horizon)] = ape[weekend].mean()
+        rows.append((
+            name,
+            *(f"{errors[h]:.1%}" for h in args.horizons),
+            f"{errors[('weekend', args.horizons[0])]:.1%}",
+            f"{len(predictions) / elapsed():,.0f}",
+        ))
+
+    db.close()
+    engine.dispose()
+    print_table(
+        ("model", *(f"MAPE {h}d" for h in args.horizons), f"weekend SKUs {args.horizons[0]}d", "products/s"),
+        rows,
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# benchmarks/bench_forecast_pool.py
+
+"""
+CRUD latency while whole-catalog forecasts run at the same time, with the
+forecast work done in the request thread ('inline') or in forecast_pool
+worker processes ('pool').
+
+    python -m benchmarks.bench_forecast_pool [--products 100000] [--seconds 10] [--crud-threads 4] [--forecast-threads 2]
+
+Each thread stands in for one of Starlette's threadpool threads serving a
+sync route: the CRUD threads read products and the dashboard KPIs, the
+forecast threads call predict_demand_batch back to back. A last run fires
+more concurrent forecasts than the pool accepts, to show the queue limit
+turning the excess away (503) instead of queueing it.
+"""
+
+import argparse
+import random
+import threading
+import time
+
+from fastapi import HTTPException
+
+from app.crud import crud_dashboard, crud_prediction, crud_product
+from app.forecast_pool import forecast_pool
+from benchmarks.bench_batch_forecast import seed_sales
+from benchmarks.common import make_database, seed_products, summarize, timer, print_table
+
+def crud_worker(SessionLocal, products: int, stop, latencies, seed: int):
+    rng = random.Random(seed)
+    while not stop.is_set():
+        db = SessionLocal()
+        try:
+            with timer() as elapsed:
+                if rng.random() < 0.8:
+                    crud_product.get_product(db, rng.randint(1, products))
+                else:
+                    crud_dashboard.get_dashboard_kpis(db)
+            latencies.append(elapsed())
+        finally:
+            db.close()
+
+def forecast_worker(SessionLocal, stop, done):
+    while not stop.is_set():
+        db = SessionLocal()
+        try:
+            crud_prediction.predict_demand_batch(db)
+            done.append(1)
+        finally:
+            db.close()
+
+def run(SessionLocal, args, forecast_threads: int):
+    stop = threading.Event()
+    latencies, done = [], []
+    threads = [
+        threading.Thread(target=crud_worker, args=(SessionLocal, args.products, stop, latencies, i))
+        for i in range(args.crud_threads)
+    ] + [
+        threading.Thread(target=forecast_worker, args=(SessionLocal, stop, done))
+        for _ in range(forecast_threads)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies), len(latencies), len(done)
+
+def burst(SessionLocal, requests: int):
+    """
+    Fires 'requests' batch forecasts at once; returns (served, rejected).
+    """
+    results = []
+    def one():
+        db = SessionLocal()
+        try:
+            crud_prediction.predict_demand_batch(db)
+            results.append(True)
+        except HTTPException as e:
+            results.append(e.status_code != 503)
+        finally:
+            db.close()
+    threads = [threading.Thread(target=one) for _ in range(requests)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results.count(True), results.count(False)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--crud-threads", type=int, default=4)
+    parser.add_argument("--forecast-threads", type=int, default=2)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    engine, SessionLocal = make_database("forecast-pool")
+    db = SessionLocal()
+    seed_products(db, args.products)
+    seed_sales(db, args.products)
+    db.close()
+
+    rows = []
+    for name, workers, forecast_threads in (
+        ("no forecasts", 0, 0),
+        ("inline", 0, args.forecast_threads),
+        ("pool", args.workers, args.forecast_threads),
+    ):
+        forecast_pool.workers = workers
+        if workers:
+            crud_prediction.predict_demand_batch(SessionLocal()) # start the processes before timing
+        stats, crud_ops, forecasts = run(SessionLocal, args, forecast_threads)
+        rows.append((
+            name,
+            f"{crud_ops / args.seconds:,.0f}",
+            f"{stats['p50_ms']:.2f}",
+            f"{stats['p99_ms']:.2f}",
+            forecasts,
+        ))
+    print_table(("forecasts", "CRUD ops/s", "CRUD p50 ms", "CRUD p99 ms", "forecasts done"), rows)
+
+    limit = forecast_pool.workers + forecast_pool.queue_limit
+    served, rejected = burst(SessionLocal, limit * 2)
+    print(f"\nburst of {limit * 2} forecasts with room for {limit}: {served} served, {rejected} rejected with 503")
+
+    forecast_pool.shutdown()
+    forecast_pool.workers = 0
+    engine.dispose()
+
+if __name__ == "__main__":
+    main()
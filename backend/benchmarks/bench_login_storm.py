@@ -0,0 +1,155 @@
+# benchmarks/bench_login_storm.py
+
+"""
+CRUD latency while 500 users log in at once (shift start), with bcrypt run
+in Starlette's shared threadpool ('threadpool', how the sync login route
+used to run) or in security's password_pool.
+
+    python -m benchmarks.bench_login_storm [--logins 500] [--rounds 10] [--crud-clients 4]
+
+The app (auth and product routes) runs in-process behind httpx's ASGI
+transport, so every route goes through the real event loop and threadpool.
+'--crud-clients' clients read random products back to back while the
+logins run; their latencies are what the table reports. The pool is run
+twice: with a queue long enough to hold every login, and with the default
+queue limit, where the excess is turned away with 503 + Retry-After.
+
+'--rounds' is the bcrypt cost used (12 in production, lower here so the
+run finishes in reasonable time on small machines; each round doubles the
+work). A last check logs in a user whose stored hash has a lower cost and
+shows it rehashed.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+from passlib.context import CryptContext
+from sqlalchemy import insert
+
+from app import security
+from app.api.api import public_router
+from app.api.endpoints import auth, products # 'auth' registers its routes on public_router
+from app.crud import crud_login
+from app.models import model
+from app.password_pool import password_pool
+from benchmarks.common import make_app, make_database, seed_products, summarize, print_table
+
+security.SECRET_KEY = security.SECRET_KEY or "benchmark-secret"
+security.ALGORITHM = security.ALGORITHM or "HS256"
+
+async def crud_client(client, catalog: int, stop, latencies, seed: int):
+    rng = random.Random(seed)
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get(f"/products/{rng.randint(1, catalog)}")
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.text
+
+async def login(client, email: str):
+    response = await client.post("/auth/login", data={"username": email, "password": "secret"})
+    return response.status_code, response.headers.get("retry-after")
+
+async def storm(app, args, logins: int):
+    """
+    Returns (CRUD latency summary, CRUD requests, statuses of the logins, storm seconds).
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        stop = asyncio.Event()
+        latencies = []
+        readers = [asyncio.create_task(crud_client(client, args.products, stop, latencies, i)) for i in range(args.crud_clients)]
+        await asyncio.sleep(0.5) # warm up
+        latencies.clear()
+        start = time.perf_counter()
+        if logins:
+            statuses = await asyncio.gather(*(login(client, f"user{i}@example.com") for i in range(logins)))
+        else:
+            await asyncio.sleep(args.idle_seconds)
+            statuses = []
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await asyncio.gather(*readers)
+    return summarize(latencies), len(latencies), statuses, elapsed
+
+def rehash_check(app, SessionLocal, rounds: int):
+    """
+    Stores a cost-4 hash for one user, logs in, and returns the cost of
+    the stored hash before and after.
+    """
+    db = SessionLocal()
+    user = crud_login.get_user_by_email(db, "user0@example.com")
+    old = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("secret")
+    crud_login.update_password_hash(db, user, old)
+    db.close()
+
+    async def go():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return await login(client, "user0@example.com")
+    status, _ = asyncio.run(go())
+
+    db = SessionLocal()
+    new = crud_login.get_user_by_email(db, "user0@example.com").hashed_password
+    db.close()
+    return status, old.split("$")[2], new.split("$")[2]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--crud-clients", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--idle-seconds", type=float, default=3)
+    args = parser.parse_args()
+
+    security.pwd_context.update(bcrypt__rounds=args.rounds)
+    engine, SessionLocal = make_database("login-storm")
+    db = SessionLocal()
+    seed_products(db, args.products)
+    # Every user has the same password, so one hash serves them all
+    hashed = security.get_password_hash("secret")
+    db.execute(insert(model.User.__table__), [
+        {"email": f"user{i}@example.com", "hashed_password": hashed} for i in range(args.logins)
+    ])
+    db.commit()
+    db.close()
+    routes = ((public_router, "/auth"), (products.router, "/products"))
+
+    rows = []
+    default_queue = password_pool.queue_limit
+    for name, workers, queue_limit, logins in (
+        ("no logins", 0, default_queue, 0),
+        ("threadpool", 0, default_queue, args.logins),
+        ("pool, queue all", args.workers, args.logins, args.logins),
+        (f"pool, queue {default_queue}", args.workers, default_queue, args.logins),
+    ):
+        password_pool.shutdown()
+        password_pool.workers, password_pool.queue_limit = workers, queue_limit
+        # A new app (and async engine) per run: pooled aiosqlite
+        # connections belong to the event loop that opened them
+        app = make_app(SessionLocal, *routes)
+        stats, crud_requests, statuses, elapsed = asyncio.run(storm(app, args, logins))
+        shed = [retry for status, retry in statuses if status == 503]
+        rows.append((
+            name,
+            f"{stats['p50_ms']:.1f}",
+            f"{stats['p99_ms']:.1f}",
+            f"{crud_requests / elapsed:,.0f}",
+            sum(1 for status, _ in statuses if status == 200),
+            f"{len(shed)}" + (f" (Retry-After {shed[0]})" if shed else ""),
+            f"{elapsed:.1f}",
+        ))
+    print_table(("bcrypt runs in", "CRUD p50 ms", "CRUD p99 ms", "CRUD req/s", "logins ok", "logins 503", "seconds"), rows)
+
+    status, before, after = rehash_check(make_app(SessionLocal, *routes), SessionLocal, args.rounds)
+    print(f"\nlogin with a cost-{int(before)} hash: HTTP {status}, stored hash now cost {int(after)}")
+
+    password_pool.shutdown()
+    engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/bench_low_stock.py
+
+"""
+Low-stock queries on a large catalog: the old 'currentStock <= reorderPoint'
+predicate (full scan) versus the partial index on products.stock_deficit.
+
+    python -m benchmarks.bench_low_stock [--products 1000000] [--low-every 100]
+"""
+
+import argparse
+
+from sqlalchemy import func, update
+
+from app.crud import crud_dashboard
+from app.models import model
+from benchmarks.common import make_database, seed_products, summarize, timer, print_table
+
+def old_alerts(db, limit: int = 5):
+    return (
+        db.query(model.Product)
+          .filter(model.Product.currentStock <= model.Product.reorderPoint)
+          .order_by(model.Product.currentStock.asc())
+          .limit(limit)
+          .all()
+    )
+
+def old_count(db):
+    return db.query(func.count(model.Product.id)).filter(model.Product.currentStock <= model.Product.reorderPoint).scalar()
+
+def new_count(db):
+    return db.query(func.count(model.Product.id)).filter(model.LOW_STOCK).scalar()
+
+def measure(SessionLocal, fn, repeat: int):
+    samples = []
+    db = SessionLocal()
+    try:
+        for _ in range(repeat):
+            with timer() as elapsed:
+                fn(db)
+            samples.append(elapsed())
+    finally:
+        db.close()
+    return summarize(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--low-every", type=int, default=100, help="every Nth product is low on stock")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine, SessionLocal = make_database()
+    db = SessionLocal()
+    seed_products(db, args.products, stock=500, reorder_point=50)
+    products = model.Product.__table__
+    db.execute(
+        update(products)
+        .where(products.c.id % args.low_every == 0)
+        .values(currentStock=products.c.id % 50)
+    )
+    db.commit()
+    low = new_count(db)
+    db.close()
+    print(f"{args.products} products, {low} low on stock")
+
+    rows = []
+    for label, old, new in (
+        ("low-stock alerts (top 5)", old_alerts, crud_dashboard.get_low_stock_alerts),
+        ("low-stock count", old_count, new_count),
+        ("priority tasks", None, crud_dashboard.get_priority_tasks),
+    ):
+        new_stats = measure(SessionLocal, new, args.repeat)
+        old_stats = measure(SessionLocal, old, args.repeat) if old else None
+        rows.append((
+            label,
+            f"{old_stats['p50_ms']:.2f}" if old_stats else "-",
+            f"{new_stats['p50_ms']:.2f}",
+            f"{old_stats['p50_ms'] / new_stats['p50_ms']:.0f}x" if old_stats else "-",
+        ))
+    engine.dispose()
+
+    print_table(("query", "column compare p50 ms", "stock_deficit index p50 ms", "speedup"), rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/bench_pagination.py
+
+"""
+Latency of deep pages with skip/limit versus the keyset 'cursor' parameter
+on GET /products and GET /orders.
+
+    python -m benchmarks.bench_pagination [--rows 1000000] [--pages 1 10 100 1000 10000]
+"""
+
+import argparse
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app.api.endpoints import orders, products
+from app.crud import pagination
+from app.models import model
+from benchmarks.common import make_client, make_database, seed_products, summarize, timer, print_table
+
+def seed_orders(db, count: int, batch: int = 10_000):
+    start = datetime(2024, 1, 1)
+    table = model.Order.__table__
+    for first in range(0, count, batch):
+        db.execute(insert(table), [
+            {"id": i, "order_date": start + timedelta(seconds=i // 2), "status": "Pending"}
+            for i in range(first + 1, min(first + batch, count) + 1)
+        ])
+    db.commit()
+
+def time_get(client, url: str, params: dict, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        with timer() as elapsed:
+            client.get(url, params=params).raise_for_status()
+        samples.append(elapsed())
+    return summarize(samples)["p50_ms"]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine, SessionLocal = make_database()
+    db = SessionLocal()
+    seed_products(db, args.rows)
+    seed_orders(db, args.rows)
+
+    # Work out the cursor for the start of each page once, outside the timings
+    cursors = {}
+    for page in args.pages:
+        skip = (page - 1) * args.limit
+        if skip == 0:
+            cursors[page] = ("", "")
+            continue
+        product_id = db.query(model.Product.id).order_by(model.Product.id).offset(skip - 1).limit(1).scalar()
+        order = (
+            db.query(model.Order.order_date, model.Order.id)
+              .order_by(model.Order.order_date.desc(), model.Order.id.desc())
+              .offset(skip - 1).limit(1).one()
+        )
+        cursors[page] = (pagination.encode_cursor(product_id), pagination.encode_cursor(order.order_date, order.id))
+    db.close()
+
+    client = make_client(SessionLocal, (products.router, "/products"), (orders.router, "/orders"))
+    rows = []
+    with client:
+        for page in args.pages:
+            skip = (page - 1) * args.limit
+            product_cursor, order_cursor = cursors[page]
+            rows.append((
+                page,
+                f"{time_get(client, '/products/', {'skip': skip, 'limit': args.limit}, args.repeat):.2f}",
+                f"{time_get(client, '/products/', {'cursor': product_cursor, 'limit': args.limit}, args.repeat):.2f}",
+                f"{time_get(client, '/orders/', {'skip': skip, 'limit': args.limit}, args.repeat):.2f}",
+                f"{time_get(client, '/orders/', {'cursor': order_cursor, 'limit': args.limit}, args.repeat):.2f}",
+            ))
+    engine.dispose()
+
+    print_table(("page", "products offset ms", "products cursor ms", "orders offset ms", "orders cursor ms"), rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/bench_product_import.py
+
+"""
+Times POST /products/import (streamed CSV and NDJSON, insert pass and
+update pass) against one POST /products/ request per product.
+
+    python -m benchmarks.bench_product_import [--rows 50000] [--baseline-rows 5000]
+"""
+
+import argparse
+import json
+import tracemalloc
+
+from app.api.endpoints import products
+from benchmarks.common import make_client, make_database, timer, print_table
+
+FIELDS = ("name", "sku", "category", "supplier", "currentStock", "reorderPoint")
+
+def make_rows(count: int, stock: int = 50):
+    for i in range(count):
+        yield {
+            "name": f"Product {i}",
+            "sku": f"ERP-{i:08d}",
+            "category": f"Category {i % 20}",
+            "supplier": f"Supplier {i % 50}",
+            "currentStock": stock,
+            "reorderPoint": 10,
+        }
+
+def csv_body(count: int, stock: int):
+    yield (",".join(FIELDS) + "\n").encode()
+    for row in make_rows(count, stock):
+        yield (",".join(str(row[f]) for f in FIELDS) + "\n").encode()
+
+def ndjson_body(count: int, stock: int):
+    for row in make_rows(count, stock):
+        yield (json.dumps(row) + "\n").encode()
+
+def bench_import(fmt: str, count: int, batch_size: int):
+    engine, SessionLocal = make_database(fmt)
+    client = make_client(SessionLocal, (products.router, "/products"))
+    body = csv_body if fmt == "csv" else ndjson_body
+    content_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    timings = []
+    with client:
+        for stock in (50, 75): # first pass inserts, second pass updates
+            tracemalloc.start()
+            with timer() as elapsed:
+                response = client.post(
+                    f"/products/import?batch_size={batch_size}",
+                    content=body(count, stock),
+                    headers={"Content-Type": content_type},
+                )
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            response.raise_for_status()
+            timings.append((elapsed(), peak, response.json()))
+    engine.dispose()
+    return timings
+
+def bench_per_row(count: int):
+    engine, SessionLocal = make_database("per-row")
+    client = make_client(SessionLocal, (products.router, "/products"))
+    with client, timer() as elapsed:
+        for row in make_rows(count):
+            client.post("/products/", json=row).raise_for_status()
+    engine.dispose()
+    return elapsed()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--baseline-rows", type=int, default=5_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    table = []
+    per_row = bench_per_row(args.baseline_rows)
+    table.append(("POST /products/ per row", "insert", args.baseline_rows, f"{per_row:.2f}", f"{args.baseline_rows / per_row:.0f}", "-"))
+    for fmt in ("csv", "ndjson"):
+        for (seconds, peak, summary), label in zip(bench_import(fmt, args.rows, args.batch_size), ("insert", "update")):
+            assert summary["rejected"] == 0, summary
+            table.append((f"/products/import {fmt}", label, args.rows, f"{seconds:.2f}", f"{args.rows / seconds:.0f}", f"{peak / 1e6:.1f}"))
+
+    print_table(("path", "pass", "rows", "seconds", "rows/s", "peak MB"), table)
+
+if __name__ == "__main__":
+    main()
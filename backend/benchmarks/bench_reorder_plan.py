@@ -0,0 +1,88 @@
+# benchmarks/bench_reorder_plan.py
+
+"""
+Reordering every low-stock SKU: one create_purchase_order_for_product
+call per product (the "Reorder" button) versus one create_reorder_plan
+call (one purchase order per supplier, one transaction).
+
+    python -m benchmarks.bench_reorder_plan [--products 5000] [--suppliers 50]
+
+Both paths order the same quantities (the planner's suggestions), each on
+a fresh database. 'statements' counts the SQL statements sent to SQLite.
+"""
+
+import argparse
+
+from sqlalchemy import event, func, insert
+
+from app.crud import crud_reorder, crud_supplier
+from app.models import model
+from benchmarks.bench_batch_forecast import seed_sales
+from benchmarks.common import make_database, seed_products, timer, print_table
+
+def setup(name: str, products: int, suppliers: int):
+    engine, SessionLocal = make_database(name)
+    db = SessionLocal()
+    # seed_products names the supplier of product i 'Supplier {i % 50}'
+    seed_products(db, products, stock=5, reorder_point=10)
+    db.execute(insert(model.Supplier.__table__), [
+        {"id": i + 1, "name": f"Supplier {i}", "category": "General"} for i in range(suppliers)
+    ])
+    # The products were inserted before their suppliers existed
+    crud_supplier.link_products(db)
+    db.commit()
+    seed_sales(db, products)
+    db.close()
+    return engine, SessionLocal
+
+def count_statements(engine):
+    counter = [0]
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(*args):
+        counter[0] += 1
+    return counter
+
+def totals(db):
+    return (
+        db.query(func.count(model.PurchaseOrder.id)).scalar(),
+        db.query(func.count(model.PurchaseOrderDetail.id)).scalar(),
+        db.query(func.coalesce(func.sum(model.PurchaseOrderDetail.quantity), 0)).scalar(),
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=5_000)
+    parser.add_argument("--suppliers", type=int, default=50)
+    args = parser.parse_args()
+
+    rows = []
+
+    engine, SessionLocal = setup("reorder-per-product", args.products, args.suppliers)
+    db = SessionLocal()
+    suggestions = crud_reorder.get_reorder_suggestions(db)
+    statements = count_statements(engine)
+    with timer() as elapsed:
+        for suggestion in suggestions:
+            crud_reorder.create_purchase_order_for_product(db, suggestion["product_id"], suggestion["recommended_order_quantity"])
+    rows.append(("per product", len(suggestions), f"{elapsed():.2f}", statements[0], *totals(db)))
+    db.close()
+    engine.dispose()
+
+    engine, SessionLocal = setup("reorder-plan", args.products, args.suppliers)
+    db = SessionLocal()
+    statements = count_statements(engine)
+    with timer() as elapsed:
+        plan = crud_reorder.create_reorder_plan(db)
+    ordered = sum(po["item_count"] for po in plan["purchase_orders"])
+    rows.append(("planner", ordered, f"{elapsed():.2f}", statements[0], *totals(db)))
+
+    # A second run finds everything already on a pending order
+    again = crud_reorder.create_reorder_plan(db)
+    db.close()
+    engine.dispose()
+
+    print_table(("path", "SKUs", "seconds", "statements", "purchase orders", "order lines", "units"), rows)
+    print(f"\nplanner run again: {len(again['purchase_orders'])} new purchase orders")
+
+if __name__ == "__main__":
+    main()
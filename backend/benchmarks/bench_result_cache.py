@@ -0,0 +1,70 @@
+# benchmarks/bench_result_cache.py
+
+"""
+Dashboard and inventory read latency under a 95% read / 5% write mix,
+with and without the in-process result cache.
+
+    python -m benchmarks.bench_result_cache [--ops 20000] [--read-ratio 0.95]
+"""
+
+import argparse
+import random
+
+from app.cache import result_cache
+from app.crud import crud_dashboard, crud_order, crud_product
+from app.schemas import schema
+from benchmarks.common import make_database, seed_products, summarize, timer, print_table
+
+def run(SessionLocal, ops: int, read_ratio: float, catalog: int, seed: int = 7):
+    rng = random.Random(seed)
+    reads = []
+    for _ in range(ops):
+        db = SessionLocal()
+        try:
+            if rng.random() < read_ratio:
+                read = crud_dashboard.get_dashboard_summary if rng.random() < 0.8 else crud_product.get_products
+                with timer() as elapsed:
+                    read(db)
+                reads.append(elapsed())
+            else:
+                crud_order.create_sale(db, schema.SaleCreate(items_sold=[
+                    schema.ItemSold(product_id=rng.randint(1, catalog), quantity=1)
+                ]))
+        finally:
+            db.close()
+    return summarize(reads)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ops", type=int, default=20_000)
+    parser.add_argument("--read-ratio", type=float, default=0.95)
+    parser.add_argument("--catalog", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rows = []
+    for enabled in (False, True):
+        engine, SessionLocal = make_database("cache-on" if enabled else "cache-off")
+        db = SessionLocal()
+        seed_products(db, args.catalog, stock=1000, reorder_point=999)
+        db.close()
+
+        result_cache.clear()
+        result_cache.enabled = enabled
+        result_cache.hits = result_cache.misses = result_cache.evictions = result_cache.invalidations = 0
+        stats = run(SessionLocal, args.ops, args.read_ratio, args.catalog)
+        cache_stats = result_cache.stats()
+        rows.append((
+            "on" if enabled else "off",
+            f"{stats['mean_ms']:.3f}",
+            f"{stats['p50_ms']:.3f}",
+            f"{stats['p99_ms']:.3f}",
+            f"{cache_stats['hit_rate']:.1%}" if enabled else "-",
+            cache_stats["evictions"] if enabled else "-",
+        ))
+        engine.dispose()
+
+    result_cache.enabled = False
+    print_table(("cache", "read mean ms", "read p50 ms", "read p99 ms", "hit rate", "evictions"), rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# benchmarks/bench_sqlite_wal.py
+
+"""
+Reader latency while sales are being written, for each SQLite connection
+profile: SQLite's defaults (rollback journal), WAL alone, and the app's
+tuned profile (app.database.sqlite_tuning).
+
+    python -m benchmarks.bench_sqlite_wal [--seconds 10] [--readers 4] [--writers 2] [--sales-per-commit 1 2000]
+
+'--readers' threads read back to back (the dashboard KPIs, then four
+products by id) while '--writers' threads record five-item sales. With
+one sale per commit they use crud_order.create_sale (the POST /sales
+route); with more, crud_order.create_sales_bulk (a chunk of the bulk
+import). 'reads/s' counts both kinds of read, 'reads > 100 ms' the ones
+that stalled. 'errors' counts "database is locked" failures. The first row reads with no writers, as a baseline.
+
+In rollback-journal mode a writer locks readers out while it commits,
+and for the rest of its transaction once its changes no longer fit in
+the page cache; the second case is what large chunks show.
+"""
+
+import argparse
+import random
+import threading
+
+from sqlalchemy.exc import OperationalError
+
+from app.crud import crud_dashboard, crud_order, crud_product
+from app.database.sqlite_tuning import SQLITE_PRAGMAS, SQLiteMaintenance
+from app.schemas import schema
+from benchmarks.common import make_database, seed_products, summarize, timer, print_table
+
+def reader(SessionLocal, catalog: int, stop, latencies, errors, seed: int):
+    rng = random.Random(seed)
+    while not stop.is_set():
+        db = SessionLocal()
+        try:
+            with timer() as elapsed:
+                crud_dashboard.get_dashboard_kpis(db)
+            latencies.append(elapsed())
+            for _ in range(4):
+                with timer() as elapsed:
+                    crud_product.get_product(db, product_id=rng.randint(1, catalog))
+                latencies.append(elapsed())
+                # each read its own transaction, as in separate requests
+                db.rollback()
+        except OperationalError:
+            errors.append("read")
+        finally:
+            db.close()
+
+def writer(SessionLocal, catalog: int, per_commit: int, stop, latencies, errors, seed: int):
+    rng = random.Random(seed)
+    while not stop.is_set():
+        sales = [
+            schema.SaleCreate(items_sold=[
+                schema.ItemSold(product_id=product_id, quantity=1) for product_id in rng.sample(range(1, catalog + 1), 5)
+            ])
+            for _ in range(per_commit)
+        ]
+        db = SessionLocal()
+        try:
+            with timer() as elapsed:
+                if per_commit == 1:
+                    crud_order.create_sale(db, sales[0])
+                else:
+                    crud_order.create_sales_bulk(db, list(enumerate(sales)))
+            latencies.extend([elapsed() / per_commit] * per_commit)
+        except OperationalError:
+            errors.append("write")
+        finally:
+            db.close()
+
+def run(SessionLocal, args, writers: int, per_commit: int):
+    stop = threading.Event()
+    reads, writes, errors = [], [], []
+    threads = [
+        threading.Thread(target=reader, args=(SessionLocal, args.products, stop, reads, errors, i))
+        for i in range(args.readers)
+    ] + [
+        threading.Thread(target=writer, args=(SessionLocal, args.products, per_commit, stop, writes, errors, 1000 + i))
+        for i in range(writers)
+    ]
+    for thread in threads:
+        thread.start()
+    stop.wait(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return reads, writes, errors
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--sales-per-commit", type=int, nargs="+", default=[1, 2000])
+    parser.add_argument("--products", type=int, default=10_000)
+    args = parser.parse_args()
+
+    runs = [("tuned", SQLITE_PRAGMAS, 0, 0)]
+    for per_commit in args.sales_per_commit:
+        runs += [
+            ("default (rollback journal)", {}, args.writers, per_commit),
+            ("WAL only", {"journal_mode": "WAL"}, args.writers, per_commit),
+            ("tuned", SQLITE_PRAGMAS, args.writers, per_commit),
+        ]
+
+    rows = []
+    for name, pragmas, writers, per_commit in runs:
+        engine, SessionLocal = make_database("wal", pragmas=pragmas)
+        db = SessionLocal()
+        seed_products(db, args.products)
+        db.close()
+        reads, writes, errors = run(SessionLocal, args, writers, per_commit)
+        read_stats, write_stats = summarize(reads), summarize(writes)
+        rows.append((
+            name,
+            per_commit or "no writes",
+            f"{len(reads) / args.seconds:,.0f}",
+            f"{read_stats['p50_ms']:.2f}",
+            f"{read_stats['p99_ms']:.2f}",
+            f"{max(reads) * 1000:.1f}" if reads else "-",
+            sum(1 for latency in reads if latency > 0.1),
+            f"{len(writes) / args.seconds:,.0f}",
+            f"{write_stats['p99_ms']:.2f}" if writes else "-",
+            len(errors),
+        ))
+        if name == "tuned" and writers:
+            maintenance = SQLiteMaintenance()
+            maintenance.run_once(engine)
+            checkpoint = maintenance.last_checkpoint
+        engine.dispose()
+
+    print_table(("profile", "sales/commit", "reads/s", "read p50 ms", "read p99 ms", "read max ms", "reads > 100 ms", "sales/s", "sale p99 ms", "errors"), rows)
+    print(
+        f"\nmaintenance after the last tuned run: checkpointed {checkpoint['checkpointed_pages']} "
+        f"of {checkpoint['wal_pages']} WAL pages in {maintenance.last_run_ms:.1f} ms"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# benchmarks/check_import_time.py
+
+"""
+Cold-start budget for the API: how long 'import main' takes in a fresh
+interpreter, measured with 'python -X importtime'.
+
+    python -m benchmarks.check_import_time [--budget-ms 1500] [--runs 5]
+
+Exits with status 1 if the median import time is over the budget, or if
+one of the heavy libraries that are meant to load on first use (NumPy for
+the forecasts, the Groq SDK for the chatbot) is imported at startup.
+The import runs in a temporary folder, so it creates and migrates its own
+'inventory.db' there (once, before the measured runs) instead of
+touching the real one.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import Counter
+
+from benchmarks.common import print_table
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded on first use of the prediction / chatbot routes, never at startup
+LAZY_PACKAGES = ("numpy", "pandas", "sklearn", "scipy", "groq")
+
+def import_main(folder: str):
+    """
+    Imports main in a new interpreter. Returns a list of
+    (package, self microseconds, cumulative microseconds, module) rows.
+    """
+    env = dict(os.environ, PYTHONPATH=BACKEND)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=folder, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"'import main' failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        module = module.strip()
+        rows.append((module.split(".")[0], int(self_us), int(cumulative_us), module))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--budget-ms", type=float, default=1500)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="packages to list by import time")
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix="inventory-import-")
+    import_main(folder) # creates and migrates the database; not measured
+
+    totals, packages = [], Counter()
+    for _ in range(args.runs):
+        rows = import_main(folder)
+        totals.append(next(cumulative for _, _, cumulative, module in rows if module == "main") / 1000)
+        for package, self_us, _, _ in rows:
+            packages[package] += self_us / 1000 / args.runs
+    loaded = sorted({package for package, _, _, _ in rows if package in LAZY_PACKAGES})
+
+    print_table(("package", "import ms"), [(p, f"{ms:.1f}") for p, ms in packages.most_common(args.top)])
+    median = statistics.median(totals)
+    print(f"\nimport main: median {median:.0f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    if median > args.budget_ms:
+        print(f"FAIL over budget by {median - args.budget_ms:.0f} ms")
+        failed = True
+    if loaded:
+        print(f"FAIL imported at startup: {', '.join(loaded)}")
+        failed = True
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# benchmarks/common.py
+
+"""
+Shared helpers for the benchmark scripts.
+
+Every benchmark runs against its own throw-away SQLite file so it never
+touches the real 'inventory.db'. Run them from the 'backend' folder, e.g.:
+
+    python -m benchmarks.bench_create_sale
+"""
+
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.cache import forecast_cache, result_cache, token_cache
+from app.database.migrations import run_migrations
+from app.forecast_pool import forecast_pool
+from app.database.session import Base
+from app.database.sqlite_tuning import SQLITE_PRAGMAS, apply_pragmas
+from app.models import model
+
+# The benchmarks measure database work, which the caches would hide.
+# bench_result_cache.py, bench_forecast_cache.py and bench_auth_cache.py
+# turn them back on.
+result_cache.enabled = False
+forecast_cache.enabled = False
+token_cache.enabled = False
+# Forecasts run inline unless a benchmark (bench_forecast_pool.py) enables the pool
+forecast_pool.workers = 0
+
+def make_database(name: str = "bench", pragmas=SQLITE_PRAGMAS):
+    """
+    Creates a fresh SQLite database in a temporary folder, with the
+    app's connection PRAGMAs unless others are given.
+    Returns (engine, SessionLocal).
+    """
+    folder = tempfile.mkdtemp(prefix="inventory-bench-")
+    url = f"sqlite:///{os.path.join(folder, name + '.db')}"
+    engine = apply_pragmas(create_engine(url, connect_args={"check_same_thread": False}), pragmas)
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    return engine, SessionLocal
+
+def seed_products(db, count: int, stock: int = 1_000_000, reorder_point: int = 10, batch: int = 10_000):
+    """
+    Inserts 'count' products with ids 1..count using batched executemany.
+    """
+    table = model.Product.__table__
+    for start in range(0, count, batch):
+        rows = [
+            {
+                "id": i,
+                "name": f"Product {i}",
+                "sku": f"SKU-{i:08d}",
+                "category": f"Category {i % 20}",
+                "currentStock": stock,
+                "reorderPoint": reorder_point,
+                "supplier": f"Supplier {i % 50}",
+            }
+            for i in range(start + 1, min(start + batch, count) + 1)
+        ]
+        db.execute(insert(table), rows)
+    db.commit()
+
+@contextmanager
+def timer():
+    """
+    Usage: 'with timer() as t: ...' then read t() for elapsed seconds.
+    """
+    start = time.perf_counter()
+    elapsed = [None]
+    yield lambda: elapsed[0] if elapsed[0] is not None else time.perf_counter() - start
+    elapsed[0] = time.perf_counter() - start
+
+def percentile(samples, pct: float):
+    """
+    Nearest-rank percentile of a list of numbers.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+def summarize(samples):
+    """
+    Returns mean / p50 / p99 (in milliseconds) for a list of durations in seconds.
+    """
+    ms = [s * 1000 for s in samples]
+    return {
+        "mean_ms": statistics.fmean(ms) if ms else 0.0,
+        "p50_ms": percentile(ms, 50),
+        "p99_ms": percentile(ms, 99),
+    }
+
+def print_table(headers, rows):
+    """
+    Prints a simple fixed-width results table.
+    """
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    line = "  ".join(str(h).rjust(w) for h, w in zip(headers, widths))
+    print(line)
+    print("-" * len(line))
+    for r in rows:
+        print("  ".join(str(v).rjust(w) for v, w in zip(r, widths)))
+
+def make_app(SessionLocal, *routes):
+    """
+    Builds a minimal FastAPI app that mounts the given (router, prefix)
+    pairs, with the sync and async database dependencies pointed at
+    SessionLocal's database instead of the real one.
+    """
+    from fastapi import FastAPI
+    from app.database import session
+
+    AsyncSessionLocal = session.make_async_sessionmaker(SessionLocal.kw["bind"].url)
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    for router, prefix in routes:
+        app.include_router(router, prefix=prefix)
+    app.dependency_overrides[session.get_db] = get_db
+    app.dependency_overrides[session.get_async_db] = get_async_db
+    return app
+
+def make_client(SessionLocal, *routes):
+    """
+    A TestClient for make_app(SessionLocal, *routes).
+    """
+    from fastapi.testclient import TestClient
+    return TestClient(make_app(SessionLocal, *routes))
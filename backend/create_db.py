@@ -17,5 +17,10 @@ print("Connecting to the database and creating tables...")
 # defined in app/models/model.py because we imported it above.
 Base.metadata.create_all(bind=engine)
 
+# Bring an existing database up to date with any schema changes
+# that create_all() cannot make on its own.
+from app.database.migrations import run_migrations
+run_migrations(engine)
+
 print("Database and tables created successfully!")
 print("You should now see an 'inventory.db' file in your project directory.")
\ No newline at end of file
@@ -1,15 +1,41 @@
 # main.py
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware  # >>> ADD THIS IMPORT
-from app.api.endpoints import auth, products, suppliers, orders, dashboard, reorders, predictions, chatbot, customers
+from fastapi.middleware.gzip import GZipMiddleware
+from app.api.endpoints import auth, products, suppliers, orders, dashboard, reorders, predictions, chatbot, customers, stream
 from app.api.api import public_router, private_router
+from app.api import conditional
+from app.cache import forecast_cache, result_cache
+from app.events import event_broker
+from app.forecast_pool import forecast_pool
+from app.password_pool import password_pool
 from app.database.session import engine
+from app.database.migrations import run_migrations
+from app.database.sqlite_tuning import sqlite_maintenance
 from app.models import model
 
 model.Base.metadata.create_all(bind=engine)
+run_migrations(engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background work lives only as long as the server: start it once the
+    # app is serving, stop it on shutdown (not at import).
+    sqlite_maintenance.start(engine)
+    try:
+        yield
+    finally:
+        sqlite_maintenance.stop()
+        forecast_pool.shutdown()
+        password_pool.shutdown()
+
+app = FastAPI(title="AI-Powered Inventory Management System", lifespan=lifespan)
 
-app = FastAPI(title="AI-Powered Inventory Management System")
+# Responses smaller than this are sent uncompressed.
+COMPRESS_MIN_SIZE = 1024
 
 # This is the list of "origins" (your frontend URLs) that are allowed to make requests
 origins = [
@@ -27,12 +53,29 @@ app.add_middleware(
     allow_headers=["*"],       # Allow all headers
 )
 
+# Compress large responses (the product/order lists) for clients that accept it.
+# Brotli is used when the optional 'brotli-asgi' package is installed; it
+# falls back to gzip for clients that do not send 'br'.
+try:
+    from brotli_asgi import BrotliMiddleware
+    app.add_middleware(
+        BrotliMiddleware,
+        minimum_size=COMPRESS_MIN_SIZE,
+        gzip_fallback=True,
+        excluded_handlers=["/api/v1/stream"], # never buffer the live event stream
+    )
+except ImportError:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESS_MIN_SIZE)
+# Added last, so it wraps the compression middleware and sees its headers
+app.add_middleware(conditional.VaryAcceptEncoding)
+
 private_router.include_router(products.router, prefix="/products", tags=["Products"])
 private_router.include_router(orders.router, prefix="/orders", tags=["Orders"])
 private_router.include_router(suppliers.router, prefix="/suppliers", tags=["Suppliers"])
 private_router.include_router(dashboard.router, prefix="/dashboard", tags=["Dashboard"])
 private_router.include_router(reorders.router, prefix="/reorders", tags=["Reorders"])
 private_router.include_router(customers.router, prefix="/customers", tags=["Customers"])
+private_router.include_router(stream.router, prefix="/stream", tags=["Live updates"])
 
 app.include_router(public_router, prefix="/auth", tags=["Authentication"])
 app.include_router(private_router, prefix="/api/v1")
@@ -40,3 +83,45 @@ app.include_router(private_router, prefix="/api/v1")
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Inventory Management API"}
+
+@app.get("/cache-stats", tags=["Monitoring"])
+def read_cache_stats():
+    """
+    Hit, miss and eviction counters for the in-process result cache.
+    """
+    return result_cache.stats()
+
+@app.get("/forecast-cache-stats", tags=["Monitoring"])
+def read_forecast_cache_stats():
+    """
+    Hit rate, evictions and invalidations of the demand forecast cache.
+    """
+    return forecast_cache.stats()
+
+@app.get("/forecast-pool-stats", tags=["Monitoring"])
+def read_forecast_pool_stats():
+    """
+    Forecast worker processes: jobs running or queued, completed, failed and rejected.
+    """
+    return forecast_pool.stats()
+
+@app.get("/password-pool-stats", tags=["Monitoring"])
+def read_password_pool_stats():
+    """
+    Password hashing threads: calls running or queued, completed, failed and rejected.
+    """
+    return password_pool.stats()
+
+@app.get("/stream-stats", tags=["Monitoring"])
+def read_stream_stats():
+    """
+    Connected live-update clients and how many events were sent or dropped.
+    """
+    return event_broker.stats()
+
+@app.get("/database-stats", tags=["Monitoring"])
+def read_database_stats():
+    """
+    SQLite connection PRAGMAs and the last WAL checkpoint / optimize run.
+    """
+    return sqlite_maintenance.stats()
@@ -0,0 +1,111 @@
+# manage.py
+
+"""
+Maintenance commands for the inventory database.
+
+    python manage.py migrate
+    python manage.py reconcile-order-totals [--chunk-size 1000]
+    python manage.py verify-kpis [--fix]
+    python manage.py forecast-demand [--days 30] [--model linear] [--output forecast.csv]
+    python manage.py rebuild-forecast-state
+"""
+
+import argparse
+import csv
+import sys
+
+from app.database.session import Base, SessionLocal, engine
+from app.database.migrations import run_migrations
+from app.models import model # Registers all tables on Base.metadata
+
+def migrate(args):
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    print("Database schema is up to date.")
+
+def reconcile_order_totals(args):
+    from app.crud import crud_order
+
+    db = SessionLocal()
+    try:
+        fixed = crud_order.reconcile_order_totals(db, chunk_size=args.chunk_size)
+    finally:
+        db.close()
+    print(f"Recomputed order totals; {fixed} orders were corrected.")
+
+def verify_kpis(args):
+    from app.crud import crud_kpi
+
+    db = SessionLocal()
+    try:
+        drift = crud_kpi.verify_kpis(db)
+        for entry in drift:
+            print(f"DRIFT {entry['kpi']}: stored={entry['stored']} expected={entry['expected']}")
+        if not drift:
+            print("KPI store matches the base tables.")
+        elif args.fix:
+            crud_kpi.rebuild_kpis(db)
+            print(f"Rebuilt the KPI store ({len(drift)} values were off).")
+    finally:
+        db.close()
+    if drift and not args.fix:
+        raise SystemExit(1)
+
+def forecast_demand(args):
+    from app.crud import crud_prediction
+
+    db = SessionLocal()
+    try:
+        predictions = crud_prediction.predict_demand_batch(db, forecast_days=args.days, forecast_model=args.model)
+    finally:
+        db.close()
+
+    out = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        writer = csv.DictWriter(out, fieldnames=["product_id", "forecast_period_days", "forecast_model", "predicted_demand"])
+        writer.writeheader()
+        writer.writerows(predictions)
+    finally:
+        if args.output:
+            out.close()
+    print(f"Forecast {len(predictions)} products for the next {args.days} days.", file=sys.stderr)
+
+def rebuild_forecast_state(args):
+    from app.crud import crud_forecast
+
+    db = SessionLocal()
+    try:
+        products = crud_forecast.rebuild_forecast_state(db)
+    finally:
+        db.close()
+    print(f"Rebuilt the forecast state for {products} products.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Inventory database maintenance.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("migrate", help="Create missing tables and apply migrations.").set_defaults(func=migrate)
+
+    reconcile = commands.add_parser("reconcile-order-totals", help="Recompute orders.total and orders.item_count.")
+    reconcile.add_argument("--chunk-size", type=int, default=1000)
+    reconcile.set_defaults(func=reconcile_order_totals)
+
+    verify = commands.add_parser("verify-kpis", help="Compare the KPI store with the base tables and report drift.")
+    verify.add_argument("--fix", action="store_true", help="Rebuild the store if any drift is found.")
+    verify.set_defaults(func=verify_kpis)
+
+    forecast = commands.add_parser("forecast-demand", help="Forecast demand for every product with sales, as CSV.")
+    forecast.add_argument("--days", type=int, default=30)
+    forecast.add_argument("--output", help="CSV file to write (default: stdout).")
+    forecast.add_argument("--model", default="linear", help="linear, exponential or seasonal (default: linear).")
+    forecast.set_defaults(func=forecast_demand)
+
+    commands.add_parser(
+        "rebuild-forecast-state", help="Regenerate the forecast buckets and sums from order_details."
+    ).set_defaults(func=rebuild_forecast_state)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
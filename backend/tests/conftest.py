@@ -0,0 +1,47 @@
+# tests/conftest.py
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.cache import forecast_cache, result_cache, token_cache
+from app.database.migrations import run_migrations
+from app.database.session import Base
+from app.database.sqlite_tuning import apply_pragmas
+from app.forecast_pool import forecast_pool
+from app.models import model
+
+@pytest.fixture
+def SessionLocal(tmp_path, monkeypatch):
+    """
+    A sessionmaker bound to a fresh, fully migrated SQLite database.
+    The caches are off (tests look at the queries they would skip) and
+    forecasts run in-process.
+    """
+    for cache in (result_cache, forecast_cache, token_cache):
+        monkeypatch.setattr(cache, "enabled", False)
+    monkeypatch.setattr(forecast_pool, "workers", 0)
+
+    engine = apply_pragmas(create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False}))
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+def seed_products(db, count: int, stock: int = 1000, reorder_point: int = 10):
+    """
+    Inserts products with ids 1..count.
+    """
+    db.execute(insert(model.Product.__table__), [
+        {
+            "id": i,
+            "name": f"Product {i}",
+            "sku": f"SKU-{i:04d}",
+            "category": f"Category {i % 3}",
+            "currentStock": stock,
+            "reorderPoint": reorder_point,
+            "supplier": f"Supplier {i % 2}",
+        }
+        for i in range(1, count + 1)
+    ])
+    db.commit()
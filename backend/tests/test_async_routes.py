@@ -0,0 +1,73 @@
+# tests/test_async_routes.py
+
+"""
+The async routes against a real aiosqlite session: reads, a write, and a
+conditional GET, with the sync CRUD functions run through run_sync. The
+bulk write routes stay on a sync Session in the threadpool.
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import dashboard, orders, products
+from app.database import session
+from conftest import seed_products
+
+@pytest.fixture
+def client(SessionLocal):
+    db = SessionLocal()
+    seed_products(db, 5)
+    db.close()
+
+    AsyncSessionLocal = session.make_async_sessionmaker(SessionLocal.kw["bind"].url)
+
+    async def get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(products.router, prefix="/products")
+    app.include_router(orders.router, prefix="/orders")
+    app.include_router(dashboard.router, prefix="/dashboard")
+    app.dependency_overrides[session.get_async_db] = get_async_db
+    app.dependency_overrides[session.get_db] = get_db
+    with TestClient(app) as client:
+        yield client
+
+def test_read_write_and_conditional_get(client):
+    assert client.get("/products/3").json()["currentStock"] == 1000
+
+    response = client.post("/orders/sales", json={"items_sold": [{"product_id": 3, "quantity": 4}]})
+    assert response.status_code == 200, response.text
+    assert client.get("/products/3").json()["currentStock"] == 996
+    assert client.get("/dashboard/kpis").json()["orders_today"] == 1
+
+    first = client.get("/products/")
+    assert first.status_code == 200
+    # Weak: the same ETag goes out for identity, gzip and br bodies
+    assert first.headers["etag"].startswith('W/"')
+    assert client.get("/products/", headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+
+def test_missing_product_is_404(client):
+    assert client.get("/products/99").status_code == 404
+
+def test_bulk_sales_run_on_a_sync_session(client):
+    body = "\n".join('{"items_sold": [{"product_id": 2, "quantity": 1}]}' for _ in range(3))
+    response = client.post("/orders/sales/bulk", content=body)
+    assert response.status_code == 200, response.text
+    assert response.json()["accepted"] == 3
+    assert client.get("/products/2").json()["currentStock"] == 997
+
+def test_async_url_maps_each_database_to_its_async_driver():
+    assert session.async_url("sqlite:///./inventory.db").drivername == "sqlite+aiosqlite"
+    assert session.async_url("postgresql://user:pw@localhost/inventory").drivername == "postgresql+asyncpg"
+    with pytest.raises(ValueError):
+        session.async_url("mysql://user:pw@localhost/inventory")
@@ -0,0 +1,53 @@
+# tests/test_auth.py
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+
+from app import security
+from app.api.api import public_router
+from app.api.endpoints import auth  # registers the /auth routes on public_router
+from app.crud import crud_login
+from app.database import session
+
+@pytest.fixture
+def client(SessionLocal, monkeypatch):
+    # The cheapest bcrypt cost keeps hashing out of the test's run time
+    monkeypatch.setattr(security, "pwd_context", CryptContext(schemes=["bcrypt"], bcrypt__rounds=4))
+    monkeypatch.setattr(security, "SECRET_KEY", "test-secret")
+    monkeypatch.setattr(security, "ALGORITHM", "HS256")
+    AsyncSessionLocal = session.make_async_sessionmaker(SessionLocal.kw["bind"].url)
+
+    async def get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(public_router, prefix="/auth")
+    app.dependency_overrides[session.get_async_db] = get_async_db
+    with TestClient(app) as client:
+        yield client
+
+def test_duplicate_register_is_400(client):
+    user = {"email": "clerk@example.com", "password": "secret"}
+    assert client.post("/auth/register", json=user).status_code == 200
+    response = client.post("/auth/register", json=user)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Email already registered"
+
+def test_concurrent_duplicate_register_is_400(client, monkeypatch):
+    user = {"email": "clerk@example.com", "password": "secret"}
+    assert client.post("/auth/register", json=user).status_code == 200
+
+    # The second request checked before the first one committed
+    monkeypatch.setattr(crud_login, "get_user_by_email", lambda db, email: None)
+    response = client.post("/auth/register", json=user)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Email already registered"
+
+def test_login(client):
+    client.post("/auth/register", json={"email": "clerk@example.com", "password": "secret"})
+    response = client.post("/auth/login", data={"username": "clerk@example.com", "password": "secret"})
+    assert response.status_code == 200, response.text
+    assert client.post("/auth/login", data={"username": "clerk@example.com", "password": "wrong"}).status_code == 401
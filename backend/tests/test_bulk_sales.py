@@ -0,0 +1,76 @@
+# tests/test_bulk_sales.py
+
+"""
+A bulk upload where some lines fail: each line gets its own result, the
+good sales are recorded, and the bad ones leave no order or stock change
+behind, including across chunk boundaries.
+"""
+
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import orders
+from app.database import session
+from app.models import model
+from conftest import seed_products
+
+STOCK = 5
+
+def line(*items):
+    return json.dumps({"items_sold": [{"product_id": p, "quantity": q} for p, q in items]})
+
+# (body line, expected status); blank lines get no result
+UPLOAD = [
+    (line((1, 2)), "success"),
+    (line((99, 1)), "error"),                 # no such product
+    (line((1, 1), (2, STOCK + 1)), "error"),  # one item short fails the whole sale
+    ('{"items_sold": [', "error"),            # not JSON
+    ("", None),
+    (line((1, 3)), "success"),                # takes product 1 to zero
+    (line((1, 1)), "error"),                  # sold out by the line above
+    (line((2, STOCK)), "success"),
+]
+
+@pytest.fixture
+def client(SessionLocal):
+    db = SessionLocal()
+    seed_products(db, 2, stock=STOCK)
+    db.close()
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(orders.router, prefix="/orders")
+    app.dependency_overrides[session.get_db] = get_db
+    with TestClient(app) as client:
+        yield client
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 500])
+def test_partial_failure_reports_every_line(client, SessionLocal, chunk_size):
+    body = "\n".join(text for text, _ in UPLOAD)
+    response = client.post("/orders/sales/bulk", params={"chunk_size": chunk_size}, content=body)
+    assert response.status_code == 200, response.text
+    summary = response.json()
+
+    expected = [(number, status) for number, (_, status) in enumerate(UPLOAD, start=1) if status]
+    assert [(r["line"], r["status"]) for r in summary["results"]] == expected
+    assert (summary["accepted"], summary["rejected"]) == (3, 4)
+    sale_ids = [r["sale_id"] for r in summary["results"] if r["status"] == "success"]
+    assert all(sale_ids) and len(set(sale_ids)) == 3
+    assert all(r["sale_id"] is None for r in summary["results"] if r["status"] == "error")
+
+    db = SessionLocal()
+    try:
+        assert sorted(order_id for order_id, in db.query(model.Order.id)) == sorted(sale_ids)
+        stock = dict(db.query(model.Product.id, model.Product.currentStock))
+        assert stock == {1: 0, 2: 0}
+    finally:
+        db.close()
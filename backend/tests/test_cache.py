@@ -0,0 +1,63 @@
+# tests/test_cache.py
+
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from app import cache
+
+@pytest.fixture
+def result_cache(monkeypatch):
+    fresh = cache.TTLCache(maxsize=16, ttl=30)
+    monkeypatch.setattr(cache, "result_cache", fresh)
+    return fresh
+
+def make_db():
+    return SimpleNamespace(info={})
+
+def test_cached_result_is_reused(result_cache):
+    calls = []
+
+    @cache.cached("products", returns=int)
+    def read(db):
+        calls.append(1)
+        return len(calls)
+
+    assert read(make_db()) == 1
+    assert read(make_db()) == 1
+    result_cache.invalidate("products")
+    assert read(make_db()) == 2
+
+def test_commit_during_read_is_not_cached_over(result_cache):
+    stock = {"value": 10}
+
+    @cache.cached("products", returns=int)
+    def read(db):
+        value = stock["value"]
+        if value == 10:
+            # A sale commits after the read but before the result is stored
+            stock["value"] = 9
+            result_cache.invalidate("products")
+        return value
+
+    assert read(make_db()) == 10
+    assert read(make_db()) == 9
+
+def test_daily_results_are_keyed_on_the_date(result_cache, monkeypatch):
+    today = {"value": date(2024, 1, 1)}
+
+    class FakeDate(date):
+        @classmethod
+        def today(cls):
+            return today["value"]
+
+    monkeypatch.setattr(cache, "date", FakeDate)
+
+    @cache.cached("kpi_counters", returns=str, daily=True)
+    def read(db):
+        return today["value"].isoformat()
+
+    assert read(make_db()) == "2024-01-01"
+    today["value"] = date(2024, 1, 2)
+    assert read(make_db()) == "2024-01-02"
@@ -0,0 +1,31 @@
+# tests/test_dashboard.py
+
+import pytest
+from sqlalchemy import update
+
+from app import cache
+from app.crud import crud_dashboard
+from app.models import model
+from conftest import seed_products
+
+@pytest.fixture
+def result_cache(monkeypatch):
+    fresh = cache.TTLCache(maxsize=64, ttl=30)
+    monkeypatch.setattr(cache, "result_cache", fresh)
+    return fresh
+
+def test_summary_reads_its_own_snapshot_not_cached_parts(SessionLocal, result_cache):
+    db = SessionLocal()
+    seed_products(db, 3)
+    assert crud_dashboard.get_low_stock_alerts(db) == []
+
+    # A write the cache has not heard of yet (its invalidation is still in
+    # flight): the standalone alerts entry is now stale.
+    db.execute(update(model.Product.__table__).where(model.Product.id == 2).values(currentStock=1))
+    db.commit()
+    assert crud_dashboard.get_low_stock_alerts(db) == []
+
+    summary = crud_dashboard.get_dashboard_summary(db)
+    assert [alert["id"] for alert in summary["low_stock_alerts"]] == [2]
+    assert [task["type"] for task in summary["priority_tasks"]] == ["Low Stock"]
+    db.close()
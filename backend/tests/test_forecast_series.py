@@ -0,0 +1,52 @@
+# tests/test_forecast_series.py
+
+"""
+The smoothing models read the daily series up to yesterday, not up to
+the product's last sale: weeks without sales since then pull the
+forecast down instead of being skipped.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.crud import crud_forecast, crud_prediction
+from conftest import seed_products
+
+TODAY = datetime.utcnow().date()
+
+def record_daily_sales(db, product_id: int, quantity: int, first_days_ago: int, last_days_ago: int):
+    for days_ago in range(first_days_ago, last_days_ago - 1, -1):
+        crud_forecast.record_sales(db, TODAY - timedelta(days=days_ago), {product_id: (quantity, 1)})
+    db.commit()
+
+@pytest.fixture
+def db(SessionLocal):
+    db = SessionLocal()
+    seed_products(db, 2)
+    record_daily_sales(db, 1, 10, first_days_ago=120, last_days_ago=1)  # still selling
+    record_daily_sales(db, 2, 10, first_days_ago=120, last_days_ago=60) # stopped two months ago
+    yield db
+    db.close()
+
+@pytest.mark.parametrize("forecast_model", ["exponential", "seasonal"])
+def test_days_since_the_last_sale_count_as_zero_sales(db, forecast_model):
+    selling = crud_prediction.predict_future_demand(db, 1, 7, forecast_model)["predicted_demand"]
+    stopped = crud_prediction.predict_future_demand(db, 2, 7, forecast_model)["predicted_demand"]
+
+    assert selling == 70
+    # 60 empty days at ALPHA = 0.1 leave well under 1% of the old level
+    assert stopped <= 1
+
+def test_linear_model_still_forecasts_from_the_last_sale(db):
+    # Both products sold a flat 10 a day while they were selling
+    for product_id in (1, 2):
+        assert crud_prediction.predict_future_demand(db, product_id, 7, "linear")["predicted_demand"] == 70
+
+def test_batch_matches_single_product(db):
+    for forecast_model in ("exponential", "seasonal"):
+        batch = crud_prediction.predict_demand_batch(db, forecast_days=7, forecast_model=forecast_model)
+        assert [p["predicted_demand"] for p in batch] == [
+            crud_prediction.predict_future_demand(db, product_id, 7, forecast_model)["predicted_demand"]
+            for product_id in (1, 2)
+        ]
@@ -0,0 +1,162 @@
+# tests/test_forecast_state.py
+
+"""
+The running regression sums in forecast_state must stay equal to a fresh
+rebuild from order_details as sales come in, and the linear model solved
+from them must give the same forecast as the original pandas + sklearn
+LinearRegression implementation.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import insert
+
+from app import forecasting
+from app.crud import crud_forecast, crud_order, crud_prediction
+from app.crud.crud_prediction import STATE_COLUMNS
+from app.models import model
+from app.schemas import schema
+from conftest import seed_products
+
+LinearRegression = pytest.importorskip("sklearn.linear_model").LinearRegression
+
+START = datetime(2024, 1, 1, 9, 0)
+
+# (day, product_id, quantity), loaded with raw inserts and a rebuild
+HISTORY = [
+    (0, 1, 2), (1, 1, 3), (3, 1, 5), (6, 1, 8), (7, 1, 4),    # rising
+    (0, 2, 20), (2, 2, 15), (4, 2, 9), (5, 2, 5),            # falling below zero
+    (0, 3, 4), (0, 3, 3),                                     # two records, one day
+    (2, 5, 7),                                                # one record
+    (1, 6, 5), (3, 6, 5), (8, 6, 5),                          # flat
+]
+
+# Recorded after the rebuild, in time order (sales are stamped with the
+# current time): (day, hour, sales), each sale a list of (product_id,
+# quantity). One sale goes through create_sale, several through one
+# create_sales_bulk chunk.
+LIVE = [
+    (9, 10, [[(1, 6), (2, 1)]]),
+    (9, 15, [[(1, 2), (4, 3), (4, 1)]]),  # the same product twice in one sale
+    (10, 11, [[(3, 2), (6, 4)]]),
+    (11, 12, [[(1, 3)], [(2, 2), (6, 1)], [(4, 2)]]),
+    (12, 9, [[(4, 5)]]),
+    (13, 16, [[(1, 7)], [(3, 1)]]),
+]
+
+PRODUCTS = 6
+HORIZONS = (1, 7, 30)
+
+# The state solves the line in floating point from exact integer sums;
+# sklearn fits it from the points. Both are double precision.
+UNROUNDED_TOLERANCE = 1e-6
+
+def clock(moment):
+    class SimulatedClock(datetime):
+        @classmethod
+        def utcnow(cls):
+            return moment
+    return SimulatedClock
+
+def load_history(db):
+    days = sorted({day for day, _, _ in HISTORY})
+    db.execute(insert(model.Order.__table__), [
+        {"id": day + 1, "order_date": START + timedelta(days=day), "status": "Shipped", "total": 0.0, "item_count": 0}
+        for day in days
+    ])
+    db.execute(insert(model.OrderDetail.__table__), [
+        {"order_id": day + 1, "product_id": product_id, "quantity": quantity, "price_at_sale": 1.0}
+        for day, product_id, quantity in HISTORY
+    ])
+    db.commit()
+    crud_forecast.rebuild_forecast_state(db)
+
+def record_live_sales(db, monkeypatch):
+    for day, hour, sales in LIVE:
+        monkeypatch.setattr(crud_order, "datetime", clock(START.replace(hour=hour) + timedelta(days=day)))
+        sales = [
+            schema.SaleCreate(items_sold=[schema.ItemSold(product_id=p, quantity=q) for p, q in items])
+            for items in sales
+        ]
+        if len(sales) == 1:
+            crud_order.create_sale(db, sales[0])
+        else:
+            crud_order.create_sales_bulk(db, list(enumerate(sales)))
+
+def sklearn_forecast(db, product_id: int, forecast_days: int):
+    """
+    The original implementation: a LinearRegression through the daily
+    totals, x = days since the first sale. Returns the unrounded total,
+    or None where it could not fit a line.
+    """
+    rows = (
+        db.query(model.Order.order_date, model.OrderDetail.quantity)
+          .join(model.Order)
+          .filter(model.OrderDetail.product_id == product_id)
+          .all()
+    )
+    daily = defaultdict(int)
+    for order_date, quantity in rows:
+        daily[order_date.date()] += quantity
+    if len(rows) < 2 or len(daily) < 2:
+        return None
+    first = min(daily)
+    x = np.array([(day - first).days for day in daily], dtype=float).reshape(-1, 1)
+    y = np.array(list(daily.values()), dtype=float)
+    line = LinearRegression().fit(x, y)
+    future = np.arange(x.max() + 1, x.max() + 1 + forecast_days).reshape(-1, 1)
+    return float(np.clip(line.predict(future), 0, None).sum())
+
+def stored_states(db):
+    rows = db.query(model.ForecastState).order_by(model.ForecastState.product_id).all()
+    return {name: np.array([getattr(row, name) for row in rows], dtype=np.int64) for name in ("product_id", *STATE_COLUMNS)}
+
+@pytest.fixture
+def db(SessionLocal, monkeypatch):
+    db = SessionLocal()
+    seed_products(db, PRODUCTS)
+    load_history(db)
+    record_live_sales(db, monkeypatch)
+    yield db
+    db.close()
+
+def test_incremental_state_equals_rebuild(db):
+    stored = stored_states(db)
+    _, rebuilt = crud_forecast.compute_states(db)
+
+    assert stored["product_id"].tolist() == [1, 2, 3, 4, 5, 6]
+    for name in ("product_id", *STATE_COLUMNS):
+        assert stored[name].tolist() == rebuilt[name].tolist(), name
+
+@pytest.mark.parametrize("forecast_days", HORIZONS)
+def test_linear_forecast_matches_linear_regression(db, forecast_days):
+    states = stored_states(db)
+    fittable = states["days"] >= 2
+    subset = {name: values[fittable] for name, values in states.items()}
+    daily = forecasting.MODELS["linear"][1](subset, None, forecast_days)
+    unrounded = dict(zip(subset["product_id"].tolist(), np.clip(daily, 0, None).sum(axis=1).tolist()))
+
+    for product_id in range(1, PRODUCTS + 1):
+        reference = sklearn_forecast(db, product_id, forecast_days)
+        result = crud_prediction.predict_future_demand(db, product_id, forecast_days)
+        if reference is None:
+            assert "error" in result
+            assert product_id not in unrounded
+            continue
+        assert unrounded[product_id] == pytest.approx(reference, abs=UNROUNDED_TOLERANCE)
+        # Rounded totals agree except on an exact .5, which either side may round
+        assert abs(result["predicted_demand"] - reference) <= 0.5 + UNROUNDED_TOLERANCE
+
+@pytest.mark.parametrize("forecast_days", HORIZONS)
+def test_batch_matches_single_product(db, forecast_days):
+    batch = {p["product_id"]: p["predicted_demand"] for p in crud_prediction.predict_demand_batch(db, forecast_days=forecast_days)}
+    for product_id in range(1, PRODUCTS + 1):
+        single = crud_prediction.predict_future_demand(db, product_id, forecast_days)
+        assert batch.get(product_id) == single.get("predicted_demand")
+
+def test_zero_day_horizon(db):
+    result = crud_prediction.predict_future_demand(db, 1, 0)
+    assert result["predicted_demand"] == 0
@@ -0,0 +1,92 @@
+# tests/test_kpi_counters.py
+
+"""
+The low_stock_items counter is kept up to date by the sales themselves.
+Concurrent sales that all read the stock before any of them writes must
+still count the reorder-point crossing exactly once.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+from app.crud import crud_kpi, crud_order
+from app.schemas import schema
+from conftest import seed_products
+
+# Fewer sales than the engine's 15 pooled connections, so all of them can
+# be holding one at the barrier at once
+SALES = 12
+STOCK = 8
+REORDER_POINT = 5
+
+def sale(*items):
+    return schema.SaleCreate(items_sold=[schema.ItemSold(product_id=p, quantity=q) for p, q in items])
+
+@pytest.fixture
+def readers_in_step(monkeypatch):
+    """
+    Holds every sale after its stock read until all of them have read,
+    so each one decides on a snapshot the others are about to change.
+    """
+    barrier = threading.Barrier(SALES)
+    waited = threading.local()
+    original = crud_order._get_products_by_id
+
+    def read_then_wait(db, product_ids):
+        products = original(db, product_ids)
+        # Only the first read: a bulk chunk that loses the race reads again
+        if not getattr(waited, "done", False):
+            waited.done = True
+            barrier.wait(timeout=10)
+        return products
+
+    monkeypatch.setattr(crud_order, "_get_products_by_id", read_then_wait)
+
+def run_concurrently(SessionLocal, record):
+    def one(_):
+        db = SessionLocal()
+        try:
+            record(db)
+            return True
+        except HTTPException:
+            return False
+        finally:
+            db.close()
+
+    with ThreadPoolExecutor(SALES) as pool:
+        return list(pool.map(one, range(SALES)))
+
+def test_concurrent_sales_count_the_crossing_once(SessionLocal, readers_in_step):
+    db = SessionLocal()
+    seed_products(db, 2, stock=STOCK, reorder_point=REORDER_POINT)
+    crud_kpi.rebuild_kpis(db)
+    db.close()
+
+    outcomes = run_concurrently(SessionLocal, lambda db: crud_order.create_sale(db, sale((1, 1), (2, 1))))
+
+    db = SessionLocal()
+    try:
+        # The guarded decrement lets exactly STOCK sales through
+        assert outcomes.count(True) == STOCK
+        assert crud_kpi.verify_kpis(db) == []
+        assert crud_kpi.get_kpis(db, date.today())["low_stock_items"] == 2
+    finally:
+        db.close()
+
+def test_concurrent_bulk_chunks_count_the_crossing_once(SessionLocal, readers_in_step):
+    db = SessionLocal()
+    seed_products(db, 1, stock=STOCK, reorder_point=REORDER_POINT)
+    crud_kpi.rebuild_kpis(db)
+    db.close()
+
+    run_concurrently(SessionLocal, lambda db: crud_order.create_sales_bulk(db, [(1, sale((1, 1)))]))
+
+    db = SessionLocal()
+    try:
+        assert crud_kpi.verify_kpis(db) == []
+    finally:
+        db.close()
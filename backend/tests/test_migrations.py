@@ -0,0 +1,183 @@
+# tests/test_migrations.py
+
+"""
+Upgrades a database created by the first release of the app (before any
+migration existed) the way main.py does: create_all(), then every
+migration in order.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+from sqlalchemy import create_engine, inspect, text
+
+from app.database.migrations import MIGRATIONS, run_migrations
+from app.database.session import Base
+
+# The schema create_all() built from the original models
+BASELINE_SCHEMA = """
+CREATE TABLE products (
+    id INTEGER NOT NULL, name VARCHAR, sku VARCHAR, category VARCHAR,
+    "currentStock" INTEGER, "reorderPoint" INTEGER, supplier VARCHAR,
+    PRIMARY KEY (id)
+);
+CREATE INDEX ix_products_id ON products (id);
+CREATE INDEX ix_products_name ON products (name);
+CREATE INDEX ix_products_category ON products (category);
+CREATE UNIQUE INDEX ix_products_sku ON products (sku);
+CREATE TABLE suppliers (
+    id INTEGER NOT NULL, name VARCHAR, contact_person VARCHAR, email VARCHAR,
+    contact_number VARCHAR, category VARCHAR,
+    PRIMARY KEY (id)
+);
+CREATE INDEX ix_suppliers_id ON suppliers (id);
+CREATE INDEX ix_suppliers_category ON suppliers (category);
+CREATE INDEX ix_suppliers_name ON suppliers (name);
+CREATE TABLE users (
+    id INTEGER NOT NULL, email VARCHAR NOT NULL, hashed_password VARCHAR NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE UNIQUE INDEX ix_users_email ON users (email);
+CREATE INDEX ix_users_id ON users (id);
+CREATE TABLE customers (
+    id INTEGER NOT NULL, name VARCHAR, email VARCHAR, phone VARCHAR, address VARCHAR,
+    PRIMARY KEY (id)
+);
+CREATE INDEX ix_customers_id ON customers (id);
+CREATE INDEX ix_customers_name ON customers (name);
+CREATE TABLE orders (
+    id INTEGER NOT NULL, customer_id INTEGER,
+    order_date DATETIME DEFAULT CURRENT_TIMESTAMP, status VARCHAR,
+    PRIMARY KEY (id), FOREIGN KEY(customer_id) REFERENCES customers (id)
+);
+CREATE INDEX ix_orders_id ON orders (id);
+CREATE TABLE purchase_orders (
+    id INTEGER NOT NULL, supplier_id INTEGER,
+    order_date DATETIME DEFAULT CURRENT_TIMESTAMP, status VARCHAR,
+    PRIMARY KEY (id), FOREIGN KEY(supplier_id) REFERENCES suppliers (id)
+);
+CREATE INDEX ix_purchase_orders_id ON purchase_orders (id);
+CREATE TABLE order_details (
+    id INTEGER NOT NULL, order_id INTEGER, product_id INTEGER, quantity INTEGER,
+    price_at_sale FLOAT,
+    PRIMARY KEY (id), FOREIGN KEY(order_id) REFERENCES orders (id),
+    FOREIGN KEY(product_id) REFERENCES products (id)
+);
+CREATE INDEX ix_order_details_id ON order_details (id);
+CREATE TABLE purchase_order_details (
+    id INTEGER NOT NULL, purchase_order_id INTEGER, product_id INTEGER, quantity INTEGER,
+    PRIMARY KEY (id), FOREIGN KEY(purchase_order_id) REFERENCES purchase_orders (id),
+    FOREIGN KEY(product_id) REFERENCES products (id)
+);
+CREATE INDEX ix_purchase_order_details_id ON purchase_order_details (id);
+"""
+
+BASELINE_DATA = """
+INSERT INTO suppliers (id, name) VALUES (1, 'Acme'), (2, 'Globex');
+INSERT INTO products (id, name, sku, "currentStock", "reorderPoint", supplier) VALUES
+    (1, 'Bolt', 'B-1', 100, 10, 'Acme'),
+    (2, 'Nut', 'N-1', 5, 10, 'Globex'),
+    (3, 'Washer', 'W-1', 10, 10, 'Nobody');
+INSERT INTO orders (id, order_date, status) VALUES
+    (1, '2024-01-02 10:00:00', 'Completed'),
+    (2, '2024-01-02 11:30:00', 'Pending'),
+    (3, '2024-01-05 09:15:00', 'Completed');
+INSERT INTO order_details (order_id, product_id, quantity, price_at_sale) VALUES
+    (1, 1, 3, 2.5), (1, 2, 1, 1.0), (2, 1, 2, 2.5), (3, 1, 4, 2.5);
+"""
+
+def make_baseline_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    with engine.begin() as conn:
+        for script in (BASELINE_SCHEMA, BASELINE_DATA):
+            for statement in script.split(";"):
+                if statement.strip():
+                    conn.exec_driver_sql(statement)
+    return engine
+
+def test_upgrade_baseline_database(tmp_path):
+    engine = make_baseline_database(tmp_path)
+
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+    with engine.connect() as conn:
+        applied = {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+        assert applied == {version for version, _, _ in MIGRATIONS}
+
+        # 1: one timestamp format
+        dates = conn.execute(text("SELECT order_date FROM orders ORDER BY id")).scalars().all()
+        assert dates == ["2024-01-02 10:00:00.000000", "2024-01-02 11:30:00.000000", "2024-01-05 09:15:00.000000"]
+
+        # 3: stored order totals and line counts
+        totals = conn.execute(text("SELECT total, item_count FROM orders ORDER BY id")).all()
+        assert [tuple(row) for row in totals] == [(8.5, 2), (5.0, 1), (10.0, 1)]
+
+        # 4: the KPI store matches the base tables (Nut and Washer are low)
+        daily = conn.execute(text("SELECT day, revenue, order_count FROM kpi_daily_sales ORDER BY day")).all()
+        assert [tuple(row) for row in daily] == [("2024-01-02", 13.5, 2), ("2024-01-05", 10.0, 1)]
+        counters = dict(conn.execute(text("SELECT name, value FROM kpi_counters")).all())
+        assert counters == {"pending_orders": 1, "low_stock_items": 2}
+
+        # 8: the forecast buckets and regression sums (day 19724 is 2024-01-02)
+        buckets = conn.execute(text("SELECT product_id, day, quantity FROM forecast_daily ORDER BY product_id, day")).all()
+        assert [tuple(row) for row in buckets] == [(1, 19724, 5), (1, 19727, 4), (2, 19724, 1)]
+        states = conn.execute(text(
+            "SELECT product_id, first_day, last_day, days, records, sum_x, sum_y, sum_xy, sum_xx "
+            "FROM forecast_state ORDER BY product_id"
+        )).all()
+        assert [tuple(row) for row in states] == [
+            (1, 19724, 19727, 2, 3, 3, 9, 12, 9),
+            (2, 19724, 19724, 1, 1, 0, 1, 0, 0),
+        ]
+
+        # 6: the generated deficit column
+        deficits = conn.execute(text("SELECT stock_deficit FROM products ORDER BY id")).scalars().all()
+        assert deficits == [-90, 5, 0]
+
+        # 10: products linked to their supplier by id
+        links = conn.execute(text("SELECT supplier_id FROM products ORDER BY id")).scalars().all()
+        assert links == [1, 2, None]
+
+    indexes = {
+        index["name"]
+        for table in ("orders", "order_details", "products", "purchase_orders", "purchase_order_details")
+        for index in inspect(engine).get_indexes(table)
+    }
+    assert {
+        "ix_orders_order_date_id",
+        "ix_orders_status_order_date",
+        "ix_order_details_order_id",
+        "ix_order_details_product_id_order_id",
+        "ix_products_low_stock",
+        "ix_products_supplier_id",
+        "ix_purchase_orders_status",
+        "ix_purchase_order_details_product_id",
+    } <= indexes
+
+def test_migrations_run_once(tmp_path):
+    engine = make_baseline_database(tmp_path)
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    run_migrations(engine)
+
+    with engine.connect() as conn:
+        count = conn.execute(text("SELECT count(*) FROM schema_migrations")).scalar()
+    assert count == len(MIGRATIONS)
+
+def test_migrations_load_neither_crud_nor_numpy(tmp_path):
+    # In a fresh interpreter: the test session has long imported both
+    script = (
+        "import sys\n"
+        "from sqlalchemy import create_engine\n"
+        "from app.database.migrations import run_migrations\n"
+        "from app.database.session import Base\n"
+        f"engine = create_engine('sqlite:///{tmp_path / 'fresh.db'}')\n"
+        "Base.metadata.create_all(bind=engine)\n"
+        "run_migrations(engine)\n"
+        "print(sorted(m for m in sys.modules if m == 'numpy' or m.startswith('app.crud')))\n"
+    )
+    backend = Path(__file__).resolve().parent.parent
+    result = subprocess.run([sys.executable, "-c", script], cwd=backend, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
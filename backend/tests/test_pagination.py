@@ -0,0 +1,84 @@
+# tests/test_pagination.py
+
+"""
+Walking a list endpoint page by page with 'next_cursor' returns every row
+once, in the same order as one unpaged read. A cursor the server did not
+hand out is a 400, not a 500.
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import orders, products
+from app.crud import crud_order
+from app.database import session
+from app.schemas import schema
+from conftest import seed_products
+
+PRODUCTS = 7
+ORDERS = 5
+PAGE = 3
+
+BAD_CURSORS = [
+    "not base64!",
+    "bm90IGpzb24",      # "not json"
+    "eyJpZCI6MX0",      # {"id":1}, not a list
+    "WzEsMl0",          # [1,2], the wrong length for products
+]
+
+@pytest.fixture
+def client(SessionLocal):
+    db = SessionLocal()
+    seed_products(db, PRODUCTS)
+    for i in range(ORDERS):
+        crud_order.create_sale(db, schema.SaleCreate(items_sold=[schema.ItemSold(product_id=i + 1, quantity=1)]))
+    db.close()
+
+    AsyncSessionLocal = session.make_async_sessionmaker(SessionLocal.kw["bind"].url)
+
+    async def get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(products.router, prefix="/products")
+    app.include_router(orders.router, prefix="/orders")
+    app.dependency_overrides[session.get_async_db] = get_async_db
+    with TestClient(app) as client:
+        yield client
+
+def walk(client, path):
+    """
+    Follows next_cursor from the first page to the last and returns
+    every item seen.
+    """
+    items, cursor = [], ""
+    while cursor is not None:
+        response = client.get(path, params={"cursor": cursor, "limit": PAGE})
+        assert response.status_code == 200, response.text
+        page = response.json()
+        assert len(page["items"]) <= PAGE
+        items.extend(page["items"])
+        cursor = page["next_cursor"]
+    return items
+
+@pytest.mark.parametrize("path, total", [("/products/", PRODUCTS), ("/orders/", ORDERS)])
+def test_cursor_pages_cover_the_list_once(client, path, total):
+    paged = walk(client, path)
+    unpaged = client.get(path, params={"limit": 100}).json()
+
+    assert len(paged) == total
+    assert [row["id"] for row in paged] == [row["id"] for row in unpaged]
+
+@pytest.mark.parametrize("path", ["/products/", "/orders/"])
+@pytest.mark.parametrize("cursor", BAD_CURSORS)
+def test_bad_cursor_is_400(client, path, cursor):
+    response = client.get(path, params={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid pagination cursor."
+
+def test_order_cursor_with_a_bad_date_is_400(client):
+    # ["yesterday", 1]: the right shape, but not an ISO timestamp
+    response = client.get("/orders/", params={"cursor": "WyJ5ZXN0ZXJkYXkiLDFd"})
+    assert response.status_code == 400
@@ -0,0 +1,96 @@
+# tests/test_pools.py
+
+import asyncio
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+
+from app import password_pool, security
+from app.forecast_pool import ForecastPool, PoolBusy
+from app.password_pool import PasswordPool
+
+@pytest.fixture
+def forecast_pool():
+    pool = ForecastPool(workers=1, queue_limit=1, nice=0)
+    yield pool
+    pool.shutdown()
+
+def test_forecast_pool_counts_failures_apart_from_completed_jobs(forecast_pool):
+    assert forecast_pool.run(math.sqrt, 16.0) == 4.0
+    with pytest.raises(ValueError):
+        forecast_pool.run(math.sqrt, -1.0)
+
+    stats = forecast_pool.stats()
+    assert (stats["completed"], stats["failed"], stats["rejected"], stats["in_flight"]) == (1, 1, 0, 0)
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+def test_saturated_forecast_pool_rejects_at_once(forecast_pool):
+    # workers + queue_limit = 2 jobs fill it
+    with ThreadPoolExecutor(2) as callers:
+        jobs = [callers.submit(forecast_pool.run, time.sleep, 1.0) for _ in range(2)]
+        wait_for(lambda: forecast_pool.in_flight == 2)
+
+        started = time.monotonic()
+        with pytest.raises(PoolBusy):
+            forecast_pool.run(math.sqrt, 4.0)
+        assert time.monotonic() - started < 0.5
+        for job in jobs:
+            job.result()
+
+    # Room again once the jobs are done
+    assert forecast_pool.run(math.sqrt, 4.0) == 2.0
+    stats = forecast_pool.stats()
+    assert (stats["completed"], stats["rejected"], stats["in_flight"]) == (3, 1, 0)
+
+def test_password_pool_counts_failures_apart_from_completed_calls():
+    pool = PasswordPool(workers=1, queue_limit=1)
+    try:
+        assert asyncio.run(pool.run(math.sqrt, 16.0)) == 4.0
+        with pytest.raises(ValueError):
+            asyncio.run(pool.run(math.sqrt, -1.0))
+    finally:
+        pool.shutdown()
+
+    stats = pool.stats()
+    assert (stats["completed"], stats["failed"], stats["rejected"], stats["in_flight"]) == (1, 1, 0, 0)
+
+def test_saturated_password_pool_answers_503(monkeypatch):
+    pool = PasswordPool(workers=1, queue_limit=1)
+    monkeypatch.setattr(security, "password_pool", pool)
+    release = threading.Event()
+
+    async def saturate():
+        # workers + queue_limit = 2 calls fill it
+        held = [asyncio.ensure_future(pool.run(release.wait, 5.0)) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert pool.in_flight == 2
+
+        with pytest.raises(password_pool.PoolBusy):
+            await pool.run(math.sqrt, 4.0)
+        # The auth routes turn it into a 503 the client can retry
+        with pytest.raises(HTTPException) as raised:
+            await security.hash_password("secret")
+        assert raised.value.status_code == 503
+        assert raised.value.headers == {"Retry-After": "1"}
+
+        release.set()
+        assert await asyncio.gather(*held) == [True, True]
+        return await pool.run(math.sqrt, 4.0)
+
+    try:
+        assert asyncio.run(saturate()) == 2.0
+    finally:
+        release.set()
+        pool.shutdown()
+
+    stats = pool.stats()
+    assert (stats["completed"], stats["rejected"], stats["in_flight"]) == (3, 2, 0)
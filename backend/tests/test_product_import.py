@@ -0,0 +1,61 @@
+# tests/test_product_import.py
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import streaming
+from app.api.endpoints import products
+from app.database import session
+from conftest import seed_products
+
+HEADER = "name,sku,category,currentStock,reorderPoint,supplier\n"
+
+@pytest.fixture
+def client(SessionLocal):
+    db = SessionLocal()
+    seed_products(db, 2)
+    db.close()
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(products.router, prefix="/products")
+    app.dependency_overrides[session.get_db] = get_db
+    with TestClient(app) as client:
+        yield client
+
+def import_csv(client, body: bytes):
+    return client.post("/products/import?format=csv", content=body)
+
+def test_counts_only_rows_that_changed_something(client):
+    body = (
+        HEADER
+        + "Product 1,SKU-0001,Category 1,1000,10,Supplier 1\n"   # identical to the stored row
+        + "Product 2,SKU-0002,Category 2,5,10,Supplier 0\n"      # new stock
+        + "Gadget,SKU-0100,Category 0,7,3,Supplier 0\n"          # new product...
+        + "Gadget,SKU-0100,Category 0,9,3,Supplier 0\n"          # ...listed again: the last row wins
+    ).encode()
+    response = import_csv(client, body)
+    assert response.status_code == 200, response.text
+    summary = response.json()
+    assert (summary["inserted"], summary["updated"], summary["unchanged"], summary["rejected"]) == (1, 1, 2, 0)
+
+    # Importing the same file again changes nothing
+    summary = import_csv(client, body).json()
+    assert (summary["inserted"], summary["updated"], summary["unchanged"]) == (0, 0, 4)
+
+def test_overlong_line_is_413(client):
+    line = "x" * (streaming.MAX_LINE_BYTES + 1)
+    assert import_csv(client, (HEADER + line).encode()).status_code == 413
+    assert import_csv(client, (HEADER + line + "\n").encode()).status_code == 413
+
+def test_undecodable_line_is_400(client):
+    response = import_csv(client, HEADER.encode() + b"Caf\xe9,SKU-0200,Category 0,1,1,Supplier 0\n")
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Line 2 is not valid utf-8."
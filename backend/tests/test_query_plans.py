@@ -0,0 +1,88 @@
+# tests/test_query_plans.py
+
+"""
+Runs the hot read/write paths against a small database, captures every
+SQL statement they execute, and checks its EXPLAIN QUERY PLAN: no full
+table scans, and the indexes each path was built around are used.
+"""
+
+import re
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event, func
+
+from app.crud import crud_customer, crud_dashboard, crud_order, crud_prediction, crud_product, crud_reorder, crud_supplier
+from app.models import model
+from app.schemas import schema
+from conftest import seed_products
+
+# "SCAN <table>" with no "USING ... INDEX" is a full table scan.
+# Scans of subqueries (anon_1, ...) read rows that were already found by index.
+FULL_SCAN = re.compile(r"^SCAN (?!anon_)(\w+)$")
+
+NOW = datetime.utcnow()
+
+def sale(db):
+    crud_order.create_sale(db, schema.SaleCreate(items_sold=[
+        schema.ItemSold(product_id=1, quantity=1), schema.ItemSold(product_id=2, quantity=1)
+    ]))
+
+# (label, fn(db), indexes its plans must use)
+HOT_PATHS = [
+    ("dashboard KPIs", crud_dashboard.get_dashboard_kpis, []),
+    ("low-stock recount", lambda db: db.query(func.count(model.Product.id)).filter(model.LOW_STOCK).scalar(), ["ix_products_low_stock"]),
+    ("low-stock alerts", crud_dashboard.get_low_stock_alerts, ["ix_products_low_stock"]),
+    ("priority tasks", crud_dashboard.get_priority_tasks, ["ix_orders_status_order_date", "ix_purchase_orders_status"]),
+    ("orders first page", lambda db: crud_order.get_all_orders(db, limit=100), ["ix_orders_order_date_id"]),
+    ("orders cursor page", lambda db: crud_order.get_all_orders(db, limit=100, after=(NOW, 10)), ["ix_orders_order_date_id"]),
+    ("order details", lambda db: crud_order.get_order_details(db, order_id=1), ["ix_order_details_order_id"]),
+    ("products cursor page", lambda db: crud_product.get_products(db, limit=100, after_id=10), []),
+    ("suppliers cursor page", lambda db: crud_supplier.get_suppliers(db, limit=100, after_id=10), []),
+    ("customers cursor page", lambda db: crud_customer.get_customers(db, limit=100, after_id=10), []),
+    ("forecast state", lambda db: crud_prediction.predict_future_demand(db, product_id=1), []),
+    ("reorder suggestions", crud_reorder.get_reorder_suggestions, ["ix_products_low_stock", "ix_purchase_order_details_product_id"]),
+    ("create_sale", sale, []),
+]
+
+def query_plans(SessionLocal, fn):
+    """
+    Runs 'fn(db)' and returns the EXPLAIN QUERY PLAN details of every
+    SELECT, UPDATE and DELETE it executed.
+    """
+    engine = SessionLocal.kw["bind"]
+    db = SessionLocal()
+    seed_products(db, 50)
+    for _ in range(3):
+        crud_order.create_sale(db, schema.SaleCreate(items_sold=[schema.ItemSold(product_id=1, quantity=1)]))
+    db.close()
+
+    captured = []
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters[0] if executemany else parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    db = SessionLocal()
+    try:
+        fn(db)
+    finally:
+        db.close()
+        event.remove(engine, "before_cursor_execute", capture)
+
+    details = []
+    with engine.connect() as conn:
+        for statement, parameters in captured:
+            if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+                plan = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+                details.extend(row[-1] for row in plan)
+    return details
+
+@pytest.mark.parametrize("fn, indexes", [(fn, indexes) for _, fn, indexes in HOT_PATHS], ids=[label for label, _, _ in HOT_PATHS])
+def test_hot_path_uses_indexes(SessionLocal, fn, indexes):
+    details = query_plans(SessionLocal, fn)
+
+    assert details, "no statements were captured"
+    scans = [detail for detail in details if FULL_SCAN.match(detail)]
+    assert scans == []
+    for index in indexes:
+        assert any(index in detail for detail in details), f"{index} not used: {details}"
@@ -0,0 +1,106 @@
+# tests/test_reorder.py
+
+"""
+Reorder quantities: each low-stock product is topped up to its reorder
+point plus the forecast demand over the cover period (plus its reorder
+point again without a forecast), and the plan orders exactly those
+quantities, one purchase order per supplier.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from app.crud import crud_forecast, crud_reorder
+from app.models import model
+
+START = datetime(2024, 1, 1, 9, 0)
+COVER_DAYS = 7
+DAILY_SALES = 2 # product 4 sells this much every day: a flat forecast
+
+SUPPLIERS = [(1, "Acme"), (2, "Globex")]
+
+# (id, currentStock, reorderPoint, supplier name, supplier_id)
+PRODUCTS = [
+    (1, 3, 10, "Acme", 1),       # low, no sales history
+    (2, 15, 10, "Acme", 1),      # not low
+    (3, 2, 10, "Acme", 1),       # low, already on a pending order
+    (4, 4, 10, "Globex", 2),     # low, with a forecast
+    (5, 9, 10, "Initech", None), # low, supplier unknown
+    (6, 0, 0, "Globex", 2),      # exactly at its reorder point
+]
+
+# product_id -> recommended_order_quantity
+EXPECTED = {
+    1: 10 + 10 - 3,
+    4: 10 + DAILY_SALES * COVER_DAYS - 4,
+    5: 10 + 10 - 9,
+    6: 1, # the target is already met; still order at least one
+}
+
+@pytest.fixture
+def db(SessionLocal):
+    db = SessionLocal()
+    db.execute(insert(model.Supplier.__table__), [{"id": i, "name": name} for i, name in SUPPLIERS])
+    db.execute(insert(model.Product.__table__), [
+        {"id": i, "name": f"Product {i}", "sku": f"SKU-{i:04d}", "category": "Category",
+         "currentStock": stock, "reorderPoint": reorder_point, "supplier": supplier, "supplier_id": supplier_id}
+        for i, stock, reorder_point, supplier, supplier_id in PRODUCTS
+    ])
+
+    # Product 3 is on a pending order; product 1's order was already received
+    db.execute(insert(model.PurchaseOrder.__table__), [
+        {"id": 1, "supplier_id": 1, "order_date": START, "status": "Pending"},
+        {"id": 2, "supplier_id": 1, "order_date": START, "status": "Received"},
+    ])
+    db.execute(insert(model.PurchaseOrderDetail.__table__), [
+        {"purchase_order_id": 1, "product_id": 3, "quantity": 20},
+        {"purchase_order_id": 2, "product_id": 1, "quantity": 20},
+    ])
+
+    db.execute(insert(model.Order.__table__), [
+        {"id": day + 1, "order_date": START + timedelta(days=day), "status": "Shipped", "total": 0.0, "item_count": 0}
+        for day in range(4)
+    ])
+    db.execute(insert(model.OrderDetail.__table__), [
+        {"order_id": day + 1, "product_id": 4, "quantity": DAILY_SALES, "price_at_sale": 1.0}
+        for day in range(4)
+    ])
+    db.commit()
+    crud_forecast.rebuild_forecast_state(db)
+    yield db
+    db.close()
+
+def test_suggested_quantities(db):
+    suggestions = crud_reorder.get_reorder_suggestions(db, cover_days=COVER_DAYS)
+
+    # Most severe shortage first
+    assert [s["product_id"] for s in suggestions] == [1, 4, 5, 6]
+    assert {s["product_id"]: s["recommended_order_quantity"] for s in suggestions} == EXPECTED
+    assert {s["product_id"]: s["forecast_demand"] for s in suggestions} == {1: None, 4: DAILY_SALES * COVER_DAYS, 5: None, 6: None}
+
+def test_plan_orders_the_suggested_quantities(db):
+    plan = crud_reorder.create_reorder_plan(db, cover_days=COVER_DAYS)
+
+    assert [(po["supplier_id"], po["item_count"], po["total_quantity"]) for po in plan["purchase_orders"]] == [
+        (1, 1, EXPECTED[1]),
+        (2, 2, EXPECTED[4] + EXPECTED[6]),
+    ]
+    assert [s["product_id"] for s in plan["skipped"]] == [5]
+
+    ordered = dict(
+        db.query(model.PurchaseOrderDetail.product_id, model.PurchaseOrderDetail.quantity)
+          .filter(model.PurchaseOrderDetail.purchase_order_id.in_([po["purchase_order_id"] for po in plan["purchase_orders"]]))
+          .all()
+    )
+    assert ordered == {1: EXPECTED[1], 4: EXPECTED[4], 6: EXPECTED[6]}
+
+    # Everything ordered is now pending, so only the unknown supplier's product is left
+    assert [s["product_id"] for s in crud_reorder.get_reorder_suggestions(db, cover_days=COVER_DAYS)] == [5]
+
+def test_plan_limited_to_some_products(db):
+    plan = crud_reorder.create_reorder_plan(db, cover_days=COVER_DAYS, product_ids=[4])
+
+    assert [(po["supplier_id"], po["total_quantity"]) for po in plan["purchase_orders"]] == [(2, EXPECTED[4])]
+    assert plan["skipped"] == []
@@ -0,0 +1,122 @@
+# tests/test_token_cache.py
+
+"""
+A validated token is served from token_cache until the earlier of its
+'exp' and the cache TTL, and a commit that touches users drops it. The
+cache's clock is moved forward instead of sleeping; the JWT itself is
+still checked against the real time.
+"""
+
+import asyncio
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app import cache, security
+from app.cache import token_cache
+from app.crud import crud_login
+from app.database import session
+from app.models import model
+from app.schemas import schema
+
+EMAIL = "clerk@example.com"
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    The monotonic clock token_cache reads; advance it with clock.skip(seconds).
+    """
+    clock = SimpleNamespace(offset=0.0)
+    clock.monotonic = lambda: time.monotonic() + clock.offset
+    clock.skip = lambda seconds: setattr(clock, "offset", clock.offset + seconds)
+    monkeypatch.setattr(cache, "time", clock)
+    return clock
+
+@pytest.fixture
+def lookups(monkeypatch):
+    """
+    The emails get_current_user looked up in the database.
+    """
+    seen = []
+    original = crud_login.get_user_by_email
+
+    def counting(db, email):
+        seen.append(email)
+        return original(db, email)
+
+    monkeypatch.setattr(crud_login, "get_user_by_email", counting)
+    return seen
+
+@pytest.fixture
+def current_user(SessionLocal, monkeypatch, clock):
+    monkeypatch.setattr(security, "SECRET_KEY", "test-secret")
+    monkeypatch.setattr(security, "ALGORITHM", "HS256")
+    monkeypatch.setattr(token_cache, "enabled", True)
+    token_cache.clear()
+
+    db = SessionLocal()
+    db.add(model.User(email=EMAIL, hashed_password="unused"))
+    db.commit()
+    db.close()
+
+    AsyncSessionLocal = session.make_async_sessionmaker(SessionLocal.kw["bind"].url)
+
+    async def lookup(token):
+        async with AsyncSessionLocal() as db:
+            return await security.get_current_user(token=token, db=db)
+
+    yield lambda token: asyncio.run(lookup(token))
+    token_cache.clear()
+
+def token(expires_in: timedelta):
+    return security.create_access_token({"sub": EMAIL}, expires_delta=expires_in)
+
+def test_entry_expires_with_the_token(current_user, clock, lookups):
+    # Whole seconds in 'exp', so the entry lives between 59 and 60 s
+    short_lived = token(timedelta(seconds=60))
+
+    assert current_user(short_lived).email == EMAIL
+    clock.skip(55)
+    assert current_user(short_lived).email == EMAIL
+    assert lookups == [EMAIL]
+
+    # Past 'exp' on the cache's clock: looked up again (the token is still
+    # valid on the real clock, so the lookup succeeds)
+    clock.skip(10)
+    assert current_user(short_lived).email == EMAIL
+    assert lookups == [EMAIL, EMAIL]
+
+def test_entry_expires_with_the_cache_ttl(current_user, clock, lookups):
+    long_lived = token(timedelta(hours=1))
+
+    current_user(long_lived)
+    clock.skip(token_cache.ttl - 5)
+    current_user(long_lived)
+    assert lookups == [EMAIL]
+
+    clock.skip(10)
+    current_user(long_lived)
+    assert lookups == [EMAIL, EMAIL]
+
+def test_user_change_drops_the_entry(SessionLocal, current_user, lookups):
+    access_token = token(timedelta(hours=1))
+    current_user(access_token)
+    current_user(access_token)
+    assert lookups == [EMAIL]
+
+    db = SessionLocal()
+    crud_login.create_user(db, schema.UserCreate(email="manager@example.com", password="secret"), hashed_password="unused")
+    db.close()
+
+    current_user(access_token)
+    assert lookups == [EMAIL, EMAIL]
+
+def test_expired_token_is_401_and_not_cached(current_user, lookups):
+    with pytest.raises(HTTPException) as raised:
+        current_user(token(timedelta(seconds=-1)))
+    assert raised.value.status_code == 401
+    assert token_cache.stats()["size"] == 0
+    assert lookups == []
@@ -1,4 +1,4 @@
-import { useState, useEffect } from "react";
+import { useState } from "react";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
 import { AlertTriangle, ArrowRight } from "lucide-react";
@@ -17,40 +17,21 @@ import {
 import { Link } from "react-router-dom";
 
 // This type matches your 'LowStockAlert' schema
-type LowStockItem = {
+export type LowStockItem = {
   id: number;
   name: string;
   currentStock: number;
   reorderPoint: number;
 };
 
-const LowStockAlertsCard = () => {
+// The alerts come from the dashboard page, which loads them together
+// with the KPIs from /dashboard/summary
+const LowStockAlertsCard = ({ alerts }: { alerts: LowStockItem[] }) => {
   const { toast } = useToast();
   
   // --- 1. CHANGE STATE TO HOLD THE FULL ITEM ---
   // We need the ID and quantities, not just the name
   const [itemToReorder, setItemToReorder] = useState<LowStockItem | null>(null);
-  const [alerts, setAlerts] = useState<LowStockItem[]>([]);
-
-  // Fetch the low stock alerts
-  useEffect(() => {
-    const fetchAlerts = async () => {
-      try {
-        const response = await fetch(
-          "http://127.0.0.1:8000/api/v1/dashboard/low-stock-alerts"
-        );
-        if (!response.ok) {
-          throw new Error("Failed to fetch stock alerts");
-        }
-        const data: LowStockItem[] = await response.json();
-        setAlerts(data);
-      } catch (error) {
-        console.error("Failed to fetch alerts:", error);
-      }
-    };
-
-    fetchAlerts();
-  }, []); // Run once on page load
 
   // --- 2. MAKE THE REORDER FUNCTION ASYNC ---
   const handleReorderConfirm = async () => {
@@ -1,49 +1,19 @@
-import { useState, useEffect } from "react"; // <-- 1. IMPORT HOOKS
 import { Link } from "react-router-dom";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
 import { AlertTriangle, Package, Clock } from "lucide-react"; // <-- 2. IMPORT MORE ICONS
-import { useToast } from "@/hooks/use-toast"; // <-- 3. IMPORT useToast
 
 // --- 4. DEFINE THE TYPE FOR OUR NEW DATA ---
 // This matches your 'PriorityTask' schema
-type PriorityTask = {
+export type PriorityTask = {
   type: string; // "Pending Orders", "Low Stock", "Late Shipment"
   description: string;
   link_to: string; // e.g., "/orders"
 };
 
-const PriorityTasksCard = () => {
-  const { toast } = useToast();
-
-  // --- 5. CREATE STATE FOR THE TASK LIST ---
-  const [tasks, setTasks] = useState<PriorityTask[]>([]);
-
-  // --- 6. FETCH THE DATA FROM THE BACKEND ---
-  useEffect(() => {
-    const fetchTasks = async () => {
-      try {
-        const response = await fetch(
-          "http://127.0.0.1:8000/api/v1/dashboard/priority-tasks"
-        );
-        if (!response.ok) {
-          throw new Error("Failed to fetch priority tasks");
-        }
-        const data: PriorityTask[] = await response.json();
-        setTasks(data);
-      } catch (error) {
-        console.error("Failed to fetch tasks:", error);
-        // Optional: Show a toast on error
-        // toast({
-        //   title: "Error",
-        //   description: "Could not load priority tasks.",
-        //   variant: "destructive",
-        // });
-      }
-    };
-
-    fetchTasks();
-  }, [toast]); // Run once on page load
+// --- 5. THE TASKS COME FROM THE DASHBOARD PAGE ---
+// The page loads them together with the KPIs from /dashboard/summary
+const PriorityTasksCard = ({ tasks }: { tasks: PriorityTask[] }) => {
 
   // --- 7. DELETE THE HARD-CODED 'tasks' ARRAY ---
   // const tasks = [ ... ]; // <-- This is gone
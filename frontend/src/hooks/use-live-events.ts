@@ -0,0 +1,57 @@
+import * as React from "react";
+
+const STREAM_URL = "http://127.0.0.1:8000/api/v1/stream";
+
+// Handlers keyed by event type ("order.created", "kpi.counters", ...).
+// "resync" is also called after a reconnect, since events may have been missed.
+export type LiveEventHandlers = Record<string, (data: any) => void>;
+
+export function useLiveEvents(handlers: LiveEventHandlers) {
+  const handlersRef = React.useRef(handlers);
+  handlersRef.current = handlers;
+
+  React.useEffect(() => {
+    const source = new EventSource(STREAM_URL);
+    let opened = false;
+
+    source.onopen = () => {
+      if (opened) {
+        handlersRef.current.resync?.({});
+      }
+      opened = true;
+    };
+
+    const types = new Set([...Object.keys(handlersRef.current), "resync"]);
+    types.forEach((type) => {
+      source.addEventListener(type, (event) => {
+        handlersRef.current[type]?.(JSON.parse((event as MessageEvent).data));
+      });
+    });
+
+    return () => source.close();
+  }, []);
+}
+
+// Returns a stable function that runs 'refetch' at most once per
+// 'intervalMs': a burst of events (e.g. a bulk import) becomes one call at
+// the end of the interval. A pending call is cancelled on unmount.
+export function useThrottledRefetch(refetch: () => void, intervalMs = 1000) {
+  const refetchRef = React.useRef(refetch);
+  refetchRef.current = refetch;
+  const timer = React.useRef<ReturnType<typeof setTimeout> | null>(null);
+
+  React.useEffect(() => {
+    return () => {
+      if (timer.current) clearTimeout(timer.current);
+      timer.current = null;
+    };
+  }, []);
+
+  return React.useCallback(() => {
+    if (timer.current) return;
+    timer.current = setTimeout(() => {
+      timer.current = null;
+      refetchRef.current();
+    }, intervalMs);
+  }, [intervalMs]);
+}
@@ -1,13 +1,14 @@
 // src/pages/index.tsx
 
-import { useState, useEffect } from "react"; // <-- Import hooks
+import { useState, useEffect, useCallback, useRef } from "react"; // <-- Import hooks
 import Header from "@/components/Header";
 import Sidebar from "@/components/Sidebar";
 import KeyMetricsCard from "@/components/dashboard/KeyMetricsCard";
-import PriorityTasksCard from "@/components/dashboard/PriorityTasksCard";
-import LowStockAlertsCard from "@/components/dashboard/LowStockAlertsCard";
+import PriorityTasksCard, { PriorityTask } from "@/components/dashboard/PriorityTasksCard";
+import LowStockAlertsCard, { LowStockItem } from "@/components/dashboard/LowStockAlertsCard";
 import RecentSalesCard from "@/components/dashboard/RecentSalesCard";
 import { useToast } from "@/hooks/use-toast"; // <-- Import useToast
+import { useLiveEvents, useThrottledRefetch } from "@/hooks/use-live-events";
 
 // --- 1. DEFINE THE TYPE FOR OUR NEW DATA ---
 type KpiData = {
@@ -17,6 +18,13 @@ type KpiData = {
   low_stock_items: number;
 };
 
+// Matches the 'DashboardSummary' schema: everything the page needs in one request
+type DashboardSummary = {
+  kpis: KpiData;
+  low_stock_alerts: LowStockItem[];
+  priority_tasks: PriorityTask[];
+};
+
 const Index = () => {
   const { toast } = useToast();
   
@@ -27,29 +35,109 @@ const Index = () => {
     pending_orders: 0,
     low_stock_items: 0,
   });
+  const [alerts, setAlerts] = useState<LowStockItem[]>([]);
+  const [tasks, setTasks] = useState<PriorityTask[]>([]);
 
-  // --- 3. FETCH THE KPI DATA FROM THE BACKEND ---
-  useEffect(() => {
-    const fetchKpis = async () => {
-      try {
-        const response = await fetch("http://127.0.0.1:8000/api/v1/dashboard/kpis");
-        if (!response.ok) {
-          throw new Error("Failed to fetch dashboard KPIs");
-        }
-        const data: KpiData = await response.json();
-        setKpis(data);
-      } catch (error) {
-        console.error("Failed to fetch KPIs:", error);
-        toast({
-          title: "Error",
-          description: "Could not load dashboard data.",
-          variant: "destructive",
-        });
+  // --- 3. FETCH ALL DASHBOARD DATA FROM THE BACKEND IN ONE REQUEST ---
+  const fetchKpis = useCallback(async () => {
+    try {
+      const response = await fetch("http://127.0.0.1:8000/api/v1/dashboard/summary");
+      if (!response.ok) {
+        throw new Error("Failed to fetch dashboard summary");
       }
-    };
+      const data: DashboardSummary = await response.json();
+      setKpis(data.kpis);
+      setAlerts(data.low_stock_alerts);
+      setTasks(data.priority_tasks);
+    } catch (error) {
+      console.error("Failed to fetch KPIs:", error);
+      toast({
+        title: "Error",
+        description: "Could not load dashboard data.",
+        variant: "destructive",
+      });
+    }
+  }, [toast]);
 
+  useEffect(() => {
     fetchKpis();
-  }, [toast]); // Run once on page load
+  }, [fetchKpis]); // Run once on page load
+
+  // --- 4. KEEP THE DASHBOARD LIVE ---
+  // Each event updates only what it affects. KPI events carry the amounts
+  // to add and stock events the new levels, so both are applied directly.
+  // Lists that the server has to re-rank are re-fetched on their own
+  // (alerts, tasks), at most once a second; only a resync reloads the
+  // whole summary.
+  const fetchAlerts = useCallback(async () => {
+    try {
+      const response = await fetch("http://127.0.0.1:8000/api/v1/dashboard/low-stock-alerts");
+      if (!response.ok) throw new Error("Failed to fetch low-stock alerts");
+      setAlerts(await response.json());
+    } catch (error) {
+      console.error("Failed to refresh low-stock alerts:", error);
+    }
+  }, []);
+
+  const fetchTasks = useCallback(async () => {
+    try {
+      const response = await fetch("http://127.0.0.1:8000/api/v1/dashboard/priority-tasks");
+      if (!response.ok) throw new Error("Failed to fetch priority tasks");
+      setTasks(await response.json());
+    } catch (error) {
+      console.error("Failed to refresh priority tasks:", error);
+    }
+  }, []);
+
+  // Stock events for products that are not on the alert list change nothing here
+  const alertsRef = useRef(alerts);
+  alertsRef.current = alerts;
+
+  const scheduleSummary = useThrottledRefetch(fetchKpis);
+  const scheduleAlerts = useThrottledRefetch(fetchAlerts);
+  const scheduleTasks = useThrottledRefetch(fetchTasks);
+
+  useLiveEvents({
+    "kpi.sales": (data) => {
+      const today = new Date().toISOString().slice(0, 10); // the backend buckets days in UTC
+      if (data.day !== today) return;
+      setKpis((k) => ({ ...k, revenue_today: k.revenue_today + data.revenue, orders_today: k.orders_today + data.orders }));
+    },
+    "kpi.counters": (data) => {
+      setKpis((k) => ({
+        ...k,
+        pending_orders: k.pending_orders + (data.pending_orders ?? 0),
+        low_stock_items: k.low_stock_items + (data.low_stock_items ?? 0),
+      }));
+      // A product crossed its reorder point: the alert list (and the most
+      // critical item among the tasks) gained or lost a product
+      if (data.low_stock_items) {
+        scheduleAlerts();
+        scheduleTasks();
+      }
+    },
+    "stock.changed": (data) => {
+      // Sales send each product's change, product edits its new levels
+      const items = new Map<number, any>(data.items.map((item: any) => [item.id, item]));
+      if (!alertsRef.current.some((alert) => items.has(alert.id))) return;
+      setAlerts((list) => list.map((alert) => {
+        const item = items.get(alert.id);
+        if (!item) return alert;
+        return {
+          ...alert,
+          currentStock: item.currentStock ?? alert.currentStock + item.change,
+          reorderPoint: item.reorderPoint ?? alert.reorderPoint,
+        };
+      }));
+      // The order of the alerts, and so the most critical one, may have changed
+      scheduleAlerts();
+      scheduleTasks();
+    },
+    "order.status": scheduleTasks,
+    "purchase_order.created": scheduleTasks,
+    "purchase_orders.created": scheduleTasks,
+    resync: scheduleSummary,
+  });
 
   return (
     <div className="min-h-screen bg-background">
@@ -58,11 +146,11 @@ const Index = () => {
         <Sidebar />
         <main className="flex-1 ml-64 p-6">
           <div className="grid grid-cols-1 lg:grid-cols-2 gap-6">
-            {/* --- 4. PASS THE LIVE DATA AS A PROP --- */}
+            {/* --- 5. PASS THE LIVE DATA AS A PROP --- */}
             <KeyMetricsCard kpis={kpis} />
             
-            <PriorityTasksCard />
-            <LowStockAlertsCard />
+            <PriorityTasksCard tasks={tasks} />
+            <LowStockAlertsCard alerts={alerts} />
             <RecentSalesCard />
           </div>
         </main>
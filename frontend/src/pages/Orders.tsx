@@ -1,4 +1,5 @@
 import { useState, useEffect } from "react"; // <-- 1. IMPORT useEffect
+import { useLiveEvents, useThrottledRefetch } from "@/hooks/use-live-events";
 import Header from "@/components/Header";
 import Sidebar from "@/components/Sidebar";
 import { Input } from "@/components/ui/input";
@@ -115,6 +116,17 @@ useEffect(() => {
   fetchOrders();
 }, [toast]); 
 
+// Re-fetch when orders change on the server (the list answers 304 if nothing did).
+// A burst of sales sends many events, so re-fetch at most once a second.
+const scheduleRefetch = useThrottledRefetch(fetchOrders);
+
+useLiveEvents({
+  "order.created": scheduleRefetch,
+  "orders.created": scheduleRefetch,
+  "order.status": scheduleRefetch,
+  resync: scheduleRefetch,
+});
+
   // This function is your new fixed version
   const getStatusVariant = (status: string) => {
     switch (status) {